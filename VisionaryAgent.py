@@ -1,20 +1,43 @@
 import os
-import faiss
-import numpy as np
-from phi.agent import Agent
-from phi.tools.firecrawl import FirecrawlTools
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.tools.exa import ExaTools
-from phi.model.openai import OpenAIChat
-from phi.embedder.openai import OpenAIEmbedder
-from typing import List
+import re
+import time
+import uuid
+import shutil
+import tempfile
+from typing import List, Optional, TYPE_CHECKING
 from pydantic import BaseModel, Field
-from fastapi import UploadFile
+import markdown2
+import pdfkit
+from agent_registry import DEFAULT_PARTITION, LazyRegistry
+from agent_runtime import run_agent
+from compaction import compact
+from context_builder import build_context
+from ingestion import Chunk, ingest_document
+from model_router import chat_model
+from rate_limits import rate_limited
+from orchestration import ParallelResult, run_parallel
+from pipeline import Node, Pipeline
+from retrieval import RETRIEVAL_MODE
+from schemas import AIStrategy, AIUseCases, CompanySummary, CompetitorAnalysis, IndustryTrends, IntegrationPlan, RevenueOpportunities, as_markdown, as_prompt
+from semantic_cache import research_cache
+
+if TYPE_CHECKING:
+    from fastapi import UploadFile
 
 # Load environment variables (API keys, etc.)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Everything heavy (agents, OpenAI clients, tool SDKs, FAISS) is built on first use
+agents = LazyRegistry()
+
+def __getattr__(name: str):
+    # Keeps `VisionaryAgent.reasoning_agent` style access working without eager construction
+    if name in agents:
+        return agents.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 #####################################################################################
 #                                    PHASE 1                                        #
 #####################################################################################
@@ -22,124 +45,221 @@ load_dotenv()
 ##############################
 # 1️⃣ Company Search Agent   #
 ##############################
-company_search_agent = Agent(
-    name="Company Search Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Finds company details based on name using web search.",
-    instructions=["Always include sources in search results."],
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def search_company(company_name: str):
+@agents.register("company_search_agent")
+def build_company_search_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    return Agent(
+        name="Company Search Agent",
+        model=chat_model("Company Search Agent"),
+        tools=[rate_limited(DuckDuckGo(), "duckduckgo")],
+        description="Finds company details based on name using web search.",
+        instructions=["Always include sources in search results."],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def search_company(company_name: str, stream: bool = False):
     query = f"Find detailed company information for {company_name}. Extract its official website, mission, services, and any AI-related initiatives. Prioritize official sources and provide links where available."
-    return company_search_agent.print_response(query)
+    return run_agent(agents.get("company_search_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ Website Scraper Agent   #
 ##############################
-firecrawl_agent = Agent(
-    name="Website Scraper Agent",
-    tools=[FirecrawlTools(scrape=True, crawl=False)],
-    description="Extracts content from company websites.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def scrape_website(url: str):
-    return firecrawl_agent.print_response(f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.")
+@agents.register("firecrawl_agent")
+def build_firecrawl_agent():
+    from phi.agent import Agent
+    from phi.tools.firecrawl import FirecrawlTools
+    return Agent(
+        name="Website Scraper Agent",
+        model=chat_model("Website Scraper Agent"),
+        tools=[FirecrawlTools(scrape=True, crawl=False)],
+        description="Extracts content from company websites.",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def scrape_website(url: str, stream: bool = False):
+    return run_agent(agents.get("firecrawl_agent"), f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.", stream=stream)
 
 
 ##############################
 # 3️⃣ Text Processing Agent   #
 ##############################
-class CompanySummary(BaseModel):
-    summary: str = Field(..., description="Summarized company details based on user input.")
-
-text_processing_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    description="Summarizes user-written company descriptions.",
-    response_model=CompanySummary,
-)
+@agents.register("text_processing_agent")
+def build_text_processing_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Text Processing Agent",
+        model=chat_model("Text Processing Agent"),
+        description="Summarizes user-written company descriptions.",
+        response_model=CompanySummary,
+    )
 
-def process_company_description(text: str):
-    return text_processing_agent.print_response(f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.")
+def process_company_description(text: str, stream: bool = False):
+    return run_agent(agents.get("text_processing_agent"), f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.", stream=stream)
 
 
 #################################
 # 4️⃣ Document Processing Agent  #
 #################################
 # FAISS Index for storing extracted knowledge
-embedding_model = OpenAIEmbedder(model="text-embedding-3-small")
 dimension = 1536  # OpenAI's embedding dimension
-faiss_index = faiss.IndexFlatL2(dimension)
 
-def process_uploaded_document(file: UploadFile):
-    file_path = f"tmp/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(file.file.read())
+@agents.register("embedding_model")
+def build_embedding_model():
+    from http_clients import openai_embedder
+    return openai_embedder("text-embedding-3-small")
+
+# One index per company or session; searches never scan another tenant's documents
+@agents.register("vector_store")
+def build_vector_store():
+    from vector_store import PartitionedVectorStore
+    return PartitionedVectorStore(dimension=dimension)
+
+def process_uploaded_document(file: "UploadFile | str", partition: str = DEFAULT_PARTITION):
+    # Accepts FastAPI's UploadFile, Streamlit's UploadedFile, or the path of a file already saved for this upload
+    if isinstance(file, str):
+        return ingest_file(file, partition)
+    filename = os.path.basename(getattr(file, "filename", None) or file.name)
+    # Each upload gets a folder of its own, so two uploads named deck.pdf never overwrite each other before ingest
+    folder = tempfile.mkdtemp(prefix="upload-")
+    try:
+        file_path = os.path.join(folder, filename)
+        with open(file_path, "wb") as buffer:
+            shutil.copyfileobj(getattr(file, "file", file), buffer)
+        return ingest_file(file_path, partition)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def ingest_file(file_path: str, partition: str = DEFAULT_PARTITION):
+    filename = os.path.basename(file_path)
     
-    with open(file_path, "r", encoding="utf-8") as f:
-        document_text = f.read()
+    # Split into overlapping token-bounded chunks and embed them in batches. Embedding happens before
+    # taking the write lock, so searches on the partition never wait on the embedding API
+    batches = []
+    result = ingest_document(file_path, lambda vectors, chunks: batches.append((vectors, chunks)), agents.get("embedding_model"), document=filename)
     
-    # Generate embedding
-    embedding = np.array(embedding_model.embed([document_text])).astype("float32")
-    faiss_index.add(embedding)
+    # A re-upload replaces the old copy in one write
+    store = agents.get("vector_store").partition(partition)
+    with store.writing():
+        store.delete_document(filename)
+        for vectors, chunks in batches:
+            store.add(vectors, chunks)
     
-    return f"Document processed and stored in FAISS index: {file.filename}"
+    return f"Document processed and stored in FAISS index: {filename} ({result.chunks} chunks)"
+
+def search_documents(query: str, k: int = 5, mode: str = RETRIEVAL_MODE, partition: str = DEFAULT_PARTITION) -> List[Chunk]:
+    # Keyword mode skips the embedding call entirely; hybrid fuses BM25 and vector rankings
+    store = agents.get("vector_store").partition(partition)
+    if mode == "keyword":
+        return [chunk for _, chunk in store.keyword_search(query, k)]
+    import numpy as np
+    vector = np.array(agents.get("embedding_model").get_embedding(query), dtype="float32")
+    if mode == "hybrid":
+        return [chunk for _, chunk in store.hybrid_search(vector, query, k)]
+    return [chunk for _, chunk in store.search(vector, k)]
+
+# What the strategy needs from uploaded documents, one retrieval query per aspect
+COMPANY_DOCUMENT_QUERIES = [
+    "company overview, mission and business model",
+    "products, services, customers and markets",
+    "strategy, goals, challenges, operations and technology",
+]
+
+def document_company_data(partition: str, k: int = 4) -> str:
+    # The partition's passages describing the company, each once and in document order
+    found = {}
+    for query in COMPANY_DOCUMENT_QUERIES:
+        for chunk in search_documents(query, k=k, partition=partition):
+            found.setdefault((chunk.document, chunk.index), chunk)
+    return "\n\n".join(chunk.text for _, chunk in sorted(found.items()))
 
 
 ##############################
 # 1️⃣ Industry Trends Agent  #
 ##############################
-industry_trends_agent = Agent(
-    name="Industry Trends Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"])],
-    description="Finds the latest AI advancements in a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_industry_trends(industry: str):
+@agents.register("industry_trends_agent")
+def build_industry_trends_agent():
+    from phi.agent import Agent
+    from phi.tools.exa import ExaTools
+    return Agent(
+        name="Industry Trends Agent",
+        model=chat_model("Industry Trends Agent"),
+        tools=[rate_limited(ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"]), "exa")],
+        description="Finds the latest AI advancements in a given industry.",
+        show_tool_calls=True,
+        response_model=IndustryTrends,
+        structured_outputs=True,
+    )
+
+def get_industry_trends(industry: str, stream: bool = False):
     query = f"Find the latest AI advancements, innovations, and emerging technologies in the {industry} sector. Include breakthroughs, adoption trends, and notable implementations by leading companies. Provide references and insights from credible sources."
-    return industry_trends_agent.print_response(query)
+    return research_cache.get_or_compute("industry_trends", industry, lambda: run_agent(agents.get("industry_trends_agent"), query, stream=stream), stream=stream)
 
 
 ##################################
 # 2️⃣ AI Use Case Discovery Agent #
 ##################################
-ai_use_case_agent = Agent(
-    name="AI Use Case Discovery Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Identifies AI applications relevant to a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_ai_use_cases(industry: str):
+@agents.register("ai_use_case_agent")
+def build_ai_use_case_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="AI Use Case Discovery Agent",
+        model=chat_model("AI Use Case Discovery Agent"),
+        # Exa answers in place of DuckDuckGo when a search runs past DuckDuckGo's usual p90
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(), "exa"))],
+        description="Identifies AI applications relevant to a given industry.",
+        show_tool_calls=True,
+        response_model=AIUseCases,
+        structured_outputs=True,
+    )
+
+def get_ai_use_cases(industry: str, stream: bool = False):
     query = f"Identify the most impactful AI use cases in the {industry} sector. Include real-world applications, automation improvements, cost-saving innovations, and data-driven decision-making processes. Provide case studies and examples of successful AI implementation."
-    return ai_use_case_agent.print_response(query)
+    return research_cache.get_or_compute("ai_use_cases", industry, lambda: run_agent(agents.get("ai_use_case_agent"), query, stream=stream), stream=stream)
 
 
 ####################################
 # 3️⃣ Competitive Analysis Agent   #
 ####################################
-competitive_analysis_agent = Agent(
-    name="Competitive Analysis Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo(), ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"])],
-    description="Analyzes how competitors are using AI in their businesses.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_competitor_ai_strategies(company_name: str):
+@agents.register("competitive_analysis_agent")
+def build_competitive_analysis_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="Competitive Analysis Agent",
+        model=chat_model("Competitive Analysis Agent"),
+        # One hedged search instead of two tools: the model no longer waits on whichever backend it picked
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"]), "exa"))],
+        description="Analyzes how competitors are using AI in their businesses.",
+        show_tool_calls=True,
+        response_model=CompetitorAnalysis,
+        structured_outputs=True,
+    )
+
+def get_competitor_ai_strategies(company_name: str, stream: bool = False):
     query = f"Analyze how {company_name} is leveraging AI in its business operations. Find recent reports, product innovations, automation strategies, and AI-driven transformations. Highlight competitive advantages gained through AI adoption. Provide references and sources."
-    return competitive_analysis_agent.print_response(query)
+    return research_cache.get_or_compute("competitor_analysis", company_name, lambda: run_agent(agents.get("competitive_analysis_agent"), query, stream=stream), stream=stream)
+
+
+##############################
+# 4️⃣ Phase 2 Runner          #
+##############################
+PHASE2_TIMEOUT = 120  # seconds per research agent
+
+def run_phase2(industry: str, competitor: str, timeout: float = PHASE2_TIMEOUT) -> ParallelResult:
+    return run_parallel({
+        "industry_trends": lambda: get_industry_trends(industry),
+        "ai_use_cases": lambda: get_ai_use_cases(industry),
+        "competitor_analysis": lambda: get_competitor_ai_strategies(competitor),
+    }, timeout=timeout)
 
 
 ###########################
@@ -166,22 +286,42 @@ def get_competitor_ai_strategies(company_name: str):
 ##############################
 # 1️⃣ Reasoning Agent        #
 ##############################
-reasoning_agent = Agent(
-    name="Reasoning Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Processes all collected data and generates structured AI adoption strategies.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases: str, competitor_analysis: str):
+@agents.register("reasoning_agent")
+def build_reasoning_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Reasoning Agent",
+        model=chat_model("Reasoning Agent"),
+        description="Processes all collected data and generates structured AI adoption strategies.",
+        show_tool_calls=True,
+        response_model=AIStrategy,
+        structured_outputs=True,
+    )
+
+# Retrieval queries for each part of the strategy prompt; inputs are cut down to the
+# passages these match, within the context token budget
+STRATEGY_SECTIONS = [
+    "AI opportunities to enhance operations, customer experience and business efficiency",
+    "AI tools, models, platforms and methodologies that fit the company",
+    "implementation roadmap, costs, scalability, ROI and benchmarks",
+    "future scalability and long-term growth from AI adoption",
+]
+
+def generate_ai_strategy(company_data: str, industry_trends: IndustryTrends | str, ai_use_cases: AIUseCases | str, competitor_analysis: CompetitorAnalysis | str, stream: bool = False):
+    # Earlier phases' output is deduplicated and held to its stage budget before passages are picked
+    context = build_context({
+        "company_data": compact("company_data", as_prompt(company_data)),
+        "industry_trends": compact("industry_trends", as_prompt(industry_trends)),
+        "ai_use_cases": compact("ai_use_cases", as_prompt(ai_use_cases)),
+        "competitor_analysis": compact("competitor_analysis", as_prompt(competitor_analysis)),
+    }, STRATEGY_SECTIONS)
     query = f"""
     You are an AI business strategist analyzing a company's potential AI adoption. Given the following:
     
-    - **Company Overview:** {company_data}
-    - **Industry Trends:** {industry_trends}
-    - **AI Use Cases:** {ai_use_cases}
-    - **Competitor AI Strategies:** {competitor_analysis}
+    - **Company Overview:** {context["company_data"]}
+    - **Industry Trends:** {context["industry_trends"]}
+    - **AI Use Cases:** {context["ai_use_cases"]}
+    - **Competitor AI Strategies:** {context["competitor_analysis"]}
     
     Generate a structured AI adoption strategy that includes:
     1. **AI Opportunities**: Identify key areas where AI can enhance operations, customer experience, or business efficiency.
@@ -191,26 +331,39 @@ def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases:
     
     Provide structured insights with a logical flow and avoid generic statements. Use industry benchmarks where possible.
     """
-    return reasoning_agent.print_response(query)
+    return run_agent(agents.get("reasoning_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ AI Integration Advisor  #
 ##############################
-ai_integration_agent = Agent(
-    name="AI Integration Advisor",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Suggests AI implementation strategies based on industry insights and company operations.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def suggest_ai_integration(company_data: str, ai_strategy: str):
+@agents.register("ai_integration_agent")
+def build_ai_integration_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="AI Integration Advisor",
+        model=chat_model("AI Integration Advisor"),
+        description="Suggests AI implementation strategies based on industry insights and company operations.",
+        show_tool_calls=True,
+        response_model=IntegrationPlan,
+        structured_outputs=True,
+    )
+
+INTEGRATION_SECTIONS = [
+    "phased AI integration from pilot testing to full deployment",
+    "technology, infrastructure, AI tools, cloud platforms and software",
+    "workforce, training and upskilling employees",
+    "risk, data security, compliance and ethical concerns",
+    "KPIs and measurable AI performance indicators",
+]
+
+def suggest_ai_integration(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, INTEGRATION_SECTIONS)
     query = f"""
     Based on the AI adoption strategy:
     
-    - **Company Context:** {company_data}
-    - **AI Strategy Summary:** {ai_strategy}
+    - **Company Context:** {context["company_data"]}
+    - **AI Strategy Summary:** {context["ai_strategy"]}
     
     Provide a structured AI implementation plan:
     1. **Step-by-step AI Integration**: List phases of AI adoption, from pilot testing to full deployment.
@@ -221,26 +374,38 @@ def suggest_ai_integration(company_data: str, ai_strategy: str):
     
     The output should be detailed, actionable, and specific to the business domain.
     """
-    return ai_integration_agent.print_response(query)
+    return run_agent(agents.get("ai_integration_agent"), query, stream=stream)
 
 
 ##############################
 # 3️⃣ Revenue Growth Agent    #
 ##############################
-revenue_growth_agent = Agent(
-    name="Revenue Growth Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def identify_revenue_opportunities(company_data: str, ai_strategy: str):
+@agents.register("revenue_growth_agent")
+def build_revenue_growth_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Revenue Growth Agent",
+        model=chat_model("Revenue Growth Agent"),
+        description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
+        show_tool_calls=True,
+        response_model=RevenueOpportunities,
+        structured_outputs=True,
+    )
+
+REVENUE_SECTIONS = [
+    "AI monetization, new revenue streams, AI-driven products, services and data",
+    "cost reduction, automation and operational efficiency gains",
+    "market expansion, new markets and scaling offerings",
+    "competitive positioning, industry leaders and differentiation",
+]
+
+def identify_revenue_opportunities(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, REVENUE_SECTIONS)
     query = f"""
     You are an AI business analyst tasked with identifying AI-driven revenue growth opportunities for:
     
-    - **Company Overview:** {company_data}
-    - **AI Strategy:** {ai_strategy}
+    - **Company Overview:** {context["company_data"]}
+    - **AI Strategy:** {context["ai_strategy"]}
     
     Provide:
     1. **AI Monetization Strategies**: Explain how AI can create new revenue streams (e.g., AI-driven products, services, or data monetization).
@@ -250,34 +415,73 @@ def identify_revenue_opportunities(company_data: str, ai_strategy: str):
     
     Ensure detailed, actionable insights with real-world examples where applicable.
     """
-    return revenue_growth_agent.print_response(query)
+    return run_agent(agents.get("revenue_growth_agent"), query, stream=stream)
 
 
 ##############################
 # 4️⃣ Report Generation Agent #
 ##############################
-def generate_report(company_name: str, ai_strategy: str, ai_integration: str, revenue_opportunities: str):
-    report_content = f"""
-    # AI Strategy Report for {company_name}
-    
-    ## AI Adoption Strategy
-    {ai_strategy}
-    
-    ## AI Implementation Plan
-    {ai_integration}
-    
-    ## Revenue Growth Opportunities
-    {revenue_opportunities}
-    
-    """
+# Every report gets its own folder here, so reports for the same company never overwrite each other
+REPORTS_DIR = os.getenv("VISIONARY_REPORTS_DIR", "tmp/reports")
+
+def new_report_path(company_name: str, folder: Optional[str] = None) -> str:
+    # The company name is user input: keep only a safe file name, and never a path
+    safe_name = re.sub(r"[^\w.-]+", "_", company_name).strip("._") or "company"
+    return os.path.join(REPORTS_DIR, folder or uuid.uuid4().hex, f"{safe_name}_AI_Report.pdf")
+
+def generate_report(company_name: str, ai_strategy: AIStrategy | str, ai_integration: IntegrationPlan | str, revenue_opportunities: RevenueOpportunities | str, report_path: Optional[str] = None):
+    report_path = report_path or new_report_path(company_name)
+    # Sections render from the structured results; joined flush-left so markdown2 does not read them as code
+    report_content = "\n\n".join([
+        f"# AI Strategy Report for {company_name}",
+        "## AI Adoption Strategy",
+        as_markdown(ai_strategy),
+        "## AI Implementation Plan",
+        as_markdown(ai_integration),
+        "## Revenue Growth Opportunities",
+        as_markdown(revenue_opportunities),
+    ])
     
     # Convert to Markdown
     markdown_report = markdown2.markdown(report_content)
     
     # Convert Markdown to PDF
-    pdfkit.from_string(markdown_report, f"{company_name}_AI_Report.pdf")
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    pdfkit.from_string(markdown_report, report_path)
     
-    return f"Report generated: {company_name}_AI_Report.pdf"
+    return f"Report generated: {report_path}"
+
+
+##############################
+# 5️⃣ Phase 3 Runner          #
+##############################
+PHASE3_TIMEOUT = 180  # seconds per reasoning agent
+
+def run_phase3(company_name: str, company_data: str, industry_trends: IndustryTrends | str, ai_use_cases: AIUseCases | str, competitor_analysis: CompetitorAnalysis | str, timeout: float = PHASE3_TIMEOUT) -> ParallelResult:
+    started = time.monotonic()
+    result = run_parallel({
+        "ai_strategy": lambda: generate_ai_strategy(company_data, industry_trends, ai_use_cases, competitor_analysis),
+    }, timeout=timeout)
+    if "ai_strategy" not in result.results:
+        result.elapsed = time.monotonic() - started
+        return result
+    ai_strategy = result.results["ai_strategy"]
+
+    result.merge(run_parallel({
+        "ai_integration": lambda: suggest_ai_integration(company_data, ai_strategy),
+        "revenue_opportunities": lambda: identify_revenue_opportunities(company_data, ai_strategy),
+    }, timeout=timeout))
+
+    sections = {
+        name: result.results.get(name) or f"_Not available: {result.errors.get(name)}_"
+        for name in ("ai_integration", "revenue_opportunities")
+    }
+    try:
+        result.results["report"] = generate_report(company_name, ai_strategy, sections["ai_integration"], sections["revenue_opportunities"])
+    except Exception as e:
+        result.errors["report"] = f"{type(e).__name__}: {e}"
+    result.elapsed = time.monotonic() - started
+    return result
 
 
 ###########################
@@ -300,4 +504,36 @@ def generate_report(company_name: str, ai_strategy: str, ai_integration: str, re
 #     revenue_opportunities = identify_revenue_opportunities(company_data, ai_strategy)
     
 #     print("\nGenerating Final Report...")
-#     generate_report(company_name, ai_strategy, ai_integration, revenue_opportunities)
\ No newline at end of file
+#     generate_report(company_name, ai_strategy, ai_integration, revenue_opportunities)
+
+#####################################################################################
+#                                    PIPELINE                                       #
+#####################################################################################
+# Phase 1 agent per input method; uploaded documents are indexed before the run, so their summary passes through
+COMPANY_LOADERS = {
+    "Search by Name": search_company,
+    "Website URL": scrape_website,
+    "Manual Description": process_company_description,
+}
+
+def load_company_data(input_method: str, company_source: str):
+    loader = COMPANY_LOADERS.get(input_method)
+    return loader(company_source) if loader else company_source
+
+# Phase 1 and the research agents share no inputs, so they run side by side; each node reruns only when its inputs change
+strategy_pipeline = Pipeline([
+    Node("company_data", load_company_data, ["input_method", "company_source"]),
+    Node("industry_trends", get_industry_trends, ["industry"], timeout=PHASE2_TIMEOUT),
+    Node("ai_use_cases", get_ai_use_cases, ["industry"], timeout=PHASE2_TIMEOUT),
+    Node("competitor_analysis", lambda competitor: get_competitor_ai_strategies(competitor), ["competitor"], timeout=PHASE2_TIMEOUT),
+    Node(
+        "ai_strategy", generate_ai_strategy, ["company_data", "industry_trends", "ai_use_cases", "competitor_analysis"],
+        optional=["industry_trends", "ai_use_cases", "competitor_analysis"], timeout=PHASE3_TIMEOUT,
+    ),
+    Node("ai_integration", suggest_ai_integration, ["company_data", "ai_strategy"], timeout=PHASE3_TIMEOUT),
+    Node("revenue_opportunities", identify_revenue_opportunities, ["company_data", "ai_strategy"], timeout=PHASE3_TIMEOUT),
+    Node(
+        "report", generate_report, ["company_name", "ai_strategy", "ai_integration", "revenue_opportunities", "report_path"],
+        optional=["ai_integration", "revenue_opportunities"], defaults={"report_path": None}, memo=False,
+    ),
+])
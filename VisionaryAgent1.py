@@ -1,47 +1,41 @@
 import os
-from phi.agent import Agent
-from phi.tools.firecrawl import FirecrawlTools
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.model.openai import OpenAIChat
-from phi.knowledge.pdf import PDFUrlKnowledgeBase
-from phi.embedder.openai import OpenAIEmbedder
-from phi.vectordb.lancedb import LanceDb, SearchType
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-import helium
-from typing import List
+import re
+import uuid
+from typing import List, Optional, TYPE_CHECKING
 from pydantic import BaseModel, Field
-from fastapi import UploadFile
-from selenium import webdriver
-import helium
-from selenium.webdriver.chrome.service import Service
+import markdown2
+import pdfkit
+from agent_registry import DEFAULT_PARTITION, LazyRegistry, PartitionPool
+from agent_runtime import run_agent
+from compaction import compact
+from context_builder import build_context
+from model_router import chat_model
+from rate_limits import rate_limited
+from retrieval import RETRIEVAL_MODE
+from schemas import AIStrategy, AIUseCases, CompanySummary, CompetitorAnalysis, IndustryTrends, IntegrationPlan, RevenueOpportunities, as_markdown, as_prompt
+
+if TYPE_CHECKING:
+    from fastapi import UploadFile
 
 # Set paths explicitly
 CHROME_PATH = "/usr/bin/chromium-browser"
 CHROMEDRIVER_PATH = "/usr/local/bin/chromedriver"
 
-# Configure Chrome options for Hugging Face Spaces
-chrome_options = webdriver.ChromeOptions()
-chrome_options.binary_location = CHROME_PATH  # Manually specify Chromium binary
-chrome_options.add_argument("--headless")  # Run in headless mode
-chrome_options.add_argument("--no-sandbox")  # Required for Hugging Face Spaces
-chrome_options.add_argument("--disable-dev-shm-usage")  # Prevents memory issues
-chrome_options.add_argument("--disable-gpu")  # Disable GPU acceleration
-chrome_options.add_argument("--remote-debugging-port=9222")  # Helps debugging
-
-# Initialize Chrome WebDriver with the correct service path
-service = Service(CHROMEDRIVER_PATH)
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-# Start Helium using the modified driver
-helium.set_driver(driver)
-
 
 # Load environment variables (API keys, etc.)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Agents, Chrome and the knowledge base are built on first use, so importing this
+# module (and every Streamlit worker restart) stays fast and never starts a browser
+agents = LazyRegistry()
+
+def __getattr__(name: str):
+    # Keeps `VisionaryAgent1.knowledge_base` style access working without eager construction
+    if name in agents:
+        return agents.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 #####################################################################################
 #                                    PHASE 1                                        #
 #####################################################################################
@@ -50,92 +44,134 @@ load_dotenv()
 ##############################
 # 1️⃣ Company Search Agent   #
 ##############################
-company_search_agent = Agent(
-    name="Company Search Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Finds company details based on name using web search.",
-    instructions=["Always include sources in search results."],
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def search_company(company_name: str):
+@agents.register("company_search_agent")
+def build_company_search_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    return Agent(
+        name="Company Search Agent",
+        model=chat_model("Company Search Agent"),
+        tools=[rate_limited(DuckDuckGo(), "duckduckgo")],
+        description="Finds company details based on name using web search.",
+        instructions=["Always include sources in search results."],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def search_company(company_name: str, stream: bool = False):
     query = f"Find detailed company information for {company_name}. Extract its official website, mission, services, and any AI-related initiatives. Prioritize official sources and provide links where available."
-    return company_search_agent.print_response(query)
+    return run_agent(agents.get("company_search_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ Website Scraper Agent   #
 ##############################
-firecrawl_agent = Agent(
-    name="Website Scraper Agent",
-    tools=[FirecrawlTools(scrape=True, crawl=False)],
-    description="Extracts content from company websites.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def scrape_website(url: str):
-    return firecrawl_agent.print_response(f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.")
-
-# Helium for dynamic websites
-# chrome_options = webdriver.ChromeOptions()
-# chrome_options.add_argument("--headless")
-driver = helium.start_chrome(headless=True, options=chrome_options)
+@agents.register("firecrawl_agent")
+def build_firecrawl_agent():
+    from phi.agent import Agent
+    from phi.tools.firecrawl import FirecrawlTools
+    return Agent(
+        name="Website Scraper Agent",
+        model=chat_model("Website Scraper Agent"),
+        tools=[FirecrawlTools(scrape=True, crawl=False)],
+        description="Extracts content from company websites.",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def scrape_website(url: str, stream: bool = False):
+    return run_agent(agents.get("firecrawl_agent"), f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.", stream=stream)
+
+# Pooled headless Chrome for dynamic websites: each session checks out its own driver
+@agents.register("browser_pool")
+def build_browser_pool():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from browser_pool import BrowserPool, chrome_options
+
+    # Chromium lives at fixed paths on Hugging Face Spaces. No fixed
+    # --remote-debugging-port: pooled browsers would fight over it
+    def start_chrome():
+        service = Service(CHROMEDRIVER_PATH)
+        return webdriver.Chrome(service=service, options=chrome_options(binary_location=CHROME_PATH))
+
+    return BrowserPool(driver_factory=start_chrome)
 
 def scrape_dynamic_website(url: str):
-    helium.go_to(url)
-    text = helium.get_driver().page_source
-    return text
+    return agents.get("browser_pool").fetch(url)
 
 
 ##############################
 # 3️⃣ Text Processing Agent   #
 ##############################
-class CompanySummary(BaseModel):
-    summary: str = Field(..., description="Summarized company details based on user input.")
+@agents.register("text_processing_agent")
+def build_text_processing_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Text Processing Agent",
+        model=chat_model("Text Processing Agent"),
+        description="Summarizes user-written company descriptions.",
+        response_model=CompanySummary,
+    )
 
-text_processing_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    description="Summarizes user-written company descriptions.",
-    response_model=CompanySummary,
-)
-
-def process_company_description(text: str):
-    return text_processing_agent.print_response(f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.")
+def process_company_description(text: str, stream: bool = False):
+    return run_agent(agents.get("text_processing_agent"), f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.", stream=stream)
 
 
 #################################
 # 4️⃣ Document Processing Agent  #
 #################################
-# LanceDB for storing extracted knowledge
-knowledge_base = PDFUrlKnowledgeBase(
-    urls=[],  # PDFs will be dynamically added
-    vector_db=LanceDb(
-        table_name="company_docs",
-        uri="tmp/lancedb",
-        search_type=SearchType.vector,
-        embedder=OpenAIEmbedder(model="text-embedding-3-small"),
-    ),
-)
-knowledge_base.load(recreate=False)
-
-document_processing_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    knowledge=knowledge_base,
-    description="Extracts and processes data from uploaded PDFs/PPTs.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def process_uploaded_document(file: UploadFile):
+# LanceDB for storing extracted knowledge, one table per company or session so
+# retrieval never scans (or returns) another tenant's documents
+def build_knowledge_base(partition: str):
+    from phi.knowledge.pdf import PDFUrlKnowledgeBase
+    from http_clients import openai_embedder
+    from phi.vectordb.lancedb import LanceDb, SearchType
+    knowledge_base = PDFUrlKnowledgeBase(
+        urls=[],  # PDFs will be dynamically added
+        vector_db=LanceDb(
+            # The default partition keeps the pre-partitioning table name
+            table_name="company_docs" if partition == DEFAULT_PARTITION else f"company_docs_{partition}",
+            uri="tmp/lancedb",
+            # Hybrid adds a full-text index and fuses both rankings with LanceDB's default RRF reranker;
+            # the native FTS index avoids a tantivy dependency
+            search_type=SearchType(RETRIEVAL_MODE),
+            use_tantivy=False,
+            embedder=openai_embedder("text-embedding-3-small"),
+        ),
+    )
+    knowledge_base.load(recreate=False)
+    return knowledge_base
+
+def build_document_processing_agent(partition: str):
+    from phi.agent import Agent
+    return Agent(
+        name="Document Processing Agent",
+        model=chat_model("Document Processing Agent"),
+        knowledge=knowledge_bases.get(partition),
+        description="Extracts and processes data from uploaded PDFs/PPTs.",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+knowledge_bases = PartitionPool(build_knowledge_base)
+document_agents = PartitionPool(build_document_processing_agent)
+
+@agents.register("knowledge_base")
+def build_default_knowledge_base():
+    return knowledge_bases.get(DEFAULT_PARTITION)
+
+@agents.register("document_processing_agent")
+def build_default_document_processing_agent():
+    return document_agents.get(DEFAULT_PARTITION)
+
+def process_uploaded_document(file: "UploadFile", partition: str = DEFAULT_PARTITION):
     file_path = f"tmp/{file.filename}"
     with open(file_path, "wb") as buffer:
         buffer.write(file.file.read())
     
-    knowledge_base.load(recreate=False)
-    return document_processing_agent.print_response(f"Analyze and extract key insights from the uploaded document: {file.filename}. Summarize business operations, AI-related discussions, financial details, and relevant strategic insights.")
+    knowledge_bases.get(partition).load(recreate=False)
+    return run_agent(document_agents.get(partition), f"Analyze and extract key insights from the uploaded document: {file.filename}. Summarize business operations, AI-related discussions, financial details, and relevant strategic insights.")
 
 
 #####################################################################################
@@ -163,67 +199,76 @@ def process_uploaded_document(file: UploadFile):
     # process_uploaded_document(uploaded_file)
 
 
-    import os
-from phi.agent import Agent
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.tools.exa import ExaTools
-from phi.model.openai import OpenAIChat
-from typing import List
-from pydantic import BaseModel, Field
-
-# Load environment variables (API keys, etc.)
-from dotenv import load_dotenv
-load_dotenv()
-
 ##############################
 # 1️⃣ Industry Trends Agent  #
 ##############################
-industry_trends_agent = Agent(
-    name="Industry Trends Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"])],
-    description="Finds the latest AI advancements in a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_industry_trends(industry: str):
+@agents.register("industry_trends_agent")
+def build_industry_trends_agent():
+    from phi.agent import Agent
+    from phi.tools.exa import ExaTools
+    return Agent(
+        name="Industry Trends Agent",
+        model=chat_model("Industry Trends Agent"),
+        tools=[rate_limited(ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"]), "exa")],
+        description="Finds the latest AI advancements in a given industry.",
+        show_tool_calls=True,
+        response_model=IndustryTrends,
+        structured_outputs=True,
+    )
+
+def get_industry_trends(industry: str, stream: bool = False):
     query = f"Find the latest AI advancements, innovations, and emerging technologies in the {industry} sector. Include breakthroughs, adoption trends, and notable implementations by leading companies. Provide references and insights from credible sources."
-    return industry_trends_agent.print_response(query)
+    return run_agent(agents.get("industry_trends_agent"), query, stream=stream)
 
 
 ##################################
 # 2️⃣ AI Use Case Discovery Agent #
 ##################################
-ai_use_case_agent = Agent(
-    name="AI Use Case Discovery Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Identifies AI applications relevant to a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_ai_use_cases(industry: str):
+@agents.register("ai_use_case_agent")
+def build_ai_use_case_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="AI Use Case Discovery Agent",
+        model=chat_model("AI Use Case Discovery Agent"),
+        # Exa answers in place of DuckDuckGo when a search runs past DuckDuckGo's usual p90
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(), "exa"))],
+        description="Identifies AI applications relevant to a given industry.",
+        show_tool_calls=True,
+        response_model=AIUseCases,
+        structured_outputs=True,
+    )
+
+def get_ai_use_cases(industry: str, stream: bool = False):
     query = f"Identify the most impactful AI use cases in the {industry} sector. Include real-world applications, automation improvements, cost-saving innovations, and data-driven decision-making processes. Provide case studies and examples of successful AI implementation."
-    return ai_use_case_agent.print_response(query)
+    return run_agent(agents.get("ai_use_case_agent"), query, stream=stream)
 
 
 ####################################
 # 3️⃣ Competitive Analysis Agent   #
 ####################################
-competitive_analysis_agent = Agent(
-    name="Competitive Analysis Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo(), ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"])],
-    description="Analyzes how competitors are using AI in their businesses.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_competitor_ai_strategies(company_name: str):
+@agents.register("competitive_analysis_agent")
+def build_competitive_analysis_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="Competitive Analysis Agent",
+        model=chat_model("Competitive Analysis Agent"),
+        # One hedged search instead of two tools: the model no longer waits on whichever backend it picked
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"]), "exa"))],
+        description="Analyzes how competitors are using AI in their businesses.",
+        show_tool_calls=True,
+        response_model=CompetitorAnalysis,
+        structured_outputs=True,
+    )
+
+def get_competitor_ai_strategies(company_name: str, stream: bool = False):
     query = f"Analyze how {company_name} is leveraging AI in its business operations. Find recent reports, product innovations, automation strategies, and AI-driven transformations. Highlight competitive advantages gained through AI adoption. Provide references and sources."
-    return competitive_analysis_agent.print_response(query)
+    return run_agent(agents.get("competitive_analysis_agent"), query, stream=stream)
 
 
 ###########################
@@ -250,22 +295,42 @@ def get_competitor_ai_strategies(company_name: str):
 ##############################
 # 1️⃣ Reasoning Agent        #
 ##############################
-reasoning_agent = Agent(
-    name="Reasoning Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Processes all collected data and generates structured AI adoption strategies.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases: str, competitor_analysis: str):
+@agents.register("reasoning_agent")
+def build_reasoning_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Reasoning Agent",
+        model=chat_model("Reasoning Agent"),
+        description="Processes all collected data and generates structured AI adoption strategies.",
+        show_tool_calls=True,
+        response_model=AIStrategy,
+        structured_outputs=True,
+    )
+
+# Retrieval queries for each part of the strategy prompt; inputs are cut down to the
+# passages these match, within the context token budget
+STRATEGY_SECTIONS = [
+    "AI opportunities to enhance operations, customer experience and business efficiency",
+    "AI tools, models, platforms and methodologies that fit the company",
+    "implementation roadmap, costs, scalability, ROI and benchmarks",
+    "future scalability and long-term growth from AI adoption",
+]
+
+def generate_ai_strategy(company_data: str, industry_trends: IndustryTrends | str, ai_use_cases: AIUseCases | str, competitor_analysis: CompetitorAnalysis | str, stream: bool = False):
+    # Earlier phases' output is deduplicated and held to its stage budget before passages are picked
+    context = build_context({
+        "company_data": compact("company_data", as_prompt(company_data)),
+        "industry_trends": compact("industry_trends", as_prompt(industry_trends)),
+        "ai_use_cases": compact("ai_use_cases", as_prompt(ai_use_cases)),
+        "competitor_analysis": compact("competitor_analysis", as_prompt(competitor_analysis)),
+    }, STRATEGY_SECTIONS)
     query = f"""
     You are an AI business strategist analyzing a company's potential AI adoption. Given the following:
     
-    - **Company Overview:** {company_data}
-    - **Industry Trends:** {industry_trends}
-    - **AI Use Cases:** {ai_use_cases}
-    - **Competitor AI Strategies:** {competitor_analysis}
+    - **Company Overview:** {context["company_data"]}
+    - **Industry Trends:** {context["industry_trends"]}
+    - **AI Use Cases:** {context["ai_use_cases"]}
+    - **Competitor AI Strategies:** {context["competitor_analysis"]}
     
     Generate a structured AI adoption strategy that includes:
     1. **AI Opportunities**: Identify key areas where AI can enhance operations, customer experience, or business efficiency.
@@ -275,26 +340,39 @@ def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases:
     
     Provide structured insights with a logical flow and avoid generic statements. Use industry benchmarks where possible.
     """
-    return reasoning_agent.print_response(query)
+    return run_agent(agents.get("reasoning_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ AI Integration Advisor  #
 ##############################
-ai_integration_agent = Agent(
-    name="AI Integration Advisor",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Suggests AI implementation strategies based on industry insights and company operations.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def suggest_ai_integration(company_data: str, ai_strategy: str):
+@agents.register("ai_integration_agent")
+def build_ai_integration_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="AI Integration Advisor",
+        model=chat_model("AI Integration Advisor"),
+        description="Suggests AI implementation strategies based on industry insights and company operations.",
+        show_tool_calls=True,
+        response_model=IntegrationPlan,
+        structured_outputs=True,
+    )
+
+INTEGRATION_SECTIONS = [
+    "phased AI integration from pilot testing to full deployment",
+    "technology, infrastructure, AI tools, cloud platforms and software",
+    "workforce, training and upskilling employees",
+    "risk, data security, compliance and ethical concerns",
+    "KPIs and measurable AI performance indicators",
+]
+
+def suggest_ai_integration(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, INTEGRATION_SECTIONS)
     query = f"""
     Based on the AI adoption strategy:
     
-    - **Company Context:** {company_data}
-    - **AI Strategy Summary:** {ai_strategy}
+    - **Company Context:** {context["company_data"]}
+    - **AI Strategy Summary:** {context["ai_strategy"]}
     
     Provide a structured AI implementation plan:
     1. **Step-by-step AI Integration**: List phases of AI adoption, from pilot testing to full deployment.
@@ -305,26 +383,38 @@ def suggest_ai_integration(company_data: str, ai_strategy: str):
     
     The output should be detailed, actionable, and specific to the business domain.
     """
-    return ai_integration_agent.print_response(query)
+    return run_agent(agents.get("ai_integration_agent"), query, stream=stream)
 
 
 ##############################
 # 3️⃣ Revenue Growth Agent    #
 ##############################
-revenue_growth_agent = Agent(
-    name="Revenue Growth Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def identify_revenue_opportunities(company_data: str, ai_strategy: str):
+@agents.register("revenue_growth_agent")
+def build_revenue_growth_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Revenue Growth Agent",
+        model=chat_model("Revenue Growth Agent"),
+        description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
+        show_tool_calls=True,
+        response_model=RevenueOpportunities,
+        structured_outputs=True,
+    )
+
+REVENUE_SECTIONS = [
+    "AI monetization, new revenue streams, AI-driven products, services and data",
+    "cost reduction, automation and operational efficiency gains",
+    "market expansion, new markets and scaling offerings",
+    "competitive positioning, industry leaders and differentiation",
+]
+
+def identify_revenue_opportunities(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, REVENUE_SECTIONS)
     query = f"""
     You are an AI business analyst tasked with identifying AI-driven revenue growth opportunities for:
     
-    - **Company Overview:** {company_data}
-    - **AI Strategy:** {ai_strategy}
+    - **Company Overview:** {context["company_data"]}
+    - **AI Strategy:** {context["ai_strategy"]}
     
     Provide:
     1. **AI Monetization Strategies**: Explain how AI can create new revenue streams (e.g., AI-driven products, services, or data monetization).
@@ -334,34 +424,41 @@ def identify_revenue_opportunities(company_data: str, ai_strategy: str):
     
     Ensure detailed, actionable insights with real-world examples where applicable.
     """
-    return revenue_growth_agent.print_response(query)
+    return run_agent(agents.get("revenue_growth_agent"), query, stream=stream)
 
 
 ##############################
 # 4️⃣ Report Generation Agent #
 ##############################
-def generate_report(company_name: str, ai_strategy: str, ai_integration: str, revenue_opportunities: str):
-    report_content = f"""
-    # AI Strategy Report for {company_name}
-    
-    ## AI Adoption Strategy
-    {ai_strategy}
-    
-    ## AI Implementation Plan
-    {ai_integration}
-    
-    ## Revenue Growth Opportunities
-    {revenue_opportunities}
-    
-    """
+# Every report gets its own folder here, so reports for the same company never overwrite each other
+REPORTS_DIR = os.getenv("VISIONARY_REPORTS_DIR", "tmp/reports")
+
+def new_report_path(company_name: str, folder: Optional[str] = None) -> str:
+    # The company name is user input: keep only a safe file name, and never a path
+    safe_name = re.sub(r"[^\w.-]+", "_", company_name).strip("._") or "company"
+    return os.path.join(REPORTS_DIR, folder or uuid.uuid4().hex, f"{safe_name}_AI_Report.pdf")
+
+def generate_report(company_name: str, ai_strategy: AIStrategy | str, ai_integration: IntegrationPlan | str, revenue_opportunities: RevenueOpportunities | str, report_path: Optional[str] = None):
+    report_path = report_path or new_report_path(company_name)
+    # Sections render from the structured results; joined flush-left so markdown2 does not read them as code
+    report_content = "\n\n".join([
+        f"# AI Strategy Report for {company_name}",
+        "## AI Adoption Strategy",
+        as_markdown(ai_strategy),
+        "## AI Implementation Plan",
+        as_markdown(ai_integration),
+        "## Revenue Growth Opportunities",
+        as_markdown(revenue_opportunities),
+    ])
     
     # Convert to Markdown
     markdown_report = markdown2.markdown(report_content)
     
     # Convert Markdown to PDF
-    pdfkit.from_string(markdown_report, f"{company_name}_AI_Report.pdf")
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    pdfkit.from_string(markdown_report, report_path)
     
-    return f"Report generated: {company_name}_AI_Report.pdf"
+    return f"Report generated: {report_path}"
 
 
 ###########################
@@ -0,0 +1,108 @@
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_PARTITION = "default"
+
+
+##############################
+# Lazy Registry              #
+##############################
+class LazyRegistry:
+    # Agents, clients, browsers and indexes are built on first use and reused afterwards,
+    # so importing a module never pays for objects a process does not need
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def register(self, name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+        def decorator(factory: Callable[[], Any]) -> Callable[[], Any]:
+            with self._guard:
+                self._factories[name] = factory
+                self._locks[name] = threading.Lock()
+            return factory
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"Nothing registered under {name!r}")
+        # Per-name lock: two sessions asking at once must not build two browsers
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+        return self._instances[name]
+
+    def built(self) -> List[str]:
+        return list(self._instances)
+
+    def reset(self, name: Optional[str] = None):
+        with self._guard:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+##############################
+# Partition Pool             #
+##############################
+def partition_key(name: Optional[str]) -> str:
+    """Filesystem- and table-safe key for a company or session name.
+
+    The digest suffix keeps names that slug alike ("Acme Inc" / "acme-inc") apart.
+    """
+    name = (name or "").strip()
+    if not name or name == DEFAULT_PARTITION:
+        return DEFAULT_PARTITION
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")[:40] or "p"
+    return f"{slug}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+
+class PartitionPool:
+    # One object per tenant partition, built on demand. Only the `max_open` most recently
+    # used stay referenced; evicted ones are dropped rather than closed, so a caller still
+    # holding one finishes its work and the memory goes when the last reference does
+    def __init__(self, factory: Callable[[str], Any], max_open: int = 8):
+        self._factory = factory
+        self.max_open = max_open
+        self._open: "OrderedDict[str, Any]" = OrderedDict()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, name: Optional[str]) -> Any:
+        key = partition_key(name)
+        with self._guard:
+            if key in self._open:
+                self._open.move_to_end(key)
+                return self._open[key]
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            with self._guard:
+                if key in self._open:
+                    return self._open[key]
+            instance = self._factory(key)
+            with self._guard:
+                self._open[key] = instance
+                self.loads += 1
+                while len(self._open) > self.max_open:
+                    self._open.popitem(last=False)
+                    self.evictions += 1
+        return instance
+
+    def loaded(self) -> List[str]:
+        return list(self._open)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"open": len(self._open), "loads": self.loads, "evictions": self.evictions}
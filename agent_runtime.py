@@ -0,0 +1,237 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from model_router import model_router
+from orchestration import check_deadline, deadline
+from response_cache import agent_cache_key, response_cache
+from schemas import as_markdown, render_partial
+from single_flight import coalesce, normalize_input
+
+if TYPE_CHECKING:
+    from phi.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+# Seconds one agent call (model turns and tool calls) may take; 0 for no limit
+AGENT_TIMEOUT = float(os.getenv("VISIONARY_AGENT_TIMEOUT", 300))
+
+
+##############################
+# Agent Execution            #
+##############################
+def route(agent: "Agent") -> Tuple["Agent", Optional[str]]:
+    # An agent whose model is breaching its latency SLO runs on the next tier down for a while;
+    # routing comes first so a fallback answer is cached under the model that produced it
+    primary = getattr(agent.model, "id", None)
+    model = model_router.route(agent.name, primary) if primary else primary
+    return (agent if model == primary else model_router.variant(agent, model)), model
+
+
+def run_agent(agent: "Agent", query: str, stream: bool = False):
+    """Answer `query` with `agent`; with `stream=True` an AgentStream is returned instead of the answer."""
+    if stream:
+        return stream_agent(agent, query)
+    runner, model = route(agent)
+
+    # Identical prompts to the same agent setup are answered from the local cache
+    use_cache = response_cache.enabled_for(runner)
+    if use_cache:
+        key = agent_cache_key(runner, query)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    def call():
+        # Return the answer instead of printing it so callers can combine, store and display results
+        check_deadline(agent.name)
+        started = time.monotonic()
+        try:
+            # Model requests and tool calls check the deadline, so an overrunning agent stops at its next step
+            with deadline(AGENT_TIMEOUT or None):
+                response = runner.run(query)
+        except Exception:
+            model_router.record(agent.name, model, time.monotonic() - started, ok=False)
+            raise
+        model_router.record(agent.name, model, time.monotonic() - started, response)
+        if use_cache and response.content is not None:
+            response_cache.set(key, response.content, agent.name)
+        return response.content
+
+    # Concurrent sessions asking the same thing share one in-flight call
+    return coalesce(agent_cache_key(runner, normalize_input(query)), call)
+
+
+##############################
+# Streaming                  #
+##############################
+class AgentStream:
+    """An answer rendered as markdown while it is generated.
+
+    Iterating yields the whole text so far after every token rather than the delta,
+    because structured answers arrive as JSON and are re-rendered as they grow.
+    Once iteration ends, `result` holds the same value the blocking call returns.
+    """
+
+    def __init__(self, produce: Callable[["AgentStream"], Iterator[str]]):
+        self._produce = produce
+        self._callbacks: List[Callable[[Any], None]] = []
+        self.result: Any = None
+        self.done = False
+
+    @classmethod
+    def of(cls, result: Any) -> "AgentStream":
+        # An answer that is already known (a cache hit) streams as one piece
+        def produce(stream: "AgentStream") -> Iterator[str]:
+            yield as_markdown(result)
+            stream.finish(result)
+        return cls(produce)
+
+    def on_done(self, callback: Callable[[Any], None]) -> "AgentStream":
+        self._callbacks.append(callback)
+        return self
+
+    def finish(self, result: Any):
+        self.result = result
+        self.done = True
+        for callback in self._callbacks:
+            callback(result)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.done:
+            yield as_markdown(self.result)
+            return
+        yield from self._produce(self)
+
+    def collect(self) -> Any:
+        for _ in self:
+            pass
+        return self.result
+
+
+def strict_json_schema(schema: Any, defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Make a pydantic JSON schema acceptable to OpenAI's strict structured outputs.
+
+    Every object is closed and requires all its properties, defaults are dropped, and a
+    `$ref` that carries other keys (e.g. a field description) is inlined, since strict mode
+    only accepts a bare `$ref`.
+    """
+    if isinstance(schema, list):
+        return [strict_json_schema(item, defs) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    defs = schema.get("$defs", {}) if defs is None else defs
+    ref = schema.get("$ref")
+    if ref is not None and len(schema) > 1:
+        target = defs[ref.split("/")[-1]]
+        return strict_json_schema({**target, **{key: value for key, value in schema.items() if key != "$ref"}}, defs)
+    strict: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == "default":
+            continue
+        if key in ("properties", "$defs"):
+            strict[key] = {name: strict_json_schema(sub, defs) for name, sub in value.items()}
+        else:
+            strict[key] = strict_json_schema(value, defs)
+    if strict.get("type") == "object":
+        strict["additionalProperties"] = False
+        strict["required"] = list(strict.get("properties", {}))
+    return strict
+
+
+def json_schema_format(response_model: type) -> Dict[str, Any]:
+    # The strict schema OpenAI's parse() would send, as a plain response_format the streaming endpoint accepts
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": response_model.__name__, "schema": strict_json_schema(response_model.model_json_schema()), "strict": True},
+    }
+
+
+_streaming_variants: Dict[int, Tuple["Agent", "Agent"]] = {}
+_streaming_lock = threading.Lock()
+
+
+def streaming_variant(agent: "Agent") -> "Agent":
+    # phi never streams an agent that has a response_model, so structured agents stream from a copy
+    # that asks for the same schema as raw JSON; the answer is validated into the model at the end
+    if agent.response_model is None:
+        return agent
+    with _streaming_lock:
+        if id(agent) not in _streaming_variants:
+            from http_clients import openai_chat
+            model = openai_chat(agent.model.id, response_format=json_schema_format(agent.response_model))
+            copy = agent.deep_copy(update={"model": model, "response_model": None, "structured_outputs": False, "show_tool_calls": False})
+            _streaming_variants[id(agent)] = (agent, copy)
+        return _streaming_variants[id(agent)][1]
+
+
+def steps_within(chunks: Iterable[Any], seconds: Optional[float]) -> Iterator[Any]:
+    # Each step of a lazily consumed stream runs under one shared deadline, which is not left
+    # set in the consumer's context between steps
+    at = None if seconds is None else time.monotonic() + seconds
+    iterator = iter(chunks)
+    while True:
+        with deadline(None if at is None else at - time.monotonic()):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+def stream_agent(agent: "Agent", query: str) -> AgentStream:
+    """Stream an agent's answer; cached under the same key as run_agent, so either call can reuse the other's.
+
+    Streams are not coalesced: every caller renders its own tokens.
+    """
+    check_deadline(agent.name)
+    runner, model = route(agent)
+    use_cache = response_cache.enabled_for(runner)
+    key = agent_cache_key(runner, query) if use_cache else None
+    cached = response_cache.get(key) if use_cache else None
+    if cached is not None:
+        return AgentStream.of(cached)
+    response_model = runner.response_model
+
+    def produce(stream: AgentStream) -> Iterator[str]:
+        import jiter
+        streamer = streaming_variant(runner)
+        text, first_token = "", None
+        started = time.monotonic()
+        try:
+            # Bounded like run_agent: model requests and tool calls made while streaming check the deadline
+            for chunk in steps_within(streamer.run(query, stream=True), AGENT_TIMEOUT or None):
+                if not isinstance(chunk.content, str) or not chunk.content:
+                    continue
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                text += chunk.content
+                if response_model is None:
+                    yield text
+                    continue
+                try:
+                    yield render_partial(jiter.from_json(text.encode("utf-8"), partial_mode="trailing-strings"))
+                except ValueError:
+                    # Not even a partial object yet (e.g. only the opening brace)
+                    pass
+        except Exception:
+            model_router.record(agent.name, model, time.monotonic() - started, ok=False, first_token=first_token)
+            raise
+        model_router.record(agent.name, model, time.monotonic() - started, streamer.run_response, first_token=first_token)
+
+        result: Any = text
+        cacheable = bool(text)
+        if response_model is not None:
+            try:
+                result = response_model.model_validate_json(text)
+            except ValueError as e:
+                # Shown as text, but not cached where run_agent would expect the model
+                logger.warning(f"{agent.name} streamed JSON that does not match {response_model.__name__}: {e}")
+                cacheable = False
+        if use_cache and cacheable:
+            response_cache.set(key, result, agent.name)
+        yield as_markdown(result)
+        stream.finish(result)
+
+    return AgentStream(produce)
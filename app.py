@@ -2,9 +2,19 @@ import streamlit as st
 import pandas as pd
 import json
 import os
-from VisionaryAgent import search_company, scrape_website, process_company_description, process_uploaded_document
+import uuid
+from VisionaryAgent import search_company, scrape_website, process_company_description, process_uploaded_document, document_company_data
 from VisionaryAgent import get_industry_trends, get_ai_use_cases, get_competitor_ai_strategies
-from VisionaryAgent import generate_ai_strategy, suggest_ai_integration, identify_revenue_opportunities, generate_report
+from VisionaryAgent import generate_ai_strategy, suggest_ai_integration, identify_revenue_opportunities, generate_report, strategy_pipeline
+from semantic_cache import research_cache
+from embedding_cache import embedding_cache
+from compaction import token_ledger
+from model_router import model_router
+from http_clients import http_stats
+from rate_limits import rate_limit_stats
+from search_tools import search_latency
+from pipeline import pipeline_store
+from schemas import as_jsonable, as_markdown
 
 # Define data storage paths
 CSV_FILE = "user_data.csv"
@@ -30,11 +40,57 @@ def save_data_json(data):
     with open(JSON_FILE, "w") as file:
         json.dump(existing_data, file, indent=4)
 
+# Render an answer while it is generated, then its finished form, and return the answer
+def show_stream(stream):
+    placeholder = st.empty()
+    for text in stream:
+        placeholder.markdown(text)
+    placeholder.markdown(as_markdown(stream.result))
+    return stream.result
+
+# Drop session results computed from inputs that have since changed; the pipeline memo still holds them
+def forget_changed(params):
+    previous = st.session_state.get("params", {})
+    changed = [name for name, value in params.items() if previous.get(name) != value]
+    for name in strategy_pipeline.downstream(changed):
+        st.session_state.pop(name, None)
+    st.session_state["params"] = params
+
+# Run pipeline nodes up to `targets`, reusing session and memoized results, and keep the outputs in the session
+def run_pipeline(params, targets):
+    placeholder = st.empty()
+    progress = {}
+    def on_progress(node, status):
+        progress[node] = status
+        placeholder.markdown("\n".join(f"- {node}: {status}" for node, status in progress.items()))
+    known = {name: st.session_state[name] for name in strategy_pipeline.nodes if name in st.session_state and name != "report"}
+    run = strategy_pipeline.run({**known, **params}, targets=targets, on_progress=on_progress)
+    st.session_state.update(run.results)
+    for name, error in run.errors.items():
+        st.warning(f"{name} failed: {error}")
+    return run
+
 # Streamlit UI
 def main():
     st.title("Visionary AI  by Giant Analytics")
     st.write("Fill in the details to generate an AI-driven business strategy report.")
     st.write("It uses SOTA (State-of-the-Art) Reasoning Models to provide cutting-edge insights and AI integration strategies.")
+    st.sidebar.caption("Research cache")
+    st.sidebar.json(research_cache.stats)
+    st.sidebar.caption("Embedding cache")
+    st.sidebar.json(embedding_cache.stats)
+    st.sidebar.caption("Stage payload tokens")
+    st.sidebar.json(token_ledger.stats)
+    st.sidebar.caption("Model routing (last 24h)")
+    st.sidebar.json(model_router.stats)
+    st.sidebar.caption("OpenAI connection pool")
+    st.sidebar.json(http_stats())
+    st.sidebar.caption("Provider rate limits")
+    st.sidebar.json(rate_limit_stats())
+    st.sidebar.caption("Search hedging")
+    st.sidebar.json(search_latency.stats)
+    st.sidebar.caption("Pipeline memo")
+    st.sidebar.json(pipeline_store.stats)
     # Collect User Information
     name = st.text_input("Name")
     email = st.text_input("Email")
@@ -45,73 +101,101 @@ def main():
     input_method = st.radio("How would you like to provide company details?", 
                             ("Search by Name", "Website URL", "Manual Description", "Upload Document"))
     
-    company_data = ""
+    state = st.session_state
     if input_method == "Search by Name":
         if st.button("Find Company Details"):
-            company_data = search_company(company_name)
-            st.write(company_data)
+            state["company_data"] = show_stream(search_company(company_name, stream=True))
     elif input_method == "Website URL":
         website_url = st.text_input("Enter Website URL")
         if st.button("Scrape Website"):
-            company_data = scrape_website(website_url)
-            st.write(company_data)
+            state["company_data"] = show_stream(scrape_website(website_url, stream=True))
     elif input_method == "Manual Description":
-        company_data = st.text_area("Enter Company Description")
+        description = st.text_area("Enter Company Description")
         if st.button("Process Description"):
-            company_data = process_company_description(company_data)
-            st.write(company_data)
+            state["company_data"] = show_stream(process_company_description(description, stream=True))
+        elif description and not state.get("company_data"):
+            state["company_data"] = description
     elif input_method == "Upload Document":
         uploaded_file = st.file_uploader("Upload PDF or PPT", type=["pdf", "pptx"])
         if uploaded_file is not None:
-            company_data = process_uploaded_document(uploaded_file)
-            st.write(company_data)
+            # Documents are indexed per company (or per session without a name), never in a shared index
+            partition = company_name or state.setdefault("session_id", uuid.uuid4().hex)
+            # Streamlit reruns this script on every widget change; index each file only once per partition
+            upload_key = f"{partition}:{uploaded_file.name}:{uploaded_file.size}"
+            if state.get("ingested_upload") != upload_key:
+                process_uploaded_document(uploaded_file, partition=partition)
+                # The passages describing the company, not the ingest status, feed the strategy
+                state["company_data"] = document_company_data(partition)
+                state["ingested_upload"] = upload_key
+            st.markdown(as_markdown(state["company_data"]))
     
+    company_data = state.get("company_data")
     if company_data:
         industry = st.text_input("Industry Type (e.g., Healthcare, Finance)")
+        competitor = st.text_input("Enter Competitor Name")
+        # Stage results live in the session, so later buttons see what earlier ones computed across reruns
+        params = {"company_name": company_name, "company_data": company_data, "industry": industry, "competitor": competitor}
+        forget_changed(params)
+        updated = False
+        if st.button("Run All Industry Research"):
+            phase2 = run_pipeline(params, ["industry_trends", "ai_use_cases", "competitor_analysis"])
+            for stage in ("industry_trends", "ai_use_cases", "competitor_analysis"):
+                st.markdown(as_markdown(phase2.results.get(stage)))
+            updated = True
+        
         if st.button("Analyze Industry Trends"):
-            industry_trends = get_industry_trends(industry)
-            st.write(industry_trends)
+            state["industry_trends"] = show_stream(get_industry_trends(industry, stream=True))
+            updated = True
         
         if st.button("Find AI Use Cases"):
-            ai_use_cases = get_ai_use_cases(industry)
-            st.write(ai_use_cases)
+            state["ai_use_cases"] = show_stream(get_ai_use_cases(industry, stream=True))
+            updated = True
         
-        competitor = st.text_input("Enter Competitor Name")
         if st.button("Analyze Competitor AI Strategies"):
-            competitor_analysis = get_competitor_ai_strategies(competitor)
-            st.write(competitor_analysis)
+            state["competitor_analysis"] = show_stream(get_competitor_ai_strategies(competitor, stream=True))
+            updated = True
+        
+        if st.button("Generate Full Strategy Report"):
+            phase3 = run_pipeline(params, ["report"])
+            for stage in ("ai_strategy", "ai_integration", "revenue_opportunities"):
+                st.markdown(as_markdown(phase3.results.get(stage)))
+            if "report" in phase3.results:
+                st.success(f"Report Generated: {phase3.results['report']}")
+            updated = True
         
         if st.button("Generate AI Strategy"):
-            ai_strategy = generate_ai_strategy(company_data, industry_trends, ai_use_cases, competitor_analysis)
-            st.write(ai_strategy)
+            state["ai_strategy"] = show_stream(generate_ai_strategy(company_data, state.get("industry_trends"), state.get("ai_use_cases"), state.get("competitor_analysis"), stream=True))
+            updated = True
         
         if st.button("Suggest AI Integration Plan"):
-            ai_integration = suggest_ai_integration(company_data, ai_strategy)
-            st.write(ai_integration)
+            state["ai_integration"] = show_stream(suggest_ai_integration(company_data, state.get("ai_strategy"), stream=True))
+            updated = True
         
         if st.button("Identify Revenue Growth Opportunities"):
-            revenue_opportunities = identify_revenue_opportunities(company_data, ai_strategy)
-            st.write(revenue_opportunities)
+            state["revenue_opportunities"] = show_stream(identify_revenue_opportunities(company_data, state.get("ai_strategy"), stream=True))
+            updated = True
         
         if st.button("Generate Final Report"):
-            report_filename = generate_report(company_name, ai_strategy, ai_integration, revenue_opportunities)
+            report_filename = generate_report(company_name, state.get("ai_strategy"), state.get("ai_integration"), state.get("revenue_opportunities"))
             st.success(f"Report Generated: {report_filename}")
             
-        # Save data to backend
-        user_data = {
-            "name": name,
-            "email": email,
-            "mobile": mobile,
-            "company_name": company_name,
-            "company_data": company_data,
-            "industry": industry,
-            "competitor": competitor,
-            "ai_strategy": ai_strategy,
-            "ai_integration": ai_integration,
-            "revenue_opportunities": revenue_opportunities
-        }
-        save_data_csv(user_data)
-        save_data_json(user_data)
+        # Save data to backend once per new result, not on every rerun
+        if updated:
+            user_data = {
+                "name": name,
+                "email": email,
+                "mobile": mobile,
+                "company_name": company_name,
+                "company_data": company_data,
+                "industry": industry,
+                "competitor": competitor,
+                "ai_strategy": state.get("ai_strategy"),
+                "ai_integration": state.get("ai_integration"),
+                "revenue_opportunities": state.get("revenue_opportunities")
+            }
+            user_data = {key: as_jsonable(value) for key, value in user_data.items()}
+            save_data_csv(user_data)
+            save_data_json(user_data)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""Generate strategy reports for many companies without the UI.
+
+Run from the repository root:
+    python -m batch prospects.csv [--concurrency 4] [--checkpoint tmp/batch_checkpoint.jsonl]
+
+The input is a CSV with a header row, or JSONL with one object per line. Each
+row needs `company_name` and `industry`, and may set `competitor`, `website`
+(scraped instead of searching by name) or `description` (used instead of a
+search). Every row runs VisionaryAgent.strategy_pipeline end to end in the
+rate limiter's batch lane, sharing the process's caches, connection pool and
+rate limits with the other rows.
+
+Finished rows are appended to the checkpoint file; a rerun skips them and
+retries the rest, whose completed steps come back from the pipeline memo. A
+summary with throughput, per-stage latency and failures is printed at the end.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+from model_router import percentile
+from pipeline import Pipeline, PipelineRun, fingerprint
+from rate_limits import lane
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("VISIONARY_BATCH_CONCURRENCY", 4))  # companies in flight at once
+BATCH_CHECKPOINT = os.getenv("VISIONARY_BATCH_CHECKPOINT", "tmp/batch_checkpoint.jsonl")
+
+
+##############################
+# Input Rows                 #
+##############################
+def read_rows(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in file if line.strip()]
+        else:
+            rows = list(csv.DictReader(file))
+    return [{k.strip().lower(): str(v).strip() for k, v in row.items() if k and v is not None} for row in rows]
+
+def pipeline_params(row: Dict[str, str]) -> Dict[str, Any]:
+    company_name = row.get("company_name") or row.get("company") or ""
+    if not company_name or not row.get("industry"):
+        raise ValueError("company_name and industry are required")
+    if row.get("website"):
+        input_method, company_source = "Website URL", row["website"]
+    elif row.get("description"):
+        input_method, company_source = "Manual Description", row["description"]
+    else:
+        input_method, company_source = "Search by Name", company_name
+    return {
+        "company_name": company_name,
+        "input_method": input_method,
+        "company_source": company_source,
+        "industry": row["industry"],
+        "competitor": row.get("competitor", ""),
+    }
+
+
+##############################
+# Checkpoint                 #
+##############################
+class Checkpoint:
+    """Append-only JSONL of finished rows, keyed by a hash of the row's parameters."""
+
+    def __init__(self, path: str = BATCH_CHECKPOINT):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by a crash
+                if entry.get("ok"):
+                    done[entry["key"]] = entry
+        return done
+
+    def record(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+
+##############################
+# Batch Runner               #
+##############################
+def run_row(pipeline: Pipeline, index: int, row: Dict[str, str]) -> Dict[str, Any]:
+    started = time.monotonic()
+    entry: Dict[str, Any] = {"row": index, "company": row.get("company_name") or row.get("company")}
+    try:
+        params = pipeline_params(row)
+        entry["key"] = fingerprint(params)
+        with lane("batch"):
+            run: PipelineRun = pipeline.run(params)
+    except Exception as e:
+        entry.update(ok=False, errors={"row": f"{type(e).__name__}: {e}"}, timings={}, cached=[])
+    else:
+        entry.update(
+            ok="report" in run.results,
+            report=run.results.get("report"),
+            errors=run.errors,
+            timings={name: round(seconds, 3) for name, seconds in run.timings.items()},
+            cached=run.cached,
+        )
+    entry["elapsed"] = round(time.monotonic() - started, 3)
+    return entry
+
+def summarize(entries: List[Dict[str, Any]], resumed: int, elapsed: float) -> Dict[str, Any]:
+    stages: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        for name, seconds in entry["timings"].items():
+            stages.setdefault(name, {"runs": [], "cached": 0, "failed": 0})["runs"].append(seconds)
+        for name in entry["cached"]:
+            stages.setdefault(name, {"runs": [], "cached": 0, "failed": 0})["cached"] += 1
+        for name in entry["errors"]:
+            if name == "row":
+                continue  # invalid input, listed under failures only
+            stages.setdefault(name, {"runs": [], "cached": 0, "failed": 0})["failed"] += 1
+    completed = sum(entry["ok"] for entry in entries)
+    return {
+        "rows": len(entries) + resumed,
+        "completed": completed,
+        "failed": len(entries) - completed,
+        "resumed_from_checkpoint": resumed,
+        "seconds": round(elapsed, 1),
+        "reports_per_minute": round(60 * completed / elapsed, 2) if elapsed else 0.0,
+        "row_p50_s": round(percentile([e["elapsed"] for e in entries], 0.5), 2),
+        "row_p95_s": round(percentile([e["elapsed"] for e in entries], 0.95), 2),
+        "stages": {
+            name: {
+                "computed": len(stage["runs"]),
+                "cached": stage["cached"],
+                "failed": stage["failed"],
+                "p50_s": round(percentile(stage["runs"], 0.5), 2),
+                "p95_s": round(percentile(stage["runs"], 0.95), 2),
+            }
+            for name, stage in stages.items()
+        },
+        "failures": [{"row": e["row"], "company": e["company"], "errors": e["errors"]} for e in entries if not e["ok"]],
+    }
+
+def run_batch(
+    rows: Iterable[Dict[str, str]],
+    pipeline: Optional[Pipeline] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Dict[str, Any]:
+    """Run the pipeline for every row not yet in the checkpoint, `concurrency` rows at a time."""
+    if pipeline is None:
+        from VisionaryAgent import strategy_pipeline
+        pipeline = strategy_pipeline
+    checkpoint = checkpoint or Checkpoint()
+    done = checkpoint.completed()
+    rows = list(rows)
+    todo = []
+    for index, row in enumerate(rows):
+        try:
+            key = fingerprint(pipeline_params(row))
+        except ValueError:
+            key = None  # reported as a failed row by run_row
+        if key not in done:
+            todo.append((index, row))
+    resumed = len(rows) - len(todo)
+    logger.info(f"{len(todo)} rows to run, {resumed} already in {checkpoint.path}")
+
+    entries: List[Dict[str, Any]] = []
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch")
+    try:
+        futures = [executor.submit(contextvars.copy_context().run, run_row, pipeline, index, row) for index, row in todo]
+        for future in as_completed(futures):
+            entry = future.result()
+            entries.append(entry)
+            if entry.get("key"):
+                checkpoint.record(entry)
+            status = "ok" if entry["ok"] else f"failed: {entry['errors']}"
+            logger.info(f"[{len(entries)}/{len(todo)}] {entry['company']} {status} ({entry['elapsed']:.1f}s)")
+    except KeyboardInterrupt:
+        # Rows in flight still finish before the process exits; their steps are memoized for the rerun
+        logger.warning("Interrupted; rerun with the same checkpoint to resume")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return summarize(entries, resumed, time.monotonic() - started)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or JSONL file of companies")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="companies in flight at once")
+    parser.add_argument("--checkpoint", default=BATCH_CHECKPOINT, help="JSONL of finished rows; rerun to resume")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", stream=sys.stderr)
+
+    summary = run_batch(read_rows(args.input), concurrency=args.concurrency, checkpoint=Checkpoint(args.checkpoint))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput of BrowserPool against a local static-site fixture.
+
+Run from the repository root:  python -m benchmarks.bench_browser_pool [--pages 40] [--sizes 1 2 4]
+
+The fixture server adds a fixed delay per HTML page (standing in for network
+latency) and serves heavy images, fonts and media that the pool should block.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from browser_pool import BrowserPool
+
+PAGE = """<!doctype html><html><head><title>Company {i}</title>
+<style>@font-face {{ font-family: Brand; src: url(brand.woff2); }} body {{ font-family: Brand; }}</style>
+</head><body><h1>Company {i}</h1>
+<p>We build AI-powered analytics for industry {i}.</p>
+<img src="hero.png"><video src="intro.mp4" autoplay muted></video>
+<script>document.body.insertAdjacentHTML("beforeend", "<p>Rendered by JavaScript</p>");</script>
+</body></html>"""
+
+
+def build_fixture(directory: str, pages: int):
+    for i in range(pages):
+        with open(os.path.join(directory, f"page{i}.html"), "w") as f:
+            f.write(PAGE.format(i=i))
+    for name, size in (("hero.png", 2_000_000), ("brand.woff2", 500_000), ("intro.mp4", 5_000_000)):
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(os.urandom(size))
+
+
+def serve(directory: str, latency: float) -> ThreadingHTTPServer:
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.endswith(".html"):
+                time.sleep(latency)
+            return super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(pool_size: int, urls, warm: bool = True):
+    pool = BrowserPool(size=pool_size, max_pages_per_driver=len(urls) + pool_size)
+    try:
+        if warm:
+            # Start every browser first so the timing measures page throughput, not Chrome boot
+            with ThreadPoolExecutor(pool_size) as executor:
+                list(executor.map(pool.fetch, urls[:pool_size]))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(pool_size) as executor:
+            sources = list(executor.map(pool.fetch, urls))
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+    assert all("Rendered by JavaScript" in source for source in sources)
+    return {"pool_size": pool_size, "pages": len(urls), "seconds": round(elapsed, 2), "pages_per_second": round(len(urls) / elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the fixture server waits per page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_fixture(directory, args.pages)
+        server = serve(directory, args.latency)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/page{i}.html" for i in range(args.pages)]
+        try:
+            for size in args.sizes:
+                print(json.dumps(run(size, urls)))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
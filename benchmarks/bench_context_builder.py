@@ -0,0 +1,91 @@
+"""Prompt tokens and fact retention of the Phase 3 context builder.
+
+Run from the repository root:
+    python -m benchmarks.bench_context_builder [--paragraphs 60] [--budget 3000]
+
+Verbose Phase 1/2 outputs are generated from filler paragraphs. A handful of key
+facts are planted in them, each written the way a search result would phrase
+what one prompt section asks about. For each Phase 3 prompt, the script reports
+the input tokens pasted verbatim against those selected by
+context_builder.ContextBuilder, the time selection takes, and which planted
+facts survived. Prompt-token savings carry over roughly one for one to
+time-to-first-token, which grows with prompt length.
+"""
+import json
+import time
+import random
+import argparse
+
+from context_builder import ContextBuilder
+from tokens import count_tokens
+from phase3 import INTEGRATION_SECTIONS, REVENUE_SECTIONS, STRATEGY_SECTIONS
+
+FILLER = (
+    "market growth revenue customers platform digital analysis report source link regional investment "
+    "adoption healthcare outlook quarter survey leaders executives announced partnership statement"
+).split()
+
+FACTS = {
+    "company_data": [
+        "The company runs 40 clinics and loses 12% of appointments to patient no-shows.",
+        "Operating costs rose 9% last year, mostly from manual claims processing.",
+    ],
+    "industry_trends": [
+        "Cloud platforms and AI tools such as Azure Health Data Services lead adoption among providers.",
+        "Providers expect AI scheduling to scale to long-term growth in outpatient volume.",
+    ],
+    "ai_use_cases": [
+        "Predictive maintenance of MRI scanners cut costs by 18% with ROI inside 9 months.",
+        "Automation of prior authorisation reduced operational costs and staff overtime.",
+    ],
+    "competitor_analysis": [
+        "Competitor Northwell launched an AI-driven triage product as a new revenue stream.",
+        "Competitor Mercy differentiates through a virtual-care platform that expanded into new markets.",
+    ],
+    "ai_strategy": [
+        "Phase one is pilot testing of no-show prediction in five clinics before full deployment.",
+        "Staff upskilling and training run alongside, with data security and compliance reviews each quarter.",
+        "KPIs: no-show rate, claims turnaround time and cost per appointment.",
+    ],
+}
+
+
+def verbose(name: str, paragraphs: int, rng) -> str:
+    body = [" ".join(rng.choice(FILLER) for _ in range(70)) + "." for _ in range(paragraphs)]
+    for fact in FACTS[name]:
+        body.insert(rng.randrange(len(body) + 1), fact)
+    return "\n\n".join(body)
+
+
+def measure(prompt: str, sources, sections, budget: int):
+    started = time.perf_counter()
+    selected = ContextBuilder(sources).select(sections, budget=budget)
+    elapsed = time.perf_counter() - started
+    kept = [fact for name in sources for fact in FACTS[name] if fact in selected[name]]
+    print(json.dumps({
+        "prompt": prompt,
+        "verbatim_tokens": sum(count_tokens(text) for text in sources.values()),
+        "selected_tokens": sum(count_tokens(text) for text in selected.values()),
+        "select_ms": round(elapsed * 1000, 1),
+        "facts_kept": f"{len(kept)}/{sum(len(FACTS[name]) for name in sources)}",
+        "facts_dropped": [fact for name in sources for fact in FACTS[name] if fact not in kept],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=60, help="filler paragraphs per input")
+    parser.add_argument("--budget", type=int, default=3000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    inputs = {name: verbose(name, args.paragraphs, rng) for name in FACTS}
+    strategy_inputs = {name: inputs[name] for name in ("company_data", "industry_trends", "ai_use_cases", "competitor_analysis")}
+    follow_up_inputs = {name: inputs[name] for name in ("company_data", "ai_strategy")}
+    measure("generate_ai_strategy", strategy_inputs, STRATEGY_SECTIONS, args.budget)
+    measure("suggest_ai_integration", follow_up_inputs, INTEGRATION_SECTIONS, args.budget)
+    measure("identify_revenue_opportunities", follow_up_inputs, REVENUE_SECTIONS, args.budget)
+
+
+if __name__ == "__main__":
+    main()
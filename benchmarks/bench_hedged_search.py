@@ -0,0 +1,95 @@
+"""Search and report latency tails with and without hedged searches.
+
+Run from the repository root:
+    python -m benchmarks.bench_hedged_search [--searches 600] [--tail 0.03]
+
+Two fake search backends stand in for DuckDuckGo and Exa: log-normal latency
+around --median-ms, with --tail of calls stuck for --stall-ms (a slow upstream,
+a retry after a 429). Searches run through search_tools.HedgedSearch's tool
+function exactly as an agent's tool call would. A "report" issues --per-report
+searches in parallel and waits for all of them, like the research agents do, so
+its latency is the slowest search. Compares the primary backend alone with
+hedging at the primary's observed p90.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from phi.tools import Toolkit
+
+import search_tools
+from model_router import percentile
+from search_tools import HedgedSearch, search_latency
+
+
+class FakeBackend(Toolkit):
+    def __init__(self, name: str, median: float, tail: float, stall: float, seed: int):
+        super().__init__(name=name)
+        self.median, self.tail, self.stall = median, tail, stall
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.register(self.search)
+
+    def search(self, query: str, max_results: int = 5) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = self.median * self._rng.lognormvariate(0, 0.3)
+            if self._rng.random() < self.tail:
+                delay += self.stall
+        time.sleep(delay)
+        return json.dumps([{"title": f"{self.name} result for {query}"}])
+
+
+def run(name: str, search, args) -> dict:
+    def report(n: int) -> float:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.per_report) as pool:
+            list(pool.map(lambda i: search(f"query {n}-{i}", 5), range(args.per_report)))
+        return time.perf_counter() - started
+
+    singles = []
+    for n in range(args.searches // 10):
+        started = time.perf_counter()
+        search(f"single {n}", 5)
+        singles.append(time.perf_counter() - started)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        reports = list(pool.map(report, range(args.searches // args.per_report)))
+    return {
+        "mode": name,
+        "search_p50_ms": round(1000 * percentile(singles, 0.5)),
+        "search_p99_ms": round(1000 * percentile(singles, 0.99)),
+        "report_p50_ms": round(1000 * percentile(reports, 0.5)),
+        "report_p90_ms": round(1000 * percentile(reports, 0.9)),
+        "report_p99_ms": round(1000 * percentile(reports, 0.99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=600)
+    parser.add_argument("--per-report", type=int, default=6)
+    parser.add_argument("--median-ms", type=float, default=80)
+    parser.add_argument("--tail", type=float, default=0.03, help="share of calls that stall")
+    parser.add_argument("--stall-ms", type=float, default=2000)
+    args = parser.parse_args()
+
+    median, stall = args.median_ms / 1000, args.stall_ms / 1000
+    primary = FakeBackend("primary", median, args.tail, stall, seed=1)
+    print(json.dumps(run("primary_only", lambda q, n: primary.search(q, n), args)))
+
+    primary = FakeBackend("primary", median, args.tail, stall, seed=1)
+    alternate = FakeBackend("alternate", median * 1.5, args.tail, stall, seed=2)
+    search_tools.HEDGE_DEFAULT_DELAY = median * 2  # until the primary has enough samples for its own p90
+    tool = HedgedSearch(primary, alternate)
+    result = run("hedged", tool.web_search, args)
+    result["alternate_calls_pct"] = round(100 * alternate.calls / primary.calls, 1)
+    print(json.dumps(result))
+    print(json.dumps({"search_latency": search_latency.stats}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Per-call overhead of per-request OpenAI clients against the shared pooled client.
+
+Run from the repository root:
+    python -m benchmarks.bench_http_pool [--calls 300] [--threads 8] [--latency-ms 5]
+
+A local OpenAI-compatible server answers /v1/chat/completions instantly (plus
+--latency-ms). Chat calls go through phi's OpenAIChat.invoke, first as the
+agents were built before (no client, so phi builds an OpenAI client and
+connection pool per request), then via http_clients.openai_chat on the shared
+pool. The report shows throughput, per-call latency, and TCP connections the
+server accepted. Against api.openai.com every new connection also pays a TLS
+handshake, so the real saving is larger than this plain-HTTP run shows.
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    latency = 0.0
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class MockOpenAI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as api.openai.com does
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency)
+        body = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(name: str, model, server: MockServer, calls: int, threads: int):
+    from phi.model.message import Message
+
+    def call(_):
+        started = time.perf_counter()
+        model.invoke([Message(role="user", content="hi")])
+        return time.perf_counter() - started
+
+    model.invoke([Message(role="user", content="warm up")])
+    server.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(call, range(calls)))
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "client": name,
+        "calls_per_s": round(calls / elapsed, 1),
+        "mean_ms": round(1000 * sum(latencies) / calls, 2),
+        "p95_ms": round(1000 * latencies[int(0.95 * (calls - 1))], 2),
+        "connections": server.connections,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated model time per call")
+    args = parser.parse_args()
+
+    server = MockServer(("127.0.0.1", 0), MockOpenAI)
+    server.latency = args.latency_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # The shared client reads these when it is first built
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+    from phi.model.openai import OpenAIChat
+    from http_clients import http_stats, openai_chat
+    measure("per_request", OpenAIChat(id="gpt-4o", base_url=base_url), server, args.calls, args.threads)
+    measure("shared_pool", openai_chat("gpt-4o"), server, args.calls, args.threads)
+    print(json.dumps({"pool": http_stats()}))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
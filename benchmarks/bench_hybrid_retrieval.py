@@ -0,0 +1,136 @@
+"""Latency and quality of vector-only, keyword-only and hybrid document retrieval.
+
+Run from the repository root:
+    python -m benchmarks.bench_hybrid_retrieval [--companies 2000] [--embedder local|openai]
+
+A fixture corpus is generated locally. Each company gets a few report chunks
+that mention its ticker symbol and product name next to generic business prose.
+The chunks are ingested into a throwaway VectorStore. Two query sets are then run
+against every retrieval mode:
+  exact       "ticker NVQX guidance": the kind of query vector search tends to miss
+  paraphrase  a reworded description of the product, with no identifiers in it
+Exact queries have one relevant chunk. Paraphrases are relevant to the product
+chunk of every company with the same sector and capability. The script reports
+hit@k, MRR of the first relevant chunk and p50/p99 latency per mode, with
+embedding time excluded. The default local embedder is
+semantic_cache.HashingEmbedder, so no API key is needed; pass `--embedder openai`
+to use text-embedding-3-small.
+"""
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from ingestion import Chunk
+from vector_store import VectorStore
+
+SECTORS = ["logistics", "retail banking", "clinical imaging", "wind energy", "food delivery", "semiconductor", "insurance claims", "cyber security"]
+CAPABILITIES = ["demand forecasting", "fraud scoring", "route optimisation", "document summarisation", "anomaly detection", "price optimisation", "predictive maintenance", "customer churn modelling"]
+FILLER = [
+    "Management reiterated its focus on operating margin and disciplined capital allocation.",
+    "The board approved a share buyback programme and a modest dividend increase.",
+    "Headcount grew in engineering while sales and marketing spend was held flat.",
+    "The company expects supply chain conditions to normalise over the next two quarters.",
+]
+
+
+def fixture_corpus(companies: int, rng):
+    """Chunks plus (query, relevant chunk positions) pairs for both query sets."""
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    chunks, exact, paraphrase, products = [], [], [], {}
+    for n in range(companies):
+        ticker = "".join(rng.choice(letters, 4))
+        product = f"{''.join(rng.choice(letters, 3)).title()}-{rng.integers(2, 99)}"
+        sector = SECTORS[n % len(SECTORS)]
+        capability = CAPABILITIES[(n // len(SECTORS)) % len(CAPABILITIES)]
+        document = f"{ticker}-annual-report.pdf"
+        texts = [
+            f"{ticker} launched {product}, a platform for {capability} in {sector}. "
+            f"Customers use {product} to cut manual review time and improve accuracy.",
+            f"Guidance: {ticker} expects revenue growth in {sector} driven by {capability}. " + FILLER[n % len(FILLER)],
+            " ".join(FILLER[(n + i) % len(FILLER)] for i in range(3)),
+        ]
+        for index, text in enumerate(texts):
+            chunks.append(Chunk(document=document, index=index, page=1, token_offset=0, tokens=len(text.split()), text=text))
+        base = len(chunks) - len(texts)
+        exact.append((f"What does {product} do?", [base]))
+        exact.append((f"{ticker} guidance", [base + 1]))
+        products.setdefault((sector, capability), []).append(base)
+    for (sector, capability), positions in products.items():
+        paraphrase.append((f"software for {capability} used by {sector} firms to reduce manual review", positions))
+    return chunks, exact, paraphrase
+
+
+def embedder_for(name: str):
+    if name == "openai":
+        from phi.embedder.openai import OpenAIEmbedder
+        return OpenAIEmbedder(model="text-embedding-3-small")
+    from semantic_cache import HashingEmbedder
+    return HashingEmbedder()
+
+
+def embed(embedder, texts):
+    vectors = np.array([embedder.get_embedding(text) for text in texts], dtype="float32")
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def run(store: VectorStore, mode: str, queries, vectors, k: int, prefilter: int = 0):
+    ranks, latencies = [], []
+    for (query, relevant), vector in zip(queries, vectors):
+        started = time.perf_counter()
+        if mode == "vector":
+            hits = store.search(vector, k)
+        elif mode == "keyword":
+            hits = store.keyword_search(query, k)
+        else:
+            hits = store.hybrid_search(vector, query, k, prefilter=prefilter)
+        latencies.append(time.perf_counter() - started)
+        found = [(chunk.document, chunk.index) for _, chunk in hits]
+        ranks.append(next((rank for rank, hit in enumerate(found, start=1) if hit in relevant), None))
+    latencies = np.array(latencies) * 1000
+    return {
+        "hit_at_k": round(float(np.mean([r is not None for r in ranks])), 4),
+        "mrr": round(float(np.mean([1 / r if r else 0 for r in ranks])), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--embedder", choices=["local", "openai"], default="local")
+    parser.add_argument("--prefilter", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chunks, exact, paraphrase = fixture_corpus(args.companies, rng)
+    embedder = embedder_for(args.embedder)
+    vectors = embed(embedder, [chunk.text for chunk in chunks])
+
+    directory = tempfile.mkdtemp(prefix="bench_hybrid_")
+    try:
+        store = VectorStore(directory, dimension=vectors.shape[1], background=False)
+        with store.writing():
+            store.add(vectors, chunks)
+        for label, queries in (("exact", exact), ("paraphrase", paraphrase)):
+            picked = [queries[i] for i in rng.choice(len(queries), min(args.queries, len(queries)), replace=False)]
+            picked = [(query, {(chunks[p].document, chunks[p].index) for p in positions}) for query, positions in picked]
+            query_vectors = embed(embedder, [query for query, _ in picked])
+            for mode, prefilter in (("vector", 0), ("keyword", 0), ("hybrid", 0), ("hybrid", args.prefilter)):
+                print(json.dumps({
+                    "chunks": len(chunks),
+                    "queries": label,
+                    "mode": mode if not prefilter else f"hybrid+prefilter{prefilter}",
+                    **run(store, mode, picked, query_vectors, args.k, prefilter),
+                }))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
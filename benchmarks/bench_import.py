@@ -0,0 +1,64 @@
+"""Cold-import benchmark for the agent modules.
+
+Run from the repository root:  python -m benchmarks.bench_import [--runs 5]
+
+Each import happens in a fresh interpreter, which is what a Streamlit worker
+restart pays. The report also lists heavy dependencies that got imported and
+any lazily registered object that was built during import (should be none).
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+MODULES = ["VisionaryAgent", "VisionaryAgent1", "phase1", "phase2", "phase3"]
+HEAVY = ["openai", "faiss", "helium", "selenium", "lancedb", "exa_py", "firecrawl", "duckduckgo_search"]
+
+PROBE = """
+import sys, time, json, importlib
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - started
+heavy = [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+built = module.agents.built() if hasattr(module, "agents") else None
+print(json.dumps({"seconds": elapsed, "heavy": heavy, "built": built}))
+"""
+
+
+def measure(module: str, runs: int):
+    env = dict(os.environ)
+    # Dummy keys: some SDKs refuse to construct without one, which an eager module would hit
+    for key in ("OPENAI_API_KEY", "EXA_API_KEY", "FIRECRAWL_API_KEY"):
+        env.setdefault(key, "bench")
+    samples, last = [], {}
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, module, json.dumps(HEAVY)],
+            capture_output=True, text=True, env=env,
+        )
+        if out.returncode != 0:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1]}
+        last = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(last["seconds"])
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "heavy_imported": last["heavy"],
+        "built_at_import": last["built"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+    for module in args.modules:
+        print(json.dumps(measure(module, args.runs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Recall and latency of the vector store tiers against the exact flat index.
+
+Run from the repository root:
+    python -m benchmarks.bench_index_tiers [--sizes 10000 100000 1000000] [--dim 256]
+
+The default sizes include the 1M-vector corpus, which needs about 1 GB for the
+vectors at --dim 256 and several minutes to build HNSW; pass smaller --sizes
+for a quick run.
+
+Vectors are drawn around random cluster centres, which resembles embedded
+document chunks better than uniform noise. For every size, each tier is built
+with vector_store.build_index. The tiers are then queried one vector at a time
+for several nprobe / efSearch settings, and recall@k is reported against the
+flat index's exact neighbours together with p50/p99 query latency.
+"""
+import json
+import time
+import argparse
+import numpy as np
+
+from vector_store import apply_search_params, build_index
+
+NPROBES = [1, 4, 16, 64]
+EF_SEARCHES = [16, 64, 256]
+
+
+def clustered(count: int, dim: int, rng, clusters: int = 256):
+    centres = rng.standard_normal((clusters, dim), dtype="float32")
+    labels = rng.integers(0, clusters, count)
+    return centres[labels] + 0.3 * rng.standard_normal((count, dim), dtype="float32")
+
+
+def time_queries(index, queries, k: int):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - started)
+        results.append(ids[0])
+    return np.array(results), np.array(latencies) * 1000
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def report(size: int, tier: str, knob: str, value, found, latencies, truth, build_seconds: float):
+    print(json.dumps({
+        "vectors": size,
+        "tier": tier,
+        knob: value,
+        "recall_at_k": round(recall(found, truth), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "build_s": round(build_seconds, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256, help="1536 matches text-embedding-3-small but needs 6 GB at 1M vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        vectors = clustered(size, args.dim, rng)
+        ids = np.arange(size, dtype="int64")
+        queries = clustered(args.queries, args.dim, rng)
+
+        started = time.perf_counter()
+        flat = build_index("flat", args.dim, vectors, ids)
+        flat_build = time.perf_counter() - started
+        truth, latencies = time_queries(flat, queries, args.k)
+        report(size, "flat", "exact", True, truth, latencies, truth, flat_build)
+
+        for tier, knob, values in (("ivf", "nprobe", NPROBES), ("hnsw", "ef_search", EF_SEARCHES)):
+            started = time.perf_counter()
+            index = build_index(tier, args.dim, vectors, ids)
+            build_seconds = time.perf_counter() - started
+            for value in values:
+                apply_search_params(index, **{knob: value})
+                found, latencies = time_queries(index, queries, args.k)
+                report(size, tier, knob, value, found, latencies, truth, build_seconds)
+            del index
+
+
+if __name__ == "__main__":
+    main()
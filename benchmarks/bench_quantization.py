@@ -0,0 +1,74 @@
+"""Memory and recall cost of the compressed vector codecs.
+
+Run from the repository root:
+    python -m benchmarks.bench_quantization [--size 100000] [--dim 1536] [--tier flat]
+
+Each codec (none, fp16, sq8, pq) is built with vector_store.build_index on the
+same clustered vectors. The serialized index size is reported as bytes per vector
+and extrapolated to MB per million chunks. Recall@k is measured against exact
+float32 neighbours twice: from the compressed codes alone, and after re-ranking
+k * rerank candidates against the original vectors, as VectorStore.search does.
+"""
+import json
+import time
+import argparse
+import numpy as np
+
+from vector_store import build_index, exact_rerank
+from benchmarks.bench_index_tiers import clustered, recall
+
+CODECS = ["none", "fp16", "sq8", "pq"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256, help="1536 matches text-embedding-3-small")
+    parser.add_argument("--tier", choices=["flat", "ivf", "hnsw"], default="flat")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank", type=int, default=4)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    import faiss
+
+    rng = np.random.default_rng(0)
+    vectors = clustered(args.size, args.dim, rng)
+    ids = np.arange(args.size, dtype="int64")
+    queries = clustered(args.queries, args.dim, rng)
+    _, truth = build_index("flat", args.dim, vectors, ids).search(queries, args.k)
+
+    for codec in CODECS:
+        started = time.perf_counter()
+        index = build_index(args.tier, args.dim, vectors, ids, codec)
+        build_seconds = time.perf_counter() - started
+        size_bytes = faiss.serialize_index(index).nbytes
+
+        plain, reranked, latencies = [], [], []
+        for query in queries:
+            started = time.perf_counter()
+            _, found = index.search(query.reshape(1, -1), args.k * args.rerank)
+            candidates = [int(i) for i in found[0] if i >= 0]
+            reranked.append([i for _, i in exact_rerank(query, candidates, vectors[candidates], args.k)])
+            latencies.append(time.perf_counter() - started)
+            plain.append(candidates[:args.k])
+        latencies = np.array(latencies) * 1000
+
+        print(json.dumps({
+            "vectors": args.size,
+            "dim": args.dim,
+            "tier": args.tier,
+            "codec": codec,
+            "bytes_per_vector": round(size_bytes / args.size, 1),
+            "mb_per_million": round(size_bytes / args.size * 1_000_000 / 2**20, 1),
+            "recall_at_k": round(recall(plain, truth), 4),
+            "recall_at_k_reranked": round(recall(reranked, truth), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "build_s": round(build_seconds, 1),
+        }))
+        del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Upstream 429s, failures and per-lane latency with and without the shared rate limiter.
+
+Run from the repository root:
+    python -m benchmarks.bench_rate_limiter [--rate 20] [--clients 8] [--calls 25]
+
+A local fake provider allows --rate requests per second (burst 5) and answers
+429 with Retry-After beyond that; its latency also grows with concurrent
+requests, as an overloaded API's does. A quarter of the clients run in the
+interactive lane and the rest in the batch lane. The same workload runs four
+ways, each in fresh worker processes configured through the environment:
+
+    none        plain calls, no retries (the behaviour before rate limiting)
+    retry_only  jittered retries, no coordination
+    thread      one process, shared token bucket and adaptive concurrency
+    process     --processes workers sharing the bucket through SQLite
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeProvider(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, rate: float, burst: float, latency: float):
+        super().__init__(address, FakeHandler)
+        self.rate, self.burst, self.latency = rate, burst, latency
+        self.tokens, self.updated = burst, time.monotonic()
+        self.active = self.served = self.throttled = 0
+        self.lock = threading.Lock()
+
+    def admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.throttled += 1
+                return False
+            self.tokens -= 1
+            self.served += 1
+            self.active += 1
+            return True
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        if not server.admit():
+            self.respond(429, b'{"error": "rate limited"}', {"Retry-After": "0.2"})
+            return
+        try:
+            # Every concurrent request slows the others down
+            time.sleep(server.latency * (1 + 0.25 * server.active))
+        finally:
+            with server.lock:
+                server.active -= 1
+        self.respond(200, b'{"ok": true}')
+
+    def respond(self, status: int, body: bytes, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def worker(args) -> list:
+    # Runs in a fresh process: the limiter reads its configuration from the environment on import
+    env, url, lanes, calls = args
+    os.environ.update(env)
+    import httpx
+    from rate_limits import call_limited, lane
+
+    client = httpx.Client(timeout=30)
+    records = []
+
+    def request():
+        response = client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+    def run(lane_name: str):
+        with lane(lane_name):
+            for _ in range(calls):
+                started = time.perf_counter()
+                try:
+                    if env["SCENARIO"] == "none":
+                        request()
+                    else:
+                        call_limited("fake", request)
+                    ok = True
+                except Exception:
+                    ok = False
+                records.append((lane_name, ok, time.perf_counter() - started))
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in lanes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def scenario(name: str, server: FakeProvider, url: str, args, processes: int):
+    store = os.path.join(tempfile.mkdtemp(), "rate_limits.sqlite")
+    env = {
+        "SCENARIO": name,
+        "VISIONARY_RATE_LIMIT_MODE": {"none": "off", "retry_only": "off"}.get(name, "process" if name == "process" else "thread"),
+        "VISIONARY_RATE_LIMIT_PATH": store,
+        "VISIONARY_RATE_LIMITS": f"fake={args.rate}:5",
+        "VISIONARY_MAX_CONCURRENCY": f"fake={args.clients}",
+        "VISIONARY_RETRY_BASE": "0.05",
+        "VISIONARY_RETRY_CAP": "1.0",
+    }
+    lanes = ["interactive" if n % 4 == 0 else "batch" for n in range(args.clients)]
+    shares = [lanes[n::processes] for n in range(processes)]
+    server.served = server.throttled = 0
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        records = [r for part in pool.map(worker, [(env, url, share, args.calls) for share in shares]) for r in part]
+    elapsed = time.perf_counter() - started
+    report = {"scenario": name, "processes": processes, "seconds": round(elapsed, 2), "upstream_429": server.throttled}
+    for lane_name in ("interactive", "batch"):
+        mine = [r for r in records if r[0] == lane_name]
+        report[lane_name] = {
+            "ok": sum(r[1] for r in mine),
+            "failed": sum(not r[1] for r in mine),
+            "p50_ms": round(1000 * percentile([r[2] for r in mine if r[1]], 0.5)),
+            "p95_ms": round(1000 * percentile([r[2] for r in mine if r[1]], 0.95)),
+        }
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second the fake provider allows")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=25, help="calls per client")
+    parser.add_argument("--processes", type=int, default=2, help="worker processes in the process scenario")
+    args = parser.parse_args()
+
+    server = FakeProvider(("127.0.0.1", 0), args.rate, 5, args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    for name in ("none", "retry_only", "thread"):
+        scenario(name, server, url, args, 1)
+    scenario("process", server, url, args, args.processes)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Load test of the job service: hundreds of concurrent report jobs on one node.
+
+Run from the repository root:
+    python -m benchmarks.bench_service [--jobs 300] [--workers 200] [--node-ms 500]
+
+The real FastAPI app from service.create_app runs under uvicorn with a SQLite
+queue in a temporary directory. Its pipeline has the shape of
+VisionaryAgent.strategy_pipeline, but each step is a blocking sleep of about
+--node-ms, standing in for a synchronous model call. The client submits --jobs
+jobs at once, follows --streams of them over server-sent events, and probes
+GET /health throughout. Probe latency while the jobs run shows whether request
+handling is ever held up by the work; during the submission burst it only
+measures the burst itself (client and server share this machine's CPUs).
+
+For comparison, "inline" runs the same pipeline inside an async request
+handler, the straightforward way without a queue, for --inline-jobs requests.
+"""
+import os
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+
+import httpx
+import uvicorn
+
+from model_router import percentile
+from pipeline import Node, NodeStore, Pipeline
+
+
+def fake_pipeline(node_ms: float, store_dir: str) -> Pipeline:
+    def step(name: str):
+        def run(**inputs):
+            time.sleep(node_ms / 1000 * random.lognormvariate(0, 0.3))
+            return f"{name} for {inputs.get('company_name') or inputs.get('industry') or inputs.get('competitor')}"
+        return run
+
+    return Pipeline([
+        Node("company_data", step("company_data"), ["input_method", "company_source"]),
+        Node("industry_trends", step("industry_trends"), ["industry"]),
+        Node("ai_use_cases", step("ai_use_cases"), ["industry"]),
+        Node("competitor_analysis", step("competitor_analysis"), ["competitor"]),
+        Node("ai_strategy", step("ai_strategy"), ["company_data", "industry_trends", "ai_use_cases", "competitor_analysis"]),
+        Node("ai_integration", step("ai_integration"), ["company_data", "ai_strategy"]),
+        Node("revenue_opportunities", step("revenue_opportunities"), ["company_data", "ai_strategy"]),
+        Node("report", step("report"), ["company_name", "ai_strategy", "ai_integration", "revenue_opportunities"], memo=False),
+    ], store=NodeStore(os.path.join(store_dir, "pipeline.sqlite")), max_workers=4)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+def shutdown(server, thread):
+    # Runs the app's lifespan exit, which stops the job workers
+    server.should_exit = True
+    thread.join(10)
+
+
+def job_body(n: int) -> dict:
+    # Distinct companies, industries and competitors, so no step is served from the memo
+    return {"company_name": f"Company {n}", "industry": f"Industry {n}", "competitor": f"Rival {n}", "lane": "batch"}
+
+
+async def probe(client: httpx.AsyncClient, done: asyncio.Event, latencies: dict, phase: list):
+    # phase[0] names what the server is busy with when the probe is sent
+    while not done.is_set():
+        started = time.perf_counter()
+        name = phase[0]
+        await client.get("/health")
+        latencies.setdefault(name, []).append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+def probe_stats(latencies: dict) -> dict:
+    return {
+        name: {"p50_ms": round(1000 * percentile(values, 0.5), 1), "p99_ms": round(1000 * percentile(values, 0.99), 1), "max_ms": round(1000 * max(values), 1)}
+        for name, values in latencies.items()
+    }
+
+
+async def follow(client: httpx.AsyncClient, job_id: str) -> int:
+    events = 0
+    async with client.stream("GET", f"/jobs/{job_id}/events") as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: progress"):
+                events += 1
+    return events
+
+
+async def queued_run(base_url: str, args) -> dict:
+    latencies, probes, phase, done = [], {}, ["submitting"], asyncio.Event()
+    limits = httpx.Limits(max_connections=args.streams + 50)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+        prober = asyncio.create_task(probe(client, done, probes, phase))
+        started = time.perf_counter()
+
+        async def submit(n: int) -> str:
+            t = time.perf_counter()
+            response = await client.post("/jobs", json=job_body(n))
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - t)
+            return response.json()["id"]
+
+        ids = await asyncio.gather(*(submit(n) for n in range(args.jobs)))
+        submitted = time.perf_counter() - started
+        phase[0] = "jobs_running"
+        streams = asyncio.gather(*(follow(client, job_id) for job_id in ids[:args.streams]))
+        peak_running = 0
+        while True:
+            health = (await client.get("/health")).json()
+            peak_running = max(peak_running, health["workers"]["running"])
+            if sum(health["queue"].get(s, 0) for s in ("done", "failed")) >= args.jobs:
+                break
+            await asyncio.sleep(0.25)
+        elapsed = time.perf_counter() - started
+        events = await streams
+        done.set()
+        await prober
+        jobs = [(await client.get(f"/jobs/{job_id}")).json() for job_id in ids]
+
+    turnaround = [j["finished"] - j["created"] for j in jobs]
+    return {
+        "mode": "queued",
+        "jobs": args.jobs,
+        "done": sum(j["status"] == "done" for j in jobs),
+        "failed": sum(j["status"] == "failed" for j in jobs),
+        "peak_running": peak_running,
+        "seconds": round(elapsed, 1),
+        "jobs_per_s": round(args.jobs / elapsed, 1),
+        "submit_all_s": round(submitted, 2),
+        "submits_per_s": round(args.jobs / submitted),
+        "job_p50_s": round(percentile(turnaround, 0.5), 1),
+        "job_p95_s": round(percentile(turnaround, 0.95), 1),
+        "health": probe_stats(probes),
+        "streamed_events_per_job": round(sum(events) / max(1, len(events)), 1),
+    }
+
+
+def inline_app(pipeline: Pipeline):
+    from fastapi import FastAPI
+    from batch import pipeline_params
+    app = FastAPI()
+
+    @app.post("/report")
+    async def report(body: dict):
+        return {"results": list(pipeline.run(pipeline_params(body)).results)}
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    return app
+
+
+async def inline_run(base_url: str, args) -> dict:
+    probes, done = {}, asyncio.Event()
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        prober = asyncio.create_task(probe(client, done, probes, ["jobs_running"]))
+        started = time.perf_counter()
+        await asyncio.gather(*(client.post("/report", json=job_body(n)) for n in range(args.inline_jobs)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    return {
+        "mode": "inline",
+        "jobs": args.inline_jobs,
+        "seconds": round(elapsed, 1),
+        "jobs_per_s": round(args.inline_jobs / elapsed, 2),
+        "health": probe_stats(probes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=200, help="job worker threads")
+    parser.add_argument("--streams", type=int, default=50, help="jobs followed over server-sent events")
+    parser.add_argument("--node-ms", type=float, default=500, help="median time of one pipeline step")
+    parser.add_argument("--inline-jobs", type=int, default=10)
+    args = parser.parse_args()
+
+    from service import JobQueue, create_app
+    workdir = tempfile.mkdtemp()
+    pipeline = fake_pipeline(args.node_ms, workdir)
+    url, server, thread = serve(inline_app(pipeline))
+    print(json.dumps(asyncio.run(inline_run(url, args))))
+    shutdown(server, thread)
+    app = create_app(queue=JobQueue(os.path.join(workdir, "jobs.sqlite")), pipeline=pipeline, workers=args.workers)
+    url, server, thread = serve(app)
+    print(json.dumps(asyncio.run(queued_run(url, args))))
+    shutdown(server, thread)
+
+
+if __name__ == "__main__":
+    main()
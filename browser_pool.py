@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# Pool settings, overridable from the environment
+BROWSER_POOL_SIZE = int(os.getenv("VISIONARY_BROWSER_POOL_SIZE", 2))
+BROWSER_MAX_PAGES = int(os.getenv("VISIONARY_BROWSER_MAX_PAGES", 50))  # recycle a driver after this many pages
+BROWSER_MAX_RSS_MB = float(os.getenv("VISIONARY_BROWSER_MAX_RSS_MB", 1024))  # or once Chrome grows past this
+BROWSER_PAGE_TIMEOUT = float(os.getenv("VISIONARY_BROWSER_PAGE_TIMEOUT", 30))  # seconds per page load
+BROWSER_CHECKOUT_TIMEOUT = float(os.getenv("VISIONARY_BROWSER_CHECKOUT_TIMEOUT", 60))  # seconds to wait for a free driver
+
+# Resource types that cost load time but carry no business text
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.wav", "*.ogg", "*.m4a", "*.avi", "*.mov",
+]
+
+
+##############################
+# Chrome Setup               #
+##############################
+def chrome_options(binary_location: Optional[str] = None, extra_args: Optional[List[str]] = None):
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    if binary_location:
+        options.binary_location = binary_location
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")  # Prevents memory issues
+    options.add_argument("--disable-gpu")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    # Page text is all we read, so don't wait for images or media to finish
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    for arg in extra_args or []:
+        options.add_argument(arg)
+    return options
+
+
+def default_driver_factory():
+    from selenium import webdriver
+    return webdriver.Chrome(options=chrome_options())
+
+
+def driver_rss_mb(driver: Any) -> float:
+    # chromedriver plus every Chrome process it spawned
+    try:
+        import psutil
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+##############################
+# Browser Pool               #
+##############################
+class PooledDriver:
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_pages_per_driver: int = BROWSER_MAX_PAGES,
+        max_rss_mb: float = BROWSER_MAX_RSS_MB,
+        page_timeout: float = BROWSER_PAGE_TIMEOUT,
+        checkout_timeout: float = BROWSER_CHECKOUT_TIMEOUT,
+        driver_factory: Optional[Callable[[], Any]] = None,
+        blocked_url_patterns: Optional[List[str]] = None,
+    ):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_rss_mb = max_rss_mb
+        self.page_timeout = page_timeout
+        self.checkout_timeout = checkout_timeout
+        self.driver_factory = driver_factory or default_driver_factory
+        self.blocked_url_patterns = BLOCKED_URL_PATTERNS if blocked_url_patterns is None else blocked_url_patterns
+        self.recycled = 0
+        self._idle: "queue.LifoQueue[PooledDriver]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _start_driver(self) -> PooledDriver:
+        driver = self.driver_factory()
+        driver.set_page_load_timeout(self.page_timeout)
+        if self.blocked_url_patterns:
+            try:
+                # Fonts and media are not covered by the image preference; block them at the network layer
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_url_patterns})
+            except Exception:
+                pass
+        return PooledDriver(driver)
+
+    def _retire(self, pooled: PooledDriver):
+        self.recycled += 1
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _worn_out(self, pooled: PooledDriver) -> bool:
+        if pooled.pages >= self.max_pages_per_driver:
+            return True
+        return self.max_rss_mb > 0 and driver_rss_mb(pooled.driver) > self.max_rss_mb
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"No browser became free within {self.checkout_timeout}s")
+        pooled: Optional[PooledDriver] = None
+        healthy = False
+        try:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = self._start_driver()
+            yield pooled.driver
+            healthy = True
+        finally:
+            if pooled is not None:
+                pooled.pages += 1
+                # A driver that errored or timed out may be mid-navigation; never hand it to someone else
+                if healthy and not self._closed and not self._worn_out(pooled):
+                    self._idle.put(pooled)
+                else:
+                    self._retire(pooled)
+            self._slots.release()
+
+    def fetch(self, url: str) -> str:
+        with self.checkout() as driver:
+            driver.get(url)
+            return driver.page_source
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
@@ -0,0 +1,188 @@
+import os
+import re
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from agent_registry import LazyRegistry
+from agent_runtime import run_agent
+from model_router import chat_model
+from tokens import count_tokens, decode, encode
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Token budget per inter-stage payload, as "stage=tokens,..." overrides of the defaults below
+DEFAULT_STAGE_BUDGETS = {
+    "company_data": 1500,
+    "industry_trends": 2000,
+    "ai_use_cases": 2000,
+    "competitor_analysis": 2000,
+    "ai_strategy": 2500,
+}
+STAGE_BUDGETS = {
+    **DEFAULT_STAGE_BUDGETS,
+    **{
+        stage.strip(): int(budget)
+        for stage, budget in (item.split("=", 1) for item in os.getenv("VISIONARY_STAGE_BUDGETS", "").split(",") if "=" in item)
+    },
+}
+# "extractive" (local only), "summarize" (the fast model tier condenses first, then extractive) or "off"
+COMPACTION_MODE = os.getenv("VISIONARY_COMPACTION", "extractive")
+# Word-set overlap at which two sentences count as the same statement
+DUPLICATE_OVERLAP = 0.85
+
+UNIT_BREAK = re.compile(r"(\n+|(?<=[.!?])[ \t]+)")
+WORD = re.compile(r"\w+")
+LINK_ONLY = re.compile(r"^\s*[-*]?\s*(\[[^\]]*\]\([^)]*\)|https?://\S+)\s*$")
+
+agents = LazyRegistry()
+
+
+##############################
+# Units                      #
+##############################
+def split_units(text: str) -> List[Tuple[str, str]]:
+    # (sentence or line, separator that followed it), so kept units rejoin with their original breaks
+    parts = UNIT_BREAK.split(text)
+    return [(parts[i], parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2) if parts[i].strip()]
+
+
+def join_units(units: List[Tuple[str, str]]) -> str:
+    return "".join(unit + separator for unit, separator in units).strip()
+
+
+def deduplicate(text: str) -> str:
+    """Drop sentences and lines that repeat an earlier one, exactly or nearly.
+
+    Search-backed agents often quote the same finding from several sources.
+    """
+    kept: List[Tuple[str, str]] = []
+    seen: List[set] = []
+    exact = set()
+    for unit, separator in split_units(text):
+        words = [word.lower() for word in WORD.findall(unit)]
+        key = " ".join(words)
+        if key and key in exact:
+            continue
+        word_set = set(words)
+        if len(word_set) >= 6 and any(len(word_set & other) / len(word_set | other) >= DUPLICATE_OVERLAP for other in seen):
+            continue
+        exact.add(key)
+        if len(word_set) >= 6:
+            seen.append(word_set)
+        kept.append((unit, separator))
+    return join_units(kept)
+
+
+def unit_score(unit: str, position: int, count: int) -> float:
+    # Headings hold the structure, figures and names are the facts worth keeping, bare links
+    # are the least useful; earlier text wins ties because agents lead with the summary
+    stripped = unit.strip()
+    score = 1.0 - position / max(count, 1)
+    if stripped.startswith("#"):
+        score += 3
+    if re.search(r"\d", stripped):
+        score += 1
+    if re.search(r"[%$€£]", stripped):
+        score += 1
+    if re.search(r"\b[A-Z][a-z]+\s+[A-Z]", stripped):
+        score += 0.5
+    if LINK_ONLY.match(stripped):
+        score -= 2
+    return score
+
+
+def extract(text: str, budget: int) -> str:
+    """Keep the highest scoring sentences that fit in `budget` tokens, in their original order."""
+    units = split_units(text)
+    sized = [(unit_score(unit, n, len(units)), n, count_tokens(unit + separator)) for n, (unit, separator) in enumerate(units)]
+    chosen, spent = set(), 0
+    for _, n, tokens in sorted(sized, key=lambda item: -item[0]):
+        if spent + tokens <= budget:
+            chosen.add(n)
+            spent += tokens
+    if not chosen and units:
+        # One oversized sentence: cut it by tokens rather than return nothing
+        return decode(encode(units[0][0])[:budget])
+    return join_units([units[n] for n in sorted(chosen)])
+
+
+##############################
+# Summarization Pass         #
+##############################
+@agents.register("compaction_agent")
+def build_compaction_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Compaction Agent",
+        model=chat_model("Compaction Agent"),
+        description="Condenses research notes without losing facts, figures, names or sources.",
+        markdown=True,
+    )
+
+
+def summarize(stage: str, text: str, budget: int) -> str:
+    query = f"""
+    Condense the following {stage.replace("_", " ")} notes to at most {int(budget * 0.75)} words.
+    Keep every concrete fact: figures, company and product names, dates and source links.
+    Drop repetition, filler and generic statements. Keep the markdown headings.
+
+    {text}
+    """
+    return run_agent(agents.get("compaction_agent"), query)
+
+
+##############################
+# Token Ledger               #
+##############################
+class TokenLedger:
+    # Last measured size of each stage's payload, before and after compaction
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, **counts: int):
+        with self._lock:
+            self._stages[stage] = counts
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stages.items()}
+
+
+token_ledger = TokenLedger()
+
+
+def compact(stage: str, text: str, budget: Optional[int] = None, mode: str = COMPACTION_MODE) -> str:
+    """Fit a payload handed from one stage to the next into that stage's token budget.
+
+    Steps get progressively lossier and stop as soon as the payload fits:
+    deduplication, then (in "summarize" mode) a cheap-model summary, then
+    extractive trimming.
+    """
+    text = text or ""
+    budget = STAGE_BUDGETS.get(stage, 0) if budget is None else budget
+    before = count_tokens(text)
+    counts = {"before": before, "budget": budget}
+    if mode == "off" or budget <= 0 or before <= budget:
+        token_ledger.record(stage, **counts, after=before)
+        return text
+
+    text = deduplicate(text)
+    counts["deduplicated"] = count_tokens(text)
+    if counts["deduplicated"] > budget and mode == "summarize":
+        try:
+            text = summarize(stage, text, budget)
+            counts["summarized"] = count_tokens(text)
+        except Exception as e:
+            logger.warning(f"Summarizing {stage} failed, trimming instead: {e}")
+    if count_tokens(text) > budget:
+        text = extract(text, budget)
+    counts["after"] = count_tokens(text)
+    token_ledger.record(stage, **counts)
+    logger.info(f"Compacted {stage}: " + ", ".join(f"{name}={value}" for name, value in counts.items()))
+    return text
@@ -0,0 +1,134 @@
+import os
+import re
+import logging
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+from ingestion import chunk_text
+from retrieval import keyword_query
+from tokens import count_tokens
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tokens of retrieved context per prompt, across all of its inputs; 0 pastes inputs verbatim
+CONTEXT_BUDGET = int(os.getenv("VISIONARY_CONTEXT_BUDGET", 3000))
+# Passages each prompt section may pull, and the size passages are cut to
+CONTEXT_TOP_K = int(os.getenv("VISIONARY_CONTEXT_TOP_K", 4))
+CONTEXT_PASSAGE_TOKENS = int(os.getenv("VISIONARY_CONTEXT_PASSAGE_TOKENS", 200))
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n|\n(?=#)")
+
+
+##############################
+# Passages                   #
+##############################
+def split_passages(text: str, max_tokens: int = CONTEXT_PASSAGE_TOKENS) -> List[str]:
+    # Paragraphs are merged up to max_tokens so passages end on natural breaks;
+    # only a paragraph longer than that is cut by tokens
+    passages: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in (p.strip() for p in PARAGRAPH_BREAK.split(text or "")):
+        if not paragraph:
+            continue
+        tokens = count_tokens(paragraph)
+        if tokens > max_tokens:
+            if current:
+                passages.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            passages.extend(chunk.text.strip() for chunk in chunk_text([(1, paragraph)], "", max_tokens, 0))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            passages.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+##############################
+# Context Builder            #
+##############################
+class ContextBuilder:
+    """Index a prompt's inputs as passages and hand back only what its sections ask about.
+
+    Passages are ranked with BM25 in an in-memory FTS5 table, so selection costs no
+    API calls. Every input keeps its best passage, then each section query contributes
+    its top `k` in turn, and any budget left is filled with weaker matches and leading
+    passages. Inputs are returned unchanged when they already fit the budget.
+    """
+
+    def __init__(self, sources: Dict[str, str], passage_tokens: int = CONTEXT_PASSAGE_TOKENS):
+        self.sources = {name: text or "" for name, text in sources.items()}
+        self._passages: List[Tuple[str, int, str, int]] = []  # (source, position, text, tokens)
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE VIRTUAL TABLE passages USING fts5(source UNINDEXED, text, tokenize='porter unicode61')")
+        for name, text in self.sources.items():
+            for position, passage in enumerate(split_passages(text, passage_tokens)):
+                self._db.execute("INSERT INTO passages (rowid, source, text) VALUES (?, ?, ?)", (len(self._passages), name, passage))
+                self._passages.append((name, position, passage, count_tokens(passage)))
+
+    @property
+    def tokens(self) -> int:
+        return sum(tokens for *_, tokens in self._passages)
+
+    def _ranked(self, query: str, sources: Iterable[str]) -> List[int]:
+        expression = keyword_query(query)
+        if not expression:
+            return []
+        names = list(sources)
+        placeholders = ",".join("?" * len(names))
+        rows = self._db.execute(
+            f"SELECT rowid FROM passages WHERE passages MATCH ? AND source IN ({placeholders}) ORDER BY bm25(passages)",
+            [expression, *names],
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def select(self, queries: List[str], budget: int = CONTEXT_BUDGET, k: int = CONTEXT_TOP_K, sources: Optional[List[str]] = None) -> Dict[str, str]:
+        names = sources or list(self.sources)
+        total = sum(tokens for name, *_, tokens in self._passages if name in names)
+        if budget <= 0 or total <= budget:
+            return {name: self.sources[name] for name in names}
+
+        ranked = [self._ranked(query, names)[:k] for query in queries]
+        combined = self._ranked(" ".join(queries), names)
+        openings = [[row for row, passage in enumerate(self._passages) if passage[0] == name] for name in names]
+        # Every input keeps its best match (or its opening passage), so no section goes blank
+        firsts: List[int] = []
+        for name, opening in zip(names, openings):
+            firsts.extend([row for row in combined if self._passages[row][0] == name][:1] or opening[:1])
+        # Then round-robin over the section queries, best passages first. Budget left after
+        # that goes to weaker matches, then to each input's leading passages, which is where
+        # summaries and overviews tend to sit
+        order = (
+            firsts
+            + [ranking[depth] for depth in range(k) for ranking in ranked if depth < len(ranking)]
+            + combined
+            + [opening[depth] for depth in range(max(map(len, openings), default=0)) for opening in openings if depth < len(opening)]
+        )
+
+        chosen, spent = set(), 0
+        for row in order:
+            tokens = self._passages[row][3]
+            if row in chosen or spent + tokens > budget:
+                continue
+            chosen.add(row)
+            spent += tokens
+
+        selected = {
+            name: "\n\n".join(text for source, _, text, _ in sorted(
+                (self._passages[row] for row in chosen if self._passages[row][0] == name), key=lambda p: p[1]
+            ))
+            for name in names
+        }
+        logger.info(f"Context for {len(queries)} sections: {total} -> {spent} tokens ({len(chosen)}/{len(self._passages)} passages)")
+        return selected
+
+
+def build_context(sources: Dict[str, str], queries: List[str], budget: int = CONTEXT_BUDGET, k: int = CONTEXT_TOP_K) -> Dict[str, str]:
+    return ContextBuilder(sources).select(queries, budget=budget, k=k)
@@ -0,0 +1,115 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+EMBEDDING_CACHE_PATH = os.getenv("VISIONARY_EMBEDDING_CACHE_PATH", "tmp/embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("VISIONARY_EMBEDDING_CACHE_MAX_MB", 1024))
+
+
+def normalize_chunk(text: str) -> str:
+    return " ".join(text.split())
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()
+
+
+def embedder_id(embedder: Any) -> str:
+    # Vectors are only interchangeable for the same model at the same output size
+    return f"{getattr(embedder, 'model', type(embedder).__name__)}:{getattr(embedder, 'dimensions', '')}"
+
+
+##############################
+# Embedding Cache            #
+##############################
+class EmbeddingCache:
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT, hash TEXT, vector BLOB, accessed REAL, PRIMARY KEY (model, hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)")
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        import numpy as np
+
+        hashes = [chunk_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._connect()
+            unique = list(set(hashes))
+            # SQLite caps bound parameters, so look up in slices
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *part],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype="float32").tolist()
+            if found:
+                conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE model = ? AND hash = ?",
+                    [(time.time(), model, digest) for digest in found],
+                )
+            hits = sum(1 for digest in hashes if digest in found)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+        return [found.get(digest) for digest in hashes]
+
+    def set_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        import numpy as np
+
+        now = time.time()
+        rows = [
+            (model, chunk_hash(text), np.asarray(vector, dtype="float32").tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings (model, hash, vector, accessed) VALUES (?, ?, ?, ?)", rows)
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used vectors until the cache fits again
+        excess = total - self.max_bytes
+        for model, digest, size in conn.execute("SELECT model, hash, LENGTH(vector) FROM embeddings ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM embeddings WHERE model = ? AND hash = ?", (model, digest))
+            excess -= size
+            if excess <= 0:
+                break
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,238 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import httpx
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# One connection pool per process, shared by every agent model and embedder
+HTTP_MAX_CONNECTIONS = int(os.getenv("VISIONARY_HTTP_MAX_CONNECTIONS", 20))
+HTTP_KEEPALIVE = int(os.getenv("VISIONARY_HTTP_KEEPALIVE", 10))  # idle connections kept open
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("VISIONARY_HTTP_KEEPALIVE_EXPIRY", 60))  # seconds
+# HTTP/2 multiplexes requests over one connection; needs the optional `h2` package (pip install httpx[http2])
+HTTP2 = os.getenv("VISIONARY_HTTP2", "0") == "1"
+# Requests (streamed responses included, until closed) in flight at once across all clients
+HTTP_MAX_IN_FLIGHT = int(os.getenv("VISIONARY_HTTP_MAX_IN_FLIGHT", 16))
+HTTP_TIMEOUT = float(os.getenv("VISIONARY_HTTP_TIMEOUT", 120))  # seconds per request
+HTTP_CONNECT_TIMEOUT = float(os.getenv("VISIONARY_HTTP_CONNECT_TIMEOUT", 10))
+HTTP_MAX_RETRIES = int(os.getenv("VISIONARY_HTTP_MAX_RETRIES", 2))
+
+
+##############################
+# In-flight Limit            #
+##############################
+class ReleasingStream(httpx.SyncByteStream):
+    # A response holds its slot until its body is read or it is closed, so streamed answers count too
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class DeadlineTimeout(httpx.TimeoutException):
+    pass
+
+
+def apply_deadline(request: httpx.Request):
+    # Requests made under a deadline (see orchestration.deadline) time out with it
+    from orchestration import remaining
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineTimeout("Deadline passed before the request was sent", request=request)
+    timeouts = request.extensions.get("timeout") or {}
+    request.extensions["timeout"] = {
+        name: left if timeouts.get(name) is None else min(timeouts[name], left) for name in ("connect", "read", "write", "pool")
+    }
+
+
+class InFlightLimit(httpx.BaseTransport):
+    """Transport wrapper that caps requests in flight; callers over the cap wait for a slot."""
+
+    def __init__(self, transport: httpx.BaseTransport, limit: int = HTTP_MAX_IN_FLIGHT):
+        self._transport = transport
+        self._slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+        self._lock = threading.Lock()
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        self.waited = 0
+
+    def _acquire(self, request: httpx.Request):
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            from orchestration import remaining
+            with self._lock:
+                self.waited += 1
+            if not self._slots.acquire(timeout=remaining()):
+                raise DeadlineTimeout("Deadline passed waiting for an in-flight slot", request=request)
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        apply_deadline(request)
+        self._acquire(request)
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._release()
+            raise
+        response.stream = ReleasingStream(response.stream, self._release)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak, "requests": self.requests, "waited": self.waited}
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Transport wrapper that takes a provider rate-limit token and concurrency slot per request.
+
+    The OpenAI SDK's own jittered retries pass through here too, so each retry waits
+    for a token and every 429 shrinks the provider's concurrency.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: Any):
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        from rate_limits import current_lane
+        self._limiter.acquire(current_lane())
+        started = time.monotonic()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._limiter.release(time.monotonic() - started)
+            raise
+        # Latency to the response headers; a streamed body keeps its slot until closed
+        latency = time.monotonic() - started
+        throttled = response.status_code == 429
+        try:
+            retry_after = float(response.headers["retry-after"]) if throttled and "retry-after" in response.headers else None
+        except ValueError:
+            retry_after = None
+        response.stream = ReleasingStream(response.stream, lambda: self._limiter.release(latency, throttled, retry_after))
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+##############################
+# Shared Clients             #
+##############################
+# phi deep-copies an agent's model (and with it the client) for every variant it makes;
+# the shared clients hand back themselves so copies keep using the one pool
+
+class SharedHTTPClient(httpx.Client):
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SharedHTTPClient":
+        return self
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client(http2: bool = HTTP2, max_connections: int = HTTP_MAX_CONNECTIONS, max_in_flight: int = HTTP_MAX_IN_FLIGHT, provider: Optional[str] = "openai") -> SharedHTTPClient:
+    if http2 and not http2_available():
+        logger.warning("VISIONARY_HTTP2=1 but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=HTTP_KEEPALIVE, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+    limiter = InFlightLimit(httpx.HTTPTransport(http2=http2, limits=limits), max_in_flight)
+    transport: httpx.BaseTransport = limiter
+    if provider is not None:
+        from rate_limits import rate_limiter
+        # Outermost, so a request waiting on its provider's rate limit does not hold an in-flight slot
+        provider_limiter = rate_limiter(provider)
+        if provider_limiter is not None:
+            transport = RateLimitedTransport(limiter, provider_limiter)
+    client = SharedHTTPClient(transport=transport, timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT), follow_redirects=True)
+    client.limiter = limiter
+    client.http2 = http2
+    return client
+
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def http_client() -> SharedHTTPClient:
+    """The process-wide pooled httpx client."""
+    with _clients_lock:
+        if "http" not in _clients:
+            _clients["http"] = build_http_client()
+        return _clients["http"]
+
+
+def openai_client():
+    """The process-wide OpenAI client: shared pool, timeouts and retries (OPENAI_API_KEY / OPENAI_BASE_URL from the environment)."""
+    client = http_client()
+    with _clients_lock:
+        if "openai" not in _clients:
+            from openai import OpenAI
+
+            class SharedOpenAI(OpenAI):
+                def __deepcopy__(self, memo: Dict[int, Any]) -> "SharedOpenAI":
+                    return self
+
+            _clients["openai"] = SharedOpenAI(
+                http_client=client,
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                max_retries=HTTP_MAX_RETRIES,
+            )
+        return _clients["openai"]
+
+
+def openai_chat(model: str, **settings: Any):
+    """OpenAIChat on the shared client; phi otherwise builds a new client (and pool) per request."""
+    from phi.model.openai import OpenAIChat
+    return OpenAIChat(id=model, client=openai_client(), **settings)
+
+
+def openai_embedder(model: str = "text-embedding-3-small", **settings: Any):
+    from phi.embedder.openai import OpenAIEmbedder
+    return OpenAIEmbedder(model=model, openai_client=openai_client(), **settings)
+
+
+def http_stats() -> Dict[str, Any]:
+    with _clients_lock:
+        client: Optional[SharedHTTPClient] = _clients.get("http")
+    if client is None:
+        return {}
+    return {"http2": client.http2, **client.limiter.stats}
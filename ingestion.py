@@ -0,0 +1,187 @@
+import os
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from embedding_cache import embedder_id, embedding_cache
+from tokens import decode, encode
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# Ingestion settings, overridable from the environment
+CHUNK_TOKENS = int(os.getenv("VISIONARY_CHUNK_TOKENS", 500))
+CHUNK_OVERLAP = int(os.getenv("VISIONARY_CHUNK_OVERLAP", 50))
+EMBED_BATCH_SIZE = int(os.getenv("VISIONARY_EMBED_BATCH_SIZE", 64))
+EMBED_CONCURRENCY = int(os.getenv("VISIONARY_EMBED_CONCURRENCY", 4))
+
+# Formats read page by page; their chunks never straddle a page
+PAGED_FORMATS = {".pdf", ".pptx"}
+
+
+class Chunk(BaseModel):
+    document: str = Field(..., description="Name of the document the chunk came from.")
+    index: int = Field(..., description="Position of the chunk within the document.")
+    page: int = Field(..., description="1-based page (or slide) where the chunk starts.")
+    token_offset: int = Field(..., description="Offset of the first token within the document.")
+    tokens: int = Field(..., description="Number of tokens in the chunk.")
+    text: str
+
+
+class IngestResult(BaseModel):
+    document: str
+    chunks: int = 0
+    tokens: int = Field(0, description="Tokens sent for embedding, overlap included.")
+
+
+##############################
+# 1️⃣ Streaming Text Readers  #
+##############################
+def iter_document_text(path: str) -> Iterator[Tuple[int, str]]:
+    # Yields (page, text) one page at a time so large files never sit in memory whole
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".pdf":
+        from pypdf import PdfReader
+        reader = PdfReader(path)
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, page.extract_text() or ""
+    elif extension == ".pptx":
+        from pptx import Presentation
+        for number, slide in enumerate(Presentation(path).slides, start=1):
+            texts = [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+            yield number, "\n".join(texts)
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            while True:
+                block = f.read(64 * 1024)
+                if not block:
+                    break
+                yield 1, block
+
+
+##############################
+# 2️⃣ Token-bounded Chunking  #
+##############################
+def chunk_text(pages: Iterable[Tuple[int, str]], document: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP, align_pages: bool = False) -> Iterator[Chunk]:
+    # align_pages restarts chunking on every page, so an edit on one page leaves the
+    # other pages' chunks (and their cached embeddings) byte-identical
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    buffer: List[int] = []
+    buffer_pages: List[int] = []
+    offset = 0
+    index = 0
+    emitted = 0  # chunks since the buffer was last reset
+
+    def emit(size: int) -> Chunk:
+        return Chunk(document=document, index=index, page=buffer_pages[0], token_offset=offset, tokens=size, text=decode(buffer[:size]))
+
+    def has_tail() -> bool:
+        # Skip a leftover that is nothing but the overlap of the previous chunk
+        return bool(buffer) and (emitted == 0 or len(buffer) > overlap)
+
+    for page, text in pages:
+        if align_pages and buffer and page != buffer_pages[-1]:
+            if has_tail():
+                yield emit(len(buffer))
+                index += 1
+            offset += len(buffer)
+            buffer.clear()
+            buffer_pages.clear()
+            emitted = 0
+        tokens = encode(text)
+        buffer.extend(tokens)
+        buffer_pages.extend([page] * len(tokens))
+        while len(buffer) >= max_tokens:
+            yield emit(max_tokens)
+            index += 1
+            emitted += 1
+            step = max_tokens - overlap
+            del buffer[:step]
+            del buffer_pages[:step]
+            offset += step
+    if has_tail():
+        yield emit(len(buffer))
+
+
+def batched(chunks: Iterable[Chunk], size: int) -> Iterator[List[Chunk]]:
+    batch: List[Chunk] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+##############################
+# 3️⃣ Batched Embedding       #
+##############################
+def request_embeddings(embedder: Any, texts: List[str]) -> List[List[float]]:
+    # One request per batch when the embedder exposes an OpenAI client, else one call per text
+    client = getattr(embedder, "client", None)
+    if client is not None and hasattr(client, "embeddings"):
+        params = {"input": texts, "model": embedder.model}
+        if embedder.model.startswith("text-embedding-3"):
+            params["dimensions"] = embedder.dimensions
+        response = client.embeddings.create(**params)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    return [embedder.get_embedding(text) for text in texts]
+
+
+def embed_texts(embedder: Any, texts: List[str]) -> List[List[float]]:
+    # Chunks seen before (same model, same normalized text) reuse their stored vector
+    model = embedder_id(embedder)
+    vectors = embedding_cache.get_many(model, texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        fresh = request_embeddings(embedder, [texts[i] for i in missing])
+        embedding_cache.set_many(model, [texts[i] for i in missing], fresh)
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+    return vectors
+
+
+def ingest_document(
+    path: str,
+    sink: Callable[[Any, List[Chunk]], None],
+    embedder: Any,
+    document: Optional[str] = None,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_concurrency: int = EMBED_CONCURRENCY,
+    max_tokens: int = CHUNK_TOKENS,
+    overlap: int = CHUNK_OVERLAP,
+    embed: Callable[[Any, List[str]], List[List[float]]] = embed_texts,
+) -> IngestResult:
+    """Stream a document through chunking and batched embedding into `sink(vectors, chunks)`.
+
+    At most `max_concurrency` batches are embedding at once and the sink receives
+    them in document order, so memory stays bounded by the in-flight batches.
+    """
+    import numpy as np
+
+    document = document or os.path.basename(path)
+    result = IngestResult(document=document)
+    in_flight: Deque[Tuple[Any, List[Chunk]]] = deque()
+
+    def drain_oldest():
+        future, chunks = in_flight.popleft()
+        vectors = np.asarray(future.result(), dtype="float32")
+        sink(vectors, chunks)
+        result.chunks += len(chunks)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed") as executor:
+        paged = os.path.splitext(path)[1].lower() in PAGED_FORMATS
+        chunks = chunk_text(iter_document_text(path), document, max_tokens=max_tokens, overlap=overlap, align_pages=paged)
+        for batch in batched(chunks, batch_size):
+            result.tokens += sum(chunk.tokens for chunk in batch)
+            # Batches run in the uploader's context, so they share its rate-limit lane
+            in_flight.append((executor.submit(contextvars.copy_context().run, embed, embedder, [chunk.text for chunk in batch]), batch))
+            if len(in_flight) >= max_concurrency:
+                drain_oldest()
+        while in_flight:
+            drain_oldest()
+    return result
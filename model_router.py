@@ -0,0 +1,219 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from phi.agent import Agent
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def parse_pairs(value: str) -> Dict[str, str]:
+    # "a=1,b=2" settings; names may contain spaces ("Text Processing Agent=fast")
+    return {k.strip(): v.strip() for k, v in (item.split("=", 1) for item in value.split(",") if "=" in item)}
+
+
+# Model behind each tier, fastest last; a breached SLO falls back one tier down
+MODEL_TIERS = {"flagship": "gpt-4o", "fast": "gpt-4o-mini", **parse_pairs(os.getenv("VISIONARY_MODEL_TIERS", ""))}
+# Tier per agent name; agents not listed run on DEFAULT_TIER
+DEFAULT_TIER = os.getenv("VISIONARY_DEFAULT_TIER", "flagship")
+AGENT_TIERS = {
+    "Text Processing Agent": "fast",
+    "Compaction Agent": "fast",
+    **parse_pairs(os.getenv("VISIONARY_AGENT_TIERS", "")),
+}
+# p95 latency objective in seconds, per agent or for all of them; 0 disables fallback
+LATENCY_SLO = float(os.getenv("VISIONARY_LATENCY_SLO", 90))
+AGENT_SLOS = {name: float(slo) for name, slo in parse_pairs(os.getenv("VISIONARY_AGENT_SLOS", "")).items()}
+SLO_WINDOW = int(os.getenv("VISIONARY_SLO_WINDOW", 20))  # recent calls the p95 is taken over
+SLO_MIN_SAMPLES = 5
+SLO_COOLDOWN = float(os.getenv("VISIONARY_SLO_COOLDOWN", 600))  # seconds on the fallback before retrying
+MODEL_STATS_PATH = os.getenv("VISIONARY_MODEL_STATS_PATH", "tmp/model_stats.sqlite")
+
+# USD per million input / output tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "o1": (15.00, 60.00),
+    "o3-mini": (1.10, 4.40),
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def usage(response: Any) -> Tuple[int, int]:
+    # phi keeps one entry per model message (tool calls add more), so sum them
+    metrics = getattr(response, "metrics", None) or {}
+
+    def total(key: str) -> int:
+        value = metrics.get(key, 0)
+        return int(sum(value)) if isinstance(value, list) else int(value or 0)
+
+    return total("input_tokens"), total("output_tokens")
+
+
+##############################
+# Model Router               #
+##############################
+class ModelRouter:
+    """Pick each agent's model from its tier, and step down a tier while its p95 latency breaches the SLO.
+
+    Every API call is appended to a SQLite table (agent, model, latency, tokens,
+    cost), so tier assignments can be tuned from real traffic with `report()`.
+    """
+
+    def __init__(self, path: str = MODEL_STATS_PATH, tiers: Optional[Dict[str, str]] = None, agent_tiers: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.tiers = tiers if tiers is not None else MODEL_TIERS
+        self.agent_tiers = agent_tiers if agent_tiers is not None else AGENT_TIERS
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=SLO_WINDOW))
+        self._degraded: Dict[str, float] = {}  # agent -> monotonic time the fallback ends
+        self._variants: Dict[Tuple[int, str], Tuple["Agent", "Agent"]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS calls (created REAL, agent TEXT, model TEXT, tier TEXT, fallback INTEGER, "
+                "latency REAL, input_tokens INTEGER, output_tokens INTEGER, cost REAL, ok INTEGER, first_token REAL)"
+            )
+            # Tables created before streaming have no time-to-first-token column
+            if "first_token" not in {row[1] for row in self._conn.execute("PRAGMA table_info(calls)")}:
+                self._conn.execute("ALTER TABLE calls ADD COLUMN first_token REAL")
+            self._conn.commit()
+        return self._conn
+
+    # -- routing -------------------------------------------------------------
+    def tier_for(self, agent_name: str) -> str:
+        tier = self.agent_tiers.get(agent_name, DEFAULT_TIER)
+        return tier if tier in self.tiers else DEFAULT_TIER
+
+    def model_for(self, agent_name: str) -> str:
+        """Configured model for an agent, used when its factory builds it."""
+        return self.tiers[self.tier_for(agent_name)]
+
+    def slo_for(self, agent_name: str) -> float:
+        return AGENT_SLOS.get(agent_name, LATENCY_SLO)
+
+    def p95(self, agent_name: str, model: str) -> float:
+        with self._lock:
+            return percentile(list(self._latencies[(agent_name, model)]), 0.95)
+
+    def route(self, agent_name: str, model: str) -> str:
+        """Model this call should use: the agent's own, or the next tier down while degraded."""
+        tiers = list(self.tiers.values())
+        if model not in tiers or tiers.index(model) == len(tiers) - 1:
+            return model
+        fallback = tiers[tiers.index(model) + 1]
+        slo = self.slo_for(agent_name)
+        with self._lock:
+            until = self._degraded.get(agent_name)
+            if until is not None:
+                if time.monotonic() < until:
+                    return fallback
+                # Cooldown over: give the primary a fresh window instead of its stale slow samples
+                del self._degraded[agent_name]
+                self._latencies[(agent_name, model)].clear()
+            window = self._latencies[(agent_name, model)]
+            if slo > 0 and len(window) >= SLO_MIN_SAMPLES and percentile(list(window), 0.95) > slo:
+                self._degraded[agent_name] = time.monotonic() + SLO_COOLDOWN
+                return fallback
+        return model
+
+    def variant(self, agent: "Agent", model: str) -> "Agent":
+        # Copies with a different model are built once per agent and reused; the original is
+        # kept alongside so its id cannot be recycled for another agent
+        key = (id(agent), model)
+        with self._lock:
+            if key not in self._variants:
+                from http_clients import openai_chat
+                self._variants[key] = (agent, agent.deep_copy(update={"model": openai_chat(model)}))
+            return self._variants[key][1]
+
+    # -- accounting ----------------------------------------------------------
+    def record(self, agent_name: str, model: str, latency: float, response: Any = None, ok: bool = True, first_token: Optional[float] = None):
+        # `first_token` is only known for streamed calls
+        input_tokens, output_tokens = usage(response)
+        tier = next((name for name, tier_model in self.tiers.items() if tier_model == model), "")
+        with self._lock:
+            self._latencies[(agent_name, model)].append(latency)
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT INTO calls (created, agent, model, tier, fallback, latency, input_tokens, output_tokens, cost, ok, first_token) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), agent_name, model, tier, int(model != self.model_for(agent_name)), latency,
+                     input_tokens, output_tokens, call_cost(model, input_tokens, output_tokens), int(ok), first_token),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                # Accounting must never cost the caller its answer
+                logger.warning(f"Could not record model call: {e}")
+
+    def report(self, since: float = 0.0) -> List[Dict[str, Any]]:
+        """Per agent and model: calls, p50/p95 latency, streamed time to first token, mean tokens and total cost since `since`."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT agent, model, latency, input_tokens, output_tokens, cost, ok, fallback, first_token FROM calls WHERE created >= ?",
+                (since,),
+            ).fetchall()
+        groups: Dict[Tuple[str, str], List[tuple]] = defaultdict(list)
+        for row in rows:
+            groups[(row[0], row[1])].append(row)
+        return [
+            {
+                "agent": agent,
+                "model": model,
+                "calls": len(calls),
+                "fallbacks": sum(c[7] for c in calls),
+                "errors": sum(1 - c[6] for c in calls),
+                "p50_s": round(percentile([c[2] for c in calls], 0.5), 2),
+                "p95_s": round(percentile([c[2] for c in calls], 0.95), 2),
+                "p50_first_token_s": round(percentile([c[8] for c in calls if c[8] is not None], 0.5), 2),
+                "mean_input_tokens": round(sum(c[3] for c in calls) / len(calls)),
+                "mean_output_tokens": round(sum(c[4] for c in calls) / len(calls)),
+                "cost_usd": round(sum(c[5] for c in calls), 4),
+            }
+            for (agent, model), calls in sorted(groups.items())
+        ]
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            degraded = [name for name, until in self._degraded.items() if until > time.monotonic()]
+        return {"degraded": degraded, "agents": self.report(since=time.time() - 24 * 60 * 60)}
+
+
+model_router = ModelRouter()
+
+
+def chat_model(agent_name: str):
+    """OpenAIChat for an agent's configured tier, on the shared client; agent factories use this instead of a fixed id."""
+    from http_clients import openai_chat
+    return openai_chat(model_router.model_for(agent_name))
+
+
+if __name__ == "__main__":
+    import json
+    for line in model_router.report():
+        print(json.dumps(line))
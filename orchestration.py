@@ -0,0 +1,203 @@
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+from pydantic import BaseModel, Field
+
+# Threads the hedged calls run on; a losing call keeps its thread until it returns, so this
+# must cover every search in flight plus the stragglers
+HEDGE_WORKERS = int(os.getenv("VISIONARY_HEDGE_WORKERS", 64))
+
+
+##############################
+# Deadlines                  #
+##############################
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound the calls made inside the block to `seconds` from now, never past an enclosing deadline."""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+
+def check_deadline(what: str = "call"):
+    # Work left over after a deadline (e.g. the next tool call of an abandoned agent) stops here
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline passed before {what}")
+
+
+##############################
+# Parallel Stage Results     #
+##############################
+class ParallelResult(BaseModel):
+    results: Dict[str, Any] = Field(default_factory=dict, description="Outputs of the tasks that finished in time.")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Error message per failed or timed-out task.")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent waiting on each task.")
+    elapsed: float = Field(0.0, description="Wall-clock seconds for the whole fan-out.")
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def merge(self, other: "ParallelResult") -> "ParallelResult":
+        # Fold a later stage into this one; elapsed is left for the caller to set
+        self.results.update(other.results)
+        self.errors.update(other.errors)
+        self.timings.update(other.timings)
+        return self
+
+
+##############################
+# Fan-out Runner             #
+##############################
+def run_parallel(
+    tasks: Dict[str, Callable[[], Any]],
+    timeout: Optional[Union[float, Dict[str, float]]] = None,
+    max_workers: Optional[int] = None,
+) -> ParallelResult:
+    """Start every task at once and collect what finishes before its own deadline.
+
+    `timeout` is either one value for all tasks or a mapping of task name to seconds.
+    A failing or slow task is recorded in `errors` without discarding the others.
+    """
+    result = ParallelResult()
+    if not tasks:
+        return result
+
+    started = time.monotonic()
+    finished_at: Dict[str, float] = {}
+    enclosing = _deadline.get()
+
+    def deadline_for(name: str) -> Optional[float]:
+        seconds = timeout.get(name) if isinstance(timeout, dict) else timeout
+        own = None if seconds is None else started + seconds
+        return min((at for at in (own, enclosing) if at is not None), default=None)
+
+    def timed(name: str, func: Callable[[], Any]) -> Any:
+        # The task's deadline travels with it, so the agent and tool calls inside it stop at the same time
+        at = deadline_for(name)
+        try:
+            with deadline(None if at is None else at - time.monotonic()):
+                return func()
+        finally:
+            finished_at[name] = time.monotonic()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(tasks), thread_name_prefix="stage")
+    try:
+        # Each task runs in a copy of the caller's context, so settings such as the rate-limit lane carry over
+        futures = {name: executor.submit(contextvars.copy_context().run, timed, name, func) for name, func in tasks.items()}
+
+        # Wait on the earliest deadline first so a long timeout never stretches a short one
+        order = sorted(futures, key=lambda name: deadline_for(name) or float("inf"))
+        for name in order:
+            due = deadline_for(name)
+            left = None if due is None else max(0.0, due - time.monotonic())
+            try:
+                result.results[name] = futures[name].result(timeout=left)
+            except FutureTimeoutError:
+                futures[name].cancel()
+                result.errors[name] = f"Timed out after {due - started:.1f}s"
+            except Exception as e:
+                result.errors[name] = f"{type(e).__name__}: {e}"
+            result.timings[name] = finished_at.get(name, time.monotonic()) - started
+    finally:
+        # Threads cannot be interrupted; a timed-out call finishes in the background and is dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+##############################
+# Hedged Calls               #
+##############################
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+
+
+def hedged(
+    primary: Callable[[], Any],
+    alternate: Callable[[], Any],
+    delay: float,
+    usable: Callable[[Any], bool] = lambda result: result is not None,
+    timeout: Optional[float] = None,
+) -> Tuple[str, Any]:
+    """Run `primary`, and `alternate` too once `delay` seconds pass (or primary fails first).
+
+    Returns ("primary" | "alternate", answer) for the first usable answer. If
+    neither is usable, the last answer is returned or the last error re-raised.
+    Stops at `timeout` or the current deadline with DeadlineExceeded.
+    Running threads cannot be interrupted. A call that loses is left to finish
+    on its own and is never waited on, and an alternate still queued is
+    cancelled. Both calls run under the same deadline, so a loser stops at its
+    next check.
+    """
+    limits = [t for t in (timeout, remaining()) if t is not None]
+    end = time.monotonic() + min(limits) if limits else None
+
+    def launch(func: Callable[[], Any]) -> Future:
+        def bounded() -> Any:
+            with deadline(None if end is None else end - time.monotonic()):
+                return func()
+        return _hedge_pool.submit(contextvars.copy_context().run, bounded)
+
+    futures: Dict[str, Future] = {"primary": launch(primary)}
+    hedge_at = time.monotonic() + delay
+    seen = set()
+    last: Tuple[str, Any] = ("primary", None)
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            if "alternate" not in futures and time.monotonic() >= hedge_at:
+                futures["alternate"] = launch(alternate)
+            for name, future in futures.items():
+                if name in seen or not future.done():
+                    continue
+                seen.add(name)
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if usable(answer):
+                    return name, answer
+                last, error = (name, answer), None
+            if "alternate" not in futures and "primary" in seen:
+                # Primary answered with nothing usable: no reason to keep waiting for the hedge time
+                hedge_at = time.monotonic()
+                continue
+            if len(seen) == 2:
+                break
+            wakes = [at for at in (end, None if "alternate" in futures else hedge_at) if at is not None]
+            wait_for = max(0.0, min(wakes) - time.monotonic()) if wakes else None
+            if end is not None and time.monotonic() >= end:
+                raise DeadlineExceeded(f"No usable answer within {min(limits):.1f}s")
+            wait([f for name, f in futures.items() if name not in seen], timeout=wait_for, return_when=FIRST_COMPLETED)
+    finally:
+        for future in futures.values():
+            future.cancel()
+    if error is not None:
+        raise error
+    return last
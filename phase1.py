@@ -1,112 +1,152 @@
 import os
-   
-from phi.tools.firecrawl import FirecrawlTools
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.model.openai import OpenAIChat
-from phi.knowledge.pdf import PDFUrlKnowledgeBase
-from phi.embedder.openai import OpenAIEmbedder
-from phi.vectordb.lancedb import LanceDb, SearchType
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-import helium
-from typing import List
+from typing import List, TYPE_CHECKING
 from pydantic import BaseModel, Field
-from fastapi import UploadFile
+from agent_registry import DEFAULT_PARTITION, LazyRegistry, PartitionPool
+from agent_runtime import run_agent
+from model_router import chat_model
+from rate_limits import rate_limited
+from retrieval import RETRIEVAL_MODE
+from schemas import CompanySummary
+
+if TYPE_CHECKING:
+    from fastapi import UploadFile
 
 # Load environment variables (API keys, etc.)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Agents, the browser and the knowledge base are built on first use, so importing
+# this module never starts Chrome or touches LanceDB
+agents = LazyRegistry()
+
+def __getattr__(name: str):
+    # Keeps `phase1.knowledge_base` style access working without eager construction
+    if name in agents:
+        return agents.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 ##############################
 # 1️⃣ Company Search Agent   #
 ##############################
-company_search_agent = Agent(
-    name="Company Search Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Finds company details based on name using web search.",
-    instructions=["Always include sources in search results."],
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def search_company(company_name: str):
+@agents.register("company_search_agent")
+def build_company_search_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    return Agent(
+        name="Company Search Agent",
+        model=chat_model("Company Search Agent"),
+        tools=[rate_limited(DuckDuckGo(), "duckduckgo")],
+        description="Finds company details based on name using web search.",
+        instructions=["Always include sources in search results."],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def search_company(company_name: str, stream: bool = False):
     query = f"Find detailed company information for {company_name}. Extract its official website, mission, services, and any AI-related initiatives. Prioritize official sources and provide links where available."
-    return company_search_agent.print_response(query)
+    return run_agent(agents.get("company_search_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ Website Scraper Agent   #
 ##############################
-firecrawl_agent = Agent(
-    name="Website Scraper Agent",
-    tools=[FirecrawlTools(scrape=True, crawl=False)],
-    description="Extracts content from company websites.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def scrape_website(url: str):
-    return firecrawl_agent.print_response(f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.")
-
-# Helium for dynamic websites
-chrome_options = webdriver.ChromeOptions()
-chrome_options.add_argument("--headless")
-driver = helium.start_chrome(headless=True, options=chrome_options)
+@agents.register("firecrawl_agent")
+def build_firecrawl_agent():
+    from phi.agent import Agent
+    from phi.tools.firecrawl import FirecrawlTools
+    return Agent(
+        name="Website Scraper Agent",
+        model=chat_model("Website Scraper Agent"),
+        tools=[FirecrawlTools(scrape=True, crawl=False)],
+        description="Extracts content from company websites.",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+def scrape_website(url: str, stream: bool = False):
+    return run_agent(agents.get("firecrawl_agent"), f"Extract all relevant business information from {url}, including mission statement, services, case studies, and AI-related content. Provide structured output.", stream=stream)
+
+# Pooled headless Chrome for dynamic websites: each session checks out its own driver
+@agents.register("browser_pool")
+def build_browser_pool():
+    from browser_pool import BrowserPool
+    return BrowserPool()
 
 def scrape_dynamic_website(url: str):
-    helium.go_to(url)
-    text = helium.get_driver().page_source
-    return text
+    return agents.get("browser_pool").fetch(url)
 
 
 ##############################
 # 3️⃣ Text Processing Agent   #
 ##############################
-class CompanySummary(BaseModel):
-    summary: str = Field(..., description="Summarized company details based on user input.")
+@agents.register("text_processing_agent")
+def build_text_processing_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Text Processing Agent",
+        model=chat_model("Text Processing Agent"),
+        description="Summarizes user-written company descriptions.",
+        response_model=CompanySummary,
+    )
 
-text_processing_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    description="Summarizes user-written company descriptions.",
-    response_model=CompanySummary,
-)
-
-def process_company_description(text: str):
-    return text_processing_agent.print_response(f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.")
+def process_company_description(text: str, stream: bool = False):
+    return run_agent(agents.get("text_processing_agent"), f"Summarize the following company description: {text}. Focus on key services, mission, industry, and potential AI use cases where applicable.", stream=stream)
 
 
 #################################
 # 4️⃣ Document Processing Agent  #
 #################################
-# LanceDB for storing extracted knowledge
-knowledge_base = PDFUrlKnowledgeBase(
-    urls=[],  # PDFs will be dynamically added
-    vector_db=LanceDb(
-        table_name="company_docs",
-        uri="tmp/lancedb",
-        search_type=SearchType.vector,
-        embedder=OpenAIEmbedder(model="text-embedding-3-small"),
-    ),
-)
-knowledge_base.load(recreate=False)
-
-document_processing_agent = Agent(
-    model=OpenAIChat(id="gpt-4o"),
-    knowledge=knowledge_base,
-    description="Extracts and processes data from uploaded PDFs/PPTs.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def process_uploaded_document(file: UploadFile):
+# LanceDB for storing extracted knowledge, one table per company or session so
+# retrieval never scans (or returns) another tenant's documents
+def build_knowledge_base(partition: str):
+    from phi.knowledge.pdf import PDFUrlKnowledgeBase
+    from http_clients import openai_embedder
+    from phi.vectordb.lancedb import LanceDb, SearchType
+    knowledge_base = PDFUrlKnowledgeBase(
+        urls=[],  # PDFs will be dynamically added
+        vector_db=LanceDb(
+            # The default partition keeps the pre-partitioning table name
+            table_name="company_docs" if partition == DEFAULT_PARTITION else f"company_docs_{partition}",
+            uri="tmp/lancedb",
+            # Hybrid adds a full-text index and fuses both rankings with LanceDB's default RRF reranker;
+            # the native FTS index avoids a tantivy dependency
+            search_type=SearchType(RETRIEVAL_MODE),
+            use_tantivy=False,
+            embedder=openai_embedder("text-embedding-3-small"),
+        ),
+    )
+    knowledge_base.load(recreate=False)
+    return knowledge_base
+
+def build_document_processing_agent(partition: str):
+    from phi.agent import Agent
+    return Agent(
+        name="Document Processing Agent",
+        model=chat_model("Document Processing Agent"),
+        knowledge=knowledge_bases.get(partition),
+        description="Extracts and processes data from uploaded PDFs/PPTs.",
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+knowledge_bases = PartitionPool(build_knowledge_base)
+document_agents = PartitionPool(build_document_processing_agent)
+
+@agents.register("knowledge_base")
+def build_default_knowledge_base():
+    return knowledge_bases.get(DEFAULT_PARTITION)
+
+@agents.register("document_processing_agent")
+def build_default_document_processing_agent():
+    return document_agents.get(DEFAULT_PARTITION)
+
+def process_uploaded_document(file: "UploadFile", partition: str = DEFAULT_PARTITION):
     file_path = f"tmp/{file.filename}"
     with open(file_path, "wb") as buffer:
         buffer.write(file.file.read())
     
-    knowledge_base.load(recreate=False)
-    return document_processing_agent.print_response(f"Analyze and extract key insights from the uploaded document: {file.filename}. Summarize business operations, AI-related discussions, financial details, and relevant strategic insights.")
+    knowledge_bases.get(partition).load(recreate=False)
+    return run_agent(document_agents.get(partition), f"Analyze and extract key insights from the uploaded document: {file.filename}. Summarize business operations, AI-related discussions, financial details, and relevant strategic insights.")
 
 
 ###########################
@@ -115,15 +155,15 @@ def process_uploaded_document(file: UploadFile):
 if __name__ == "__main__":
     company_name = "Tesla"
     print("Company Search Results:")
-    search_company(company_name)
+    print(search_company(company_name))
     
     website_url = "https://www.tesla.com"
     print("\nScraped Website Data:")
-    scrape_website(website_url)
+    print(scrape_website(website_url))
     
     user_description = "We are a renewable energy startup focusing on solar solutions."
     print("\nProcessed Company Description:")
-    process_company_description(user_description)
+    print(process_company_description(user_description))
     
     # Example of handling an uploaded file
     # process_uploaded_document(uploaded_file)
@@ -1,64 +1,111 @@
 import os
-from phi.agent import Agent
-from phi.tools.duckduckgo import DuckDuckGo
-from phi.tools.exa import ExaTools
-from phi.model.openai import OpenAIChat
 from typing import List
 from pydantic import BaseModel, Field
+from agent_registry import LazyRegistry
+from agent_runtime import run_agent
+from model_router import chat_model
+from rate_limits import rate_limited
+from orchestration import ParallelResult, run_parallel
+from schemas import AIUseCases, CompetitorAnalysis, IndustryTrends, as_markdown
 
 # Load environment variables (API keys, etc.)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Agents and their OpenAI clients are built on first use
+agents = LazyRegistry()
+
+def __getattr__(name: str):
+    # Keeps `module.agent_name` style access working without eager construction
+    if name in agents:
+        return agents.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 ##############################
 # 1️⃣ Industry Trends Agent  #
 ##############################
-industry_trends_agent = Agent(
-    name="Industry Trends Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"])],
-    description="Finds the latest AI advancements in a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_industry_trends(industry: str):
+@agents.register("industry_trends_agent")
+def build_industry_trends_agent():
+    from phi.agent import Agent
+    from phi.tools.exa import ExaTools
+    return Agent(
+        name="Industry Trends Agent",
+        model=chat_model("Industry Trends Agent"),
+        tools=[rate_limited(ExaTools(include_domains=["cnbc.com", "reuters.com", "bloomberg.com"]), "exa")],
+        description="Finds the latest AI advancements in a given industry.",
+        show_tool_calls=True,
+        response_model=IndustryTrends,
+        structured_outputs=True,
+    )
+
+def get_industry_trends(industry: str, stream: bool = False):
     query = f"Latest AI advancements and technology trends in {industry}."
-    return industry_trends_agent.print_response(query)
+    return run_agent(agents.get("industry_trends_agent"), query, stream=stream)
 
 
 ##################################
 # 2️⃣ AI Use Case Discovery Agent #
 ##################################
-ai_use_case_agent = Agent(
-    name="AI Use Case Discovery Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo()],
-    description="Identifies AI applications relevant to a given industry.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_ai_use_cases(industry: str):
+@agents.register("ai_use_case_agent")
+def build_ai_use_case_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="AI Use Case Discovery Agent",
+        model=chat_model("AI Use Case Discovery Agent"),
+        # Exa answers in place of DuckDuckGo when a search runs past DuckDuckGo's usual p90
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(), "exa"))],
+        description="Identifies AI applications relevant to a given industry.",
+        show_tool_calls=True,
+        response_model=AIUseCases,
+        structured_outputs=True,
+    )
+
+def get_ai_use_cases(industry: str, stream: bool = False):
     query = f"How is AI being used in {industry}? Provide real-world AI applications and case studies."
-    return ai_use_case_agent.print_response(query)
+    return run_agent(agents.get("ai_use_case_agent"), query, stream=stream)
 
 
 ####################################
 # 3️⃣ Competitive Analysis Agent   #
 ####################################
-competitive_analysis_agent = Agent(
-    name="Competitive Analysis Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGo(), ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"])],
-    description="Analyzes how competitors are using AI in their businesses.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_competitor_ai_strategies(company_name: str):
+@agents.register("competitive_analysis_agent")
+def build_competitive_analysis_agent():
+    from phi.agent import Agent
+    from phi.tools.duckduckgo import DuckDuckGo
+    from phi.tools.exa import ExaTools
+    from search_tools import HedgedSearch
+    return Agent(
+        name="Competitive Analysis Agent",
+        model=chat_model("Competitive Analysis Agent"),
+        # One hedged search instead of two tools: the model no longer waits on whichever backend it picked
+        tools=[HedgedSearch(rate_limited(DuckDuckGo(), "duckduckgo"), rate_limited(ExaTools(include_domains=["techcrunch.com", "forbes.com", "businessinsider.com"]), "exa"))],
+        description="Analyzes how competitors are using AI in their businesses.",
+        show_tool_calls=True,
+        response_model=CompetitorAnalysis,
+        structured_outputs=True,
+    )
+
+def get_competitor_ai_strategies(company_name: str, stream: bool = False):
     query = f"How is {company_name} leveraging AI in its business operations? Find relevant reports and case studies."
-    return competitive_analysis_agent.print_response(query)
+    return run_agent(agents.get("competitive_analysis_agent"), query, stream=stream)
+
+
+##############################
+# 4️⃣ Phase 2 Runner          #
+##############################
+# Seconds each research agent may take before its result is dropped
+PHASE2_TIMEOUT = 120
+
+def run_phase2(industry: str, competitor: str, timeout: float = PHASE2_TIMEOUT) -> ParallelResult:
+    # The three research agents are independent, so run them side by side instead of back to back
+    return run_parallel({
+        "industry_trends": lambda: get_industry_trends(industry),
+        "ai_use_cases": lambda: get_ai_use_cases(industry),
+        "competitor_analysis": lambda: get_competitor_ai_strategies(competitor),
+    }, timeout=timeout)
 
 
 ###########################
@@ -66,12 +113,17 @@ def get_competitor_ai_strategies(company_name: str):
 ###########################
 if __name__ == "__main__":
     industry = "Healthcare"
+    competitor = "Pfizer"
+    phase2 = run_phase2(industry, competitor)
+    
     print("Industry Trends:")
-    get_industry_trends(industry)
+    print(as_markdown(phase2.results.get("industry_trends")))
     
     print("\nAI Use Cases:")
-    get_ai_use_cases(industry)
+    print(as_markdown(phase2.results.get("ai_use_cases")))
     
-    competitor = "Pfizer"
     print("\nCompetitor AI Strategies:")
-    get_competitor_ai_strategies(competitor)
+    print(as_markdown(phase2.results.get("competitor_analysis")))
+    
+    for name, error in phase2.errors.items():
+        print(f"\n{name} failed: {error}")
@@ -1,36 +1,73 @@
 import os
-from phi.agent import Agent
-from phi.model.openai import OpenAIChat
-from typing import List
+import re
+import time
+import uuid
+from typing import List, Optional
 from pydantic import BaseModel, Field
 import markdown2
 import pdfkit
+from agent_registry import LazyRegistry
+from agent_runtime import run_agent
+from compaction import compact
+from context_builder import build_context
+from model_router import chat_model
+from orchestration import ParallelResult, run_parallel
+from schemas import AIStrategy, AIUseCases, CompetitorAnalysis, IndustryTrends, IntegrationPlan, RevenueOpportunities, as_markdown, as_prompt
 
 # Load environment variables (API keys, etc.)
 from dotenv import load_dotenv
 load_dotenv()
 
+# Agents and their OpenAI clients are built on first use
+agents = LazyRegistry()
+
+def __getattr__(name: str):
+    # Keeps `module.agent_name` style access working without eager construction
+    if name in agents:
+        return agents.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 
 ##############################
 # 1️⃣ Reasoning Agent        #
 ##############################
-reasoning_agent = Agent(
-    name="Reasoning Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Processes all collected data and generates structured AI adoption strategies.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases: str, competitor_analysis: str):
+@agents.register("reasoning_agent")
+def build_reasoning_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Reasoning Agent",
+        model=chat_model("Reasoning Agent"),
+        description="Processes all collected data and generates structured AI adoption strategies.",
+        show_tool_calls=True,
+        response_model=AIStrategy,
+        structured_outputs=True,
+    )
+
+# Retrieval queries for each part of the strategy prompt; inputs are cut down to the
+# passages these match, within the context token budget
+STRATEGY_SECTIONS = [
+    "AI opportunities to enhance operations, customer experience and business efficiency",
+    "AI tools, models, platforms and methodologies that fit the company",
+    "implementation roadmap, costs, scalability, ROI and benchmarks",
+    "future scalability and long-term growth from AI adoption",
+]
+
+def generate_ai_strategy(company_data: str, industry_trends: IndustryTrends | str, ai_use_cases: AIUseCases | str, competitor_analysis: CompetitorAnalysis | str, stream: bool = False):
+    # Earlier phases' output is deduplicated and held to its stage budget before passages are picked
+    context = build_context({
+        "company_data": compact("company_data", as_prompt(company_data)),
+        "industry_trends": compact("industry_trends", as_prompt(industry_trends)),
+        "ai_use_cases": compact("ai_use_cases", as_prompt(ai_use_cases)),
+        "competitor_analysis": compact("competitor_analysis", as_prompt(competitor_analysis)),
+    }, STRATEGY_SECTIONS)
     query = f"""
     You are an AI business strategist analyzing a company's potential AI adoption. Given the following:
     
-    - **Company Overview:** {company_data}
-    - **Industry Trends:** {industry_trends}
-    - **AI Use Cases:** {ai_use_cases}
-    - **Competitor AI Strategies:** {competitor_analysis}
+    - **Company Overview:** {context["company_data"]}
+    - **Industry Trends:** {context["industry_trends"]}
+    - **AI Use Cases:** {context["ai_use_cases"]}
+    - **Competitor AI Strategies:** {context["competitor_analysis"]}
     
     Generate a structured AI adoption strategy that includes:
     1. **AI Opportunities**: Identify key areas where AI can enhance operations, customer experience, or business efficiency.
@@ -40,26 +77,39 @@ def generate_ai_strategy(company_data: str, industry_trends: str, ai_use_cases:
     
     Provide structured insights with a logical flow and avoid generic statements. Use industry benchmarks where possible.
     """
-    return reasoning_agent.print_response(query)
+    return run_agent(agents.get("reasoning_agent"), query, stream=stream)
 
 
 ##############################
 # 2️⃣ AI Integration Advisor  #
 ##############################
-ai_integration_agent = Agent(
-    name="AI Integration Advisor",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Suggests AI implementation strategies based on industry insights and company operations.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def suggest_ai_integration(company_data: str, ai_strategy: str):
+@agents.register("ai_integration_agent")
+def build_ai_integration_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="AI Integration Advisor",
+        model=chat_model("AI Integration Advisor"),
+        description="Suggests AI implementation strategies based on industry insights and company operations.",
+        show_tool_calls=True,
+        response_model=IntegrationPlan,
+        structured_outputs=True,
+    )
+
+INTEGRATION_SECTIONS = [
+    "phased AI integration from pilot testing to full deployment",
+    "technology, infrastructure, AI tools, cloud platforms and software",
+    "workforce, training and upskilling employees",
+    "risk, data security, compliance and ethical concerns",
+    "KPIs and measurable AI performance indicators",
+]
+
+def suggest_ai_integration(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, INTEGRATION_SECTIONS)
     query = f"""
     Based on the AI adoption strategy:
     
-    - **Company Context:** {company_data}
-    - **AI Strategy Summary:** {ai_strategy}
+    - **Company Context:** {context["company_data"]}
+    - **AI Strategy Summary:** {context["ai_strategy"]}
     
     Provide a structured AI implementation plan:
     1. **Step-by-step AI Integration**: List phases of AI adoption, from pilot testing to full deployment.
@@ -70,26 +120,38 @@ def suggest_ai_integration(company_data: str, ai_strategy: str):
     
     The output should be detailed, actionable, and specific to the business domain.
     """
-    return ai_integration_agent.print_response(query)
+    return run_agent(agents.get("ai_integration_agent"), query, stream=stream)
 
 
 ##############################
 # 3️⃣ Revenue Growth Agent    #
 ##############################
-revenue_growth_agent = Agent(
-    name="Revenue Growth Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def identify_revenue_opportunities(company_data: str, ai_strategy: str):
+@agents.register("revenue_growth_agent")
+def build_revenue_growth_agent():
+    from phi.agent import Agent
+    return Agent(
+        name="Revenue Growth Agent",
+        model=chat_model("Revenue Growth Agent"),
+        description="Identifies AI-driven opportunities to enhance revenue and efficiency.",
+        show_tool_calls=True,
+        response_model=RevenueOpportunities,
+        structured_outputs=True,
+    )
+
+REVENUE_SECTIONS = [
+    "AI monetization, new revenue streams, AI-driven products, services and data",
+    "cost reduction, automation and operational efficiency gains",
+    "market expansion, new markets and scaling offerings",
+    "competitive positioning, industry leaders and differentiation",
+]
+
+def identify_revenue_opportunities(company_data: str, ai_strategy: AIStrategy | str, stream: bool = False):
+    context = build_context({"company_data": compact("company_data", as_prompt(company_data)), "ai_strategy": compact("ai_strategy", as_prompt(ai_strategy))}, REVENUE_SECTIONS)
     query = f"""
     You are an AI business analyst tasked with identifying AI-driven revenue growth opportunities for:
     
-    - **Company Overview:** {company_data}
-    - **AI Strategy:** {ai_strategy}
+    - **Company Overview:** {context["company_data"]}
+    - **AI Strategy:** {context["ai_strategy"]}
     
     Provide:
     1. **AI Monetization Strategies**: Explain how AI can create new revenue streams (e.g., AI-driven products, services, or data monetization).
@@ -99,34 +161,75 @@ def identify_revenue_opportunities(company_data: str, ai_strategy: str):
     
     Ensure detailed, actionable insights with real-world examples where applicable.
     """
-    return revenue_growth_agent.print_response(query)
+    return run_agent(agents.get("revenue_growth_agent"), query, stream=stream)
 
 
 ##############################
 # 4️⃣ Report Generation Agent #
 ##############################
-def generate_report(company_name: str, ai_strategy: str, ai_integration: str, revenue_opportunities: str):
-    report_content = f"""
-    # AI Strategy Report for {company_name}
-    
-    ## AI Adoption Strategy
-    {ai_strategy}
-    
-    ## AI Implementation Plan
-    {ai_integration}
-    
-    ## Revenue Growth Opportunities
-    {revenue_opportunities}
-    
-    """
+# Every report gets its own folder here, so reports for the same company never overwrite each other
+REPORTS_DIR = os.getenv("VISIONARY_REPORTS_DIR", "tmp/reports")
+
+def new_report_path(company_name: str, folder: Optional[str] = None) -> str:
+    # The company name is user input: keep only a safe file name, and never a path
+    safe_name = re.sub(r"[^\w.-]+", "_", company_name).strip("._") or "company"
+    return os.path.join(REPORTS_DIR, folder or uuid.uuid4().hex, f"{safe_name}_AI_Report.pdf")
+
+def generate_report(company_name: str, ai_strategy: AIStrategy | str, ai_integration: IntegrationPlan | str, revenue_opportunities: RevenueOpportunities | str, report_path: Optional[str] = None):
+    report_path = report_path or new_report_path(company_name)
+    # Sections render from the structured results; joined flush-left so markdown2 does not read them as code
+    report_content = "\n\n".join([
+        f"# AI Strategy Report for {company_name}",
+        "## AI Adoption Strategy",
+        as_markdown(ai_strategy),
+        "## AI Implementation Plan",
+        as_markdown(ai_integration),
+        "## Revenue Growth Opportunities",
+        as_markdown(revenue_opportunities),
+    ])
     
     # Convert to Markdown
     markdown_report = markdown2.markdown(report_content)
     
     # Convert Markdown to PDF
-    pdfkit.from_string(markdown_report, f"{company_name}_AI_Report.pdf")
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    pdfkit.from_string(markdown_report, report_path)
     
-    return f"Report generated: {company_name}_AI_Report.pdf"
+    return f"Report generated: {report_path}"
+
+
+##############################
+# 5️⃣ Phase 3 Runner          #
+##############################
+# Seconds each reasoning agent may take before its result is dropped
+PHASE3_TIMEOUT = 180
+
+def run_phase3(company_name: str, company_data: str, industry_trends: IndustryTrends | str, ai_use_cases: AIUseCases | str, competitor_analysis: CompetitorAnalysis | str, timeout: float = PHASE3_TIMEOUT) -> ParallelResult:
+    started = time.monotonic()
+    result = run_parallel({
+        "ai_strategy": lambda: generate_ai_strategy(company_data, industry_trends, ai_use_cases, competitor_analysis),
+    }, timeout=timeout)
+    if "ai_strategy" not in result.results:
+        result.elapsed = time.monotonic() - started
+        return result
+    ai_strategy = result.results["ai_strategy"]
+
+    # Both follow-ups only need the strategy, so they share one round trip instead of two
+    result.merge(run_parallel({
+        "ai_integration": lambda: suggest_ai_integration(company_data, ai_strategy),
+        "revenue_opportunities": lambda: identify_revenue_opportunities(company_data, ai_strategy),
+    }, timeout=timeout))
+
+    sections = {
+        name: result.results.get(name) or f"_Not available: {result.errors.get(name)}_"
+        for name in ("ai_integration", "revenue_opportunities")
+    }
+    try:
+        result.results["report"] = generate_report(company_name, ai_strategy, sections["ai_integration"], sections["revenue_opportunities"])
+    except Exception as e:
+        result.errors["report"] = f"{type(e).__name__}: {e}"
+    result.elapsed = time.monotonic() - started
+    return result
 
 
 ###########################
@@ -139,14 +242,9 @@ if __name__ == "__main__":
     ai_use_cases = "AI used in predictive maintenance, customer behavior analysis, and automation."
     competitor_analysis = "Ford and GM are integrating AI into manufacturing and autonomous vehicle tech."
     
-    print("Generating AI Strategy...")
-    ai_strategy = generate_ai_strategy(company_data, industry_trends, ai_use_cases, competitor_analysis)
-    
-    print("\nSuggesting AI Integration Plan...")
-    ai_integration = suggest_ai_integration(company_data, ai_strategy)
-    
-    print("\nIdentifying Revenue Growth Opportunities...")
-    revenue_opportunities = identify_revenue_opportunities(company_data, ai_strategy)
+    print("Generating AI Strategy, Integration Plan and Revenue Opportunities...")
+    phase3 = run_phase3(company_name, company_data, industry_trends, ai_use_cases, competitor_analysis)
     
-    print("\nGenerating Final Report...")
-    generate_report(company_name, ai_strategy, ai_integration, revenue_opportunities)
\ No newline at end of file
+    for name in ("ai_strategy", "ai_integration", "revenue_opportunities", "report"):
+        print(f"\n{name}:")
+        print(as_markdown(phase3.results.get(name, phase3.errors.get(name))))
\ No newline at end of file
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from pydantic import Field
+from orchestration import ParallelResult, deadline
+from schemas import as_jsonable
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# Memo settings, overridable from the environment
+PIPELINE_PATH = os.getenv("VISIONARY_PIPELINE_PATH", "tmp/pipeline.sqlite")
+PIPELINE_TTL = float(os.getenv("VISIONARY_PIPELINE_TTL", 7 * 24 * 60 * 60))  # seconds; 0 disables memoization
+PIPELINE_WORKERS = int(os.getenv("VISIONARY_PIPELINE_WORKERS", 4))
+
+
+##############################
+# Nodes                      #
+##############################
+class Node:
+    """One pipeline step: `func(**inputs)`, where each input names a run parameter or another node.
+
+    An input listed in `optional` receives a "_Not available_" note when its node
+    failed, instead of skipping this one. A run parameter listed in `defaults`
+    may be left out of the run. `version` is part of the memo key, so
+    bumping it recomputes the node after its prompt or code changed. Nodes with
+    side effects (writing the report file) set `memo=False`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        optional: Sequence[str] = (),
+        defaults: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        version: str = "1",
+        memo: bool = True,
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.optional = set(optional)
+        self.defaults = dict(defaults or {})
+        self.timeout = timeout
+        self.version = version
+        self.memo = memo
+
+
+def fingerprint(value: Any) -> str:
+    # Structured results hash by their fields, so an answer loaded from the memo matches a fresh one
+    payload = json.dumps([type(value).__name__, as_jsonable(value)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def node_key(node: Node, inputs: Dict[str, Any]) -> str:
+    payload = {"node": node.name, "version": node.version, "inputs": {name: fingerprint(value) for name, value in sorted(inputs.items())}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+##############################
+# SQLite Node Memo           #
+##############################
+class NodeStore:
+    def __init__(self, path: str = PIPELINE_PATH, ttl: float = PIPELINE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS nodes (key TEXT PRIMARY KEY, node TEXT, value BLOB, created REAL)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        # (found, value): a node may legitimately return None
+        if self.ttl <= 0:
+            return False, None
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM nodes WHERE created < ?", (time.time() - self.ttl,))
+            row = conn.execute("SELECT value FROM nodes WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def set(self, key: str, node: str, value: Any):
+        if self.ttl <= 0:
+            return
+        blob = pickle.dumps(value)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO nodes (key, node, value, created) VALUES (?, ?, ?, ?)",
+                (key, node, blob, time.time()),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM nodes")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+pipeline_store = NodeStore()
+
+
+##############################
+# Pipeline Runs              #
+##############################
+class PipelineRun(ParallelResult):
+    cached: List[str] = Field(default_factory=list, description="Nodes whose output came from the memo.")
+    keys: Dict[str, str] = Field(default_factory=dict, description="Memo key per node, a hash of its inputs.")
+
+
+class Pipeline:
+    """A graph of nodes run in dependency order, independent nodes side by side.
+
+    Every node's output is memoized under a hash of its inputs as soon as it
+    finishes, so a run interrupted by a crash or a Streamlit rerun resumes
+    after the last completed node, and changing one parameter recomputes only
+    the nodes downstream of it.
+    """
+
+    def __init__(self, nodes: Iterable[Node], store: NodeStore = pipeline_store, max_workers: int = PIPELINE_WORKERS):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            unknown = [name for name in node.inputs if name in node.optional and name not in self.nodes]
+            if node.name in self.nodes or unknown:
+                raise ValueError(f"Node {node.name!r} is duplicated or has optional inputs that are not earlier nodes: {unknown}")
+            self.nodes[node.name] = node
+        self.store = store
+        self.max_workers = max_workers
+
+    def plan(self, targets: Optional[Iterable[str]] = None, given: Iterable[str] = ()) -> List[str]:
+        """Nodes needed for `targets` (all by default) in dependency order, minus those `given` as values."""
+        given = set(given)
+        order: List[str] = []
+        visiting: Set[str] = set()
+
+        def visit(name: str):
+            if name in order or name in given or name not in self.nodes:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through {name!r}")
+            visiting.add(name)
+            for dep in self.nodes[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in targets if targets is not None else self.nodes:
+            if name not in self.nodes:
+                raise ValueError(f"Unknown pipeline node {name!r}")
+            visit(name)
+        return order
+
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """Nodes whose inputs depend, directly or not, on any of `names`."""
+        reached = set(names)
+        found: Set[str] = set()
+        for name in self.plan():
+            if any(dep in reached for dep in self.nodes[name].inputs):
+                reached.add(name)
+                found.add(name)
+        return found
+
+    def run(
+        self,
+        params: Dict[str, Any],
+        targets: Optional[Iterable[str]] = None,
+        refresh: Iterable[str] = (),
+        on_progress: Optional[Callable[[str, str], None]] = None,
+    ) -> PipelineRun:
+        """Compute `targets` (all nodes by default) from `params`.
+
+        A param named like a node pins that node's value instead of computing it.
+        Nodes in `refresh` skip the memo. `on_progress(node, status)` is called
+        from the calling thread with "cached", "running", "done", "failed" or
+        "skipped", so it may update a UI.
+        """
+        order = self.plan(targets, given=params)
+        missing = sorted({
+            dep for name in order for dep in self.nodes[name].inputs
+            if dep not in params and dep not in self.nodes and dep not in self.nodes[name].defaults
+        })
+        if missing:
+            raise ValueError(f"Missing pipeline parameters: {', '.join(missing)}")
+
+        refresh = set(refresh)
+        notify = on_progress or (lambda name, status: None)
+        values: Dict[str, Any] = dict(params)
+        result = PipelineRun()
+        started = time.monotonic()
+        pending = list(order)
+        running: Dict[Future, Tuple[str, str, float]] = {}
+
+        def call(node: Node, inputs: Dict[str, Any]) -> Any:
+            with deadline(node.timeout):
+                return node.func(**inputs)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        try:
+            while pending or running:
+                busy = {name for name, _, _ in running.values()}
+                for name in list(pending):
+                    node = self.nodes[name]
+                    if any(dep in pending or dep in busy for dep in node.inputs):
+                        continue
+                    pending.remove(name)
+                    unavailable = [dep for dep in node.inputs if dep not in values and dep not in node.optional and dep not in node.defaults]
+                    if unavailable:
+                        result.errors[name] = f"Skipped: {', '.join(unavailable)} not available"
+                        notify(name, "skipped")
+                        continue
+                    inputs = {
+                        dep: values[dep] if dep in values else node.defaults[dep] if dep in node.defaults else f"_Not available: {result.errors.get(dep)}_"
+                        for dep in node.inputs
+                    }
+                    key = result.keys[name] = node_key(node, inputs)
+                    if node.memo and name not in refresh:
+                        found, value = self.store.get(key)
+                        if found:
+                            values[name] = result.results[name] = value
+                            result.cached.append(name)
+                            notify(name, "cached")
+                            continue
+                    # Each node runs in a copy of the caller's context, so the rate-limit lane and deadline carry over
+                    running[executor.submit(contextvars.copy_context().run, call, node, inputs)] = (name, key, time.monotonic())
+                    busy.add(name)
+                    notify(name, "running")
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key, submitted = running.pop(future)
+                    result.timings[name] = time.monotonic() - submitted
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        result.errors[name] = f"{type(e).__name__}: {e}"
+                        notify(name, "failed")
+                        continue
+                    values[name] = result.results[name] = value
+                    if self.nodes[name].memo:
+                        self.store.set(key, name, value)
+                    notify(name, "done")
+        finally:
+            # Only reached with work left on an interrupt; a finished run has nothing queued
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result.elapsed = time.monotonic() - started
+        return result
@@ -0,0 +1,356 @@
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from orchestration import DeadlineExceeded, check_deadline, remaining
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    # "provider=rate:burst,..." in requests per second
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, spec = item.split("=", 1)
+            rate, _, burst = spec.partition(":")
+            limits[name.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+# Requests per second and burst size per upstream provider
+RATE_LIMITS = {
+    "openai": (8.0, 16.0),
+    "exa": (5.0, 5.0),
+    "duckduckgo": (1.0, 3.0),
+    **parse_limits(os.getenv("VISIONARY_RATE_LIMITS", "")),
+}
+# Ceiling of the adaptive concurrency limit per provider; it starts here and halves on throttling
+MAX_CONCURRENCY = {
+    "openai": 16,
+    "exa": 4,
+    "duckduckgo": 2,
+    **{name: int(value) for name, value in (item.split("=", 1) for item in os.getenv("VISIONARY_MAX_CONCURRENCY", "").split(",") if "=" in item)},
+}
+# "thread" shares buckets within a process, "process" across worker processes through SQLite, "off" disables limiting
+RATE_LIMIT_MODE = os.getenv("VISIONARY_RATE_LIMIT_MODE", "thread")
+RATE_LIMIT_PATH = os.getenv("VISIONARY_RATE_LIMIT_PATH", "tmp/rate_limits.sqlite")
+# Share of each bucket only the interactive lane may spend, so batch jobs never drain it
+INTERACTIVE_RESERVE = float(os.getenv("VISIONARY_INTERACTIVE_RESERVE", 0.25))
+# A call slower than this multiple of the provider's typical latency counts as a latency spike; 0 disables
+LATENCY_SPIKE = float(os.getenv("VISIONARY_LATENCY_SPIKE", 4))
+RETRY_ATTEMPTS = int(os.getenv("VISIONARY_RETRY_ATTEMPTS", 4))
+RETRY_BASE = float(os.getenv("VISIONARY_RETRY_BASE", 1.0))  # seconds, doubled per attempt
+RETRY_CAP = float(os.getenv("VISIONARY_RETRY_CAP", 30.0))
+
+LANES = ("interactive", "batch")
+_lane: contextvars.ContextVar = contextvars.ContextVar("rate_limit_lane", default="interactive")
+
+
+##############################
+# Priority Lanes             #
+##############################
+def current_lane() -> str:
+    return _lane.get()
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Run the calls made inside the block in `name`'s lane ("interactive" or "batch")."""
+    if name not in LANES:
+        raise ValueError(f"Unknown lane {name!r}; expected one of {LANES}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+##############################
+# Token Buckets              #
+##############################
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def take(self, reserve: float = 0.0) -> float:
+        """Take one token, keeping `reserve` tokens back; returns 0 on success, else seconds to wait."""
+        with self._lock:
+            self._tokens, self._updated, wait = refill_and_take(self._tokens, self._updated, self.rate, self.burst, reserve)
+            return wait
+
+    def pause(self, seconds: float):
+        # Upstream said to back off: no tokens until then
+        with self._lock:
+            self._tokens, self._updated = 0.0, max(self._updated, time.time() + seconds)
+
+
+def refill_and_take(tokens: float, updated: float, rate: float, burst: float, reserve: float) -> Tuple[float, float, float]:
+    now = time.time()
+    if now < updated:
+        return tokens, updated, updated - now
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens - reserve >= 1:
+        return tokens - 1, now, 0.0
+    return tokens, now, (1 + reserve - tokens) / rate
+
+
+class SQLiteTokenBucket:
+    # Same bucket, its state in a row every worker process updates under a write lock
+    def __init__(self, name: str, rate: float, burst: float, path: str = RATE_LIMIT_PATH):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self._local = threading.local()
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (provider TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            self._local.conn = conn
+        return conn
+
+    def _update(self, change: Callable[[float, float], Tuple[float, float, float]]) -> float:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT tokens, updated FROM buckets WHERE provider = ?", (self.name,)).fetchone()
+            tokens, updated = row if row else (self.burst, time.time())
+            tokens, updated, wait = change(tokens, updated)
+            db.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (self.name, tokens, updated))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return wait
+
+    def take(self, reserve: float = 0.0) -> float:
+        return self._update(lambda tokens, updated: refill_and_take(tokens, updated, self.rate, self.burst, reserve))
+
+    def pause(self, seconds: float):
+        self._update(lambda tokens, updated: (0.0, max(updated, time.time() + seconds), 0.0))
+
+
+##############################
+# Provider Limiter           #
+##############################
+class ProviderLimiter:
+    """Token bucket plus adaptive concurrency for one upstream provider.
+
+    The concurrency limit grows by one slot per limit's worth of successful calls and
+    halves on a 429 or a latency spike (at most once per typical call duration).
+    Interactive callers go first: batch callers wait while any interactive caller
+    is waiting, and may not spend the bucket's interactive reserve.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, max_concurrency: int, bucket: Any = None):
+        self.name = name
+        self.bucket = bucket or TokenBucket(rate, burst)
+        self.reserve = burst * INTERACTIVE_RESERVE
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.active = 0
+        self.baseline: Optional[float] = None  # smoothed latency of unthrottled calls
+        self.throttled = 0
+        self.spikes = 0
+        self._waiting = {name: 0 for name in LANES}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, lane: str = "interactive"):
+        # Never waits past the caller's deadline: a call that cannot start in time fails fast instead
+        left = remaining()
+        due = None if left is None else time.monotonic() + left
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    left = None if due is None else due - time.monotonic()
+                    if (lane == "interactive" or not self._waiting["interactive"]) and self.active < max(1, int(self.limit)):
+                        wait = self.bucket.take(0.0 if lane == "interactive" else self.reserve)
+                        if wait <= 0:
+                            self.active += 1
+                            return
+                        if left is not None and wait > left:
+                            raise DeadlineExceeded(f"Deadline would pass waiting {wait:.1f}s for a {self.name} rate limit token")
+                    elif left is not None and left <= 0:
+                        raise DeadlineExceeded(f"Deadline passed waiting for a {self.name} concurrency slot")
+                    else:
+                        wait = 1.0
+                    self._cond.wait(min(wait, 1.0, left) if left is not None else min(wait, 1.0))
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def release(self, latency: float, throttled: bool = False, retry_after: Optional[float] = None):
+        with self._cond:
+            self.active -= 1
+            spike = bool(
+                LATENCY_SPIKE and self.baseline is not None and not throttled and latency > LATENCY_SPIKE * self.baseline
+            )
+            if throttled or spike:
+                self.throttled += throttled
+                self.spikes += spike
+                # One halving per congestion event, not one per request caught in it
+                now = time.monotonic()
+                if now - self._last_decrease > (self.baseline or 1.0):
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            if not throttled:
+                self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+            self._cond.notify_all()
+        if throttled:
+            self.bucket.pause(retry_after if retry_after is not None else 1 / max(self.bucket.rate, 1e-6))
+
+    @contextmanager
+    def slot(self, lane: Optional[str] = None, outcome: Optional["Outcome"] = None) -> Iterator["Outcome"]:
+        self.acquire(lane or current_lane())
+        outcome = outcome or Outcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException as e:
+            outcome.observe_error(e)
+            raise
+        finally:
+            self.release(time.monotonic() - started, outcome.throttled, outcome.retry_after)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 1),
+                "active": self.active,
+                "waiting": dict(self._waiting),
+                "throttled": self.throttled,
+                "latency_spikes": self.spikes,
+                "typical_s": round(self.baseline, 2) if self.baseline is not None else None,
+            }
+
+
+class Outcome:
+    # What the caller saw, so the limiter can react to throttling it did not raise
+    def __init__(self):
+        self.throttled = False
+        self.retry_after: Optional[float] = None
+
+    def observe_error(self, error: BaseException):
+        if is_throttle_error(error):
+            self.throttled = True
+            self.retry_after = retry_after_of(error)
+
+    def observe_result(self, result: Any):
+        # phi's Exa tool turns HTTP errors into "Error: ..." strings instead of raising
+        if isinstance(result, str) and result.startswith("Error") and looks_throttled(result):
+            self.throttled = True
+
+
+def looks_throttled(message: str) -> bool:
+    message = message.lower()
+    return "429" in message or "rate limit" in message or "ratelimit" in message or "too many requests" in message
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "ratelimit" in type(error).__name__.lower() or looks_throttled(str(error))
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after")) if headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+##############################
+# Shared Limiters            #
+##############################
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(provider: str) -> Optional[ProviderLimiter]:
+    """The process-wide limiter for `provider`, or None when limiting is off."""
+    if RATE_LIMIT_MODE == "off":
+        return None
+    with _limiters_lock:
+        if provider not in _limiters:
+            rate, burst = RATE_LIMITS.get(provider, (10.0, 10.0))
+            bucket = SQLiteTokenBucket(provider, rate, burst) if RATE_LIMIT_MODE == "process" else None
+            _limiters[provider] = ProviderLimiter(provider, rate, burst, MAX_CONCURRENCY.get(provider, 8), bucket)
+        return _limiters[provider]
+
+
+def backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+    # Full jitter, so callers throttled together do not retry together
+    delay = random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+def call_limited(provider: str, func: Callable[[], Any], attempts: int = RETRY_ATTEMPTS) -> Any:
+    """Call `func` under `provider`'s limiter, retrying throttled calls with jittered backoff."""
+    limiter = rate_limiter(provider)
+    for attempt in range(attempts + 1):
+        check_deadline(f"{provider} call")
+        outcome, result, error = Outcome(), None, None
+        try:
+            with limiter.slot(outcome=outcome) if limiter is not None else nullcontext():
+                result = func()
+                outcome.observe_result(result)
+        except Exception as e:
+            outcome.observe_error(e)
+            error = e
+        done = not outcome.throttled or attempt == attempts
+        if not done:
+            delay = backoff(attempt, outcome.retry_after)
+            left = remaining()
+            # A retry that cannot finish before the deadline is not worth waiting for
+            done = left is not None and delay >= left
+        if done:
+            if error is not None:
+                raise error
+            return result
+        logger.info(f"{provider} throttled, retry {attempt + 1}/{attempts} in {delay:.1f}s")
+        time.sleep(delay)
+
+
+def limit_function(entrypoint: Callable[..., Any], provider: str) -> Callable[..., Any]:
+    # wraps() keeps the signature and docstring phi builds the tool schema from
+    @wraps(entrypoint)
+    def limited(*args, **kwargs):
+        return call_limited(provider, lambda: entrypoint(*args, **kwargs))
+    return limited
+
+
+def rate_limited(toolkit: Any, provider: str) -> Any:
+    """Route every function of a phi toolkit (DuckDuckGo, ExaTools, ...) through `provider`'s limiter."""
+    for function in toolkit.functions.values():
+        function.entrypoint = limit_function(function.entrypoint, provider)
+    return toolkit
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {"mode": RATE_LIMIT_MODE, **{name: limiter.stats for name, limiter in limiters.items()}}
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Iterable, Optional, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from phi.agent import Agent
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# Cache settings, overridable from the environment
+CACHE_PATH = os.getenv("VISIONARY_CACHE_PATH", "tmp/agent_cache.sqlite")
+CACHE_TTL = float(os.getenv("VISIONARY_CACHE_TTL", 24 * 60 * 60))  # seconds
+CACHE_MAX_MB = float(os.getenv("VISIONARY_CACHE_MAX_MB", 256))
+# Comma separated agent names that must always hit the API (e.g. agents reading live uploads)
+CACHE_DISABLED_AGENTS = os.getenv("VISIONARY_CACHE_DISABLED_AGENTS", "Document Processing Agent")
+
+
+##############################
+# Cache Keys                 #
+##############################
+def describe_tools(tools: Optional[Iterable[Any]]) -> list:
+    # Tool class plus its plain settings (e.g. include_domains) is what changes the answer
+    described = []
+    for tool in tools or []:
+        settings = {
+            k: v for k, v in sorted(vars(tool).items())
+            if isinstance(v, (str, int, float, bool, list, tuple, type(None))) and not k.startswith("_")
+        } if hasattr(tool, "__dict__") else {}
+        described.append([type(tool).__name__, settings])
+    return described
+
+def agent_cache_key(agent: "Agent", query: str) -> str:
+    payload = {
+        "agent": agent.name,
+        "model": getattr(agent.model, "id", None),
+        "tools": describe_tools(agent.tools),
+        "response_model": getattr(agent.response_model, "__name__", None),
+        "description": agent.description,
+        "instructions": agent.instructions,
+        # Agents bound to a tenant's knowledge table must not share answers across tenants
+        "knowledge": getattr(getattr(agent.knowledge, "vector_db", None), "table_name", None),
+        "query": query,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+##############################
+# SQLite Response Cache      #
+##############################
+class ResponseCache:
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024), disabled_agents: Optional[Set[str]] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disabled_agents = disabled_agents if disabled_agents is not None else {
+            name.strip() for name in CACHE_DISABLED_AGENTS.split(",") if name.strip()
+        }
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, agent TEXT, value BLOB, size INTEGER, created REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._conn = conn
+        return self._conn
+
+    def enabled_for(self, agent: "Agent") -> bool:
+        return self.ttl > 0 and agent.name not in self.disabled_agents
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, agent_name: Optional[str] = None):
+        blob = pickle.dumps(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, agent_name, blob, len(blob), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the cache fits again
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+
+response_cache = ResponseCache()
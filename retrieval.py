@@ -0,0 +1,42 @@
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# "vector", "keyword" (BM25 only, no embedding call) or "hybrid" (both, fused by reciprocal rank)
+RETRIEVAL_MODE = os.getenv("VISIONARY_RETRIEVAL_MODE", "hybrid")
+# Rank offset in 1 / (RRF_K + rank); 60 is the value from the original RRF paper
+RRF_K = int(os.getenv("VISIONARY_RRF_K", 60))
+# When > 0, hybrid search only vector-ranks the top N keyword matches instead of the whole index
+KEYWORD_PREFILTER = int(os.getenv("VISIONARY_KEYWORD_PREFILTER", 0))
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Terms that match most chunks cost a full posting-list scan and barely move BM25
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "in", "is",
+    "it", "its", "of", "on", "or", "our", "that", "the", "their", "this", "to", "used", "was", "what",
+    "when", "which", "who", "why", "will", "with",
+}
+
+
+def keyword_query(text: str) -> str:
+    """FTS5 MATCH expression that ORs the terms of `text`, so BM25 ranks partial matches too.
+
+    Terms are quoted, which keeps FTS5 operators and punctuation in user input from
+    being parsed as query syntax.
+    """
+    words = [term.lower() for term in TERM_PATTERN.findall(text)]
+    terms = dict.fromkeys([word for word in words if word not in STOPWORDS] or words)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], k: int = RRF_K) -> List[Tuple[float, int]]:
+    """Merge best-first id rankings into one, scoring each id by the sum of 1 / (k + rank)."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(((score, item) for item, score in scores.items()), key=lambda hit: -hit[0])
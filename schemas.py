@@ -0,0 +1,256 @@
+import json
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+# Response models for the agents. Every field is required (nullable where it may be
+# unknown) so the models also work as strict OpenAI structured-output schemas.
+#
+# Each model renders two ways: to_prompt() is the compact form later stages put in
+# their prompts, and to_markdown() is what the UI and the PDF report show.
+#
+# Agents return these through `response_model=`, so later stages and the report
+# consume fields instead of re-reading markdown.
+
+
+def bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def cite(source: Optional[str]) -> str:
+    return f" ([source]({source}))" if source else ""
+
+
+##############################
+# Phase 1                    #
+##############################
+class CompanySummary(BaseModel):
+    summary: str = Field(..., description="Summarized company details based on user input.")
+
+    def to_prompt(self) -> str:
+        return self.summary
+
+    def to_markdown(self) -> str:
+        return self.summary
+
+
+##############################
+# Phase 2                    #
+##############################
+class IndustryTrend(BaseModel):
+    name: str = Field(..., description="Short name of the AI advancement or trend.")
+    summary: str = Field(..., description="One or two sentences on what it is and why it matters.")
+    adopters: List[str] = Field(..., description="Companies notably implementing it.")
+    source: Optional[str] = Field(..., description="URL of the most credible source, if any.")
+
+
+class IndustryTrends(BaseModel):
+    industry: str = Field(..., description="Industry the trends apply to.")
+    trends: List[IndustryTrend] = Field(..., description="Latest AI advancements, most significant first.")
+
+    def to_prompt(self) -> str:
+        return "\n".join(
+            f"- {t.name}: {t.summary}" + (f" Adopters: {', '.join(t.adopters)}." if t.adopters else "")
+            for t in self.trends
+        )
+
+    def to_markdown(self) -> str:
+        return "\n\n".join(
+            f"**{t.name}**: {t.summary}" + (f" *Adopters: {', '.join(t.adopters)}.*" if t.adopters else "") + cite(t.source)
+            for t in self.trends
+        )
+
+
+class AIUseCase(BaseModel):
+    name: str = Field(..., description="Short name of the use case.")
+    description: str = Field(..., description="What the AI does and the process it improves.")
+    impact: str = Field(..., description="Measured or expected benefit, with figures where available.")
+    example: Optional[str] = Field(..., description="A real company or case study that implemented it, if any.")
+    source: Optional[str] = Field(..., description="URL of the case study or report, if any.")
+
+
+class AIUseCases(BaseModel):
+    industry: str = Field(..., description="Industry the use cases apply to.")
+    use_cases: List[AIUseCase] = Field(..., description="Most impactful AI use cases first.")
+
+    def to_prompt(self) -> str:
+        return "\n".join(
+            f"- {u.name}: {u.description} Impact: {u.impact}" + (f" Example: {u.example}." if u.example else "")
+            for u in self.use_cases
+        )
+
+    def to_markdown(self) -> str:
+        return "\n\n".join(
+            f"**{u.name}**: {u.description}\n*Impact:* {u.impact}" + (f"\n*Example:* {u.example}" if u.example else "") + cite(u.source)
+            for u in self.use_cases
+        )
+
+
+class CompetitorInitiative(BaseModel):
+    name: str = Field(..., description="Product, program or transformation.")
+    description: str = Field(..., description="How AI is used in it.")
+    advantage: str = Field(..., description="Competitive advantage it provides.")
+    source: Optional[str] = Field(..., description="URL of the report, if any.")
+
+
+class CompetitorAnalysis(BaseModel):
+    company: str = Field(..., description="Company analysed.")
+    summary: str = Field(..., description="Two or three sentences on its overall AI posture.")
+    initiatives: List[CompetitorInitiative] = Field(..., description="Recent AI initiatives, most important first.")
+
+    def to_prompt(self) -> str:
+        lines = [f"{self.company}: {self.summary}"]
+        lines += [f"- {i.name}: {i.description} Advantage: {i.advantage}" for i in self.initiatives]
+        return "\n".join(lines)
+
+    def to_markdown(self) -> str:
+        parts = [self.summary]
+        parts += [f"**{i.name}**: {i.description}\n*Advantage:* {i.advantage}{cite(i.source)}" for i in self.initiatives]
+        return "\n\n".join(parts)
+
+
+##############################
+# Phase 3                    #
+##############################
+class AIOpportunity(BaseModel):
+    area: str = Field(..., description="Operations, customer experience or efficiency area.")
+    description: str = Field(..., description="What AI would change there.")
+    impact: str = Field(..., description="Expected benefit, with benchmarks where possible.")
+
+
+class RoadmapStep(BaseModel):
+    phase: str = Field(..., description="Name of the phase.")
+    timeline: str = Field(..., description="Expected duration or target dates.")
+    actions: List[str] = Field(..., description="Concrete steps, with cost, scalability or ROI notes.")
+
+
+class AIStrategy(BaseModel):
+    opportunities: List[AIOpportunity] = Field(..., description="Key areas where AI can help.")
+    technology_fit: List[str] = Field(..., description="Specific AI tools, models or methodologies recommended.")
+    roadmap: List[RoadmapStep] = Field(..., description="Implementation roadmap in order.")
+    scalability: str = Field(..., description="How AI adoption can evolve for long-term growth.")
+
+    def to_prompt(self) -> str:
+        lines = ["Opportunities:"] + [f"- {o.area}: {o.description} ({o.impact})" for o in self.opportunities]
+        lines += ["Technology: " + "; ".join(self.technology_fit), "Roadmap:"]
+        lines += [f"- {s.phase} ({s.timeline}): " + "; ".join(s.actions) for s in self.roadmap]
+        lines += [f"Scalability: {self.scalability}"]
+        return "\n".join(lines)
+
+    def to_markdown(self) -> str:
+        return "\n\n".join([
+            "### AI Opportunities\n" + bullets([f"**{o.area}**: {o.description} *{o.impact}*" for o in self.opportunities]),
+            "### Technology Fit\n" + bullets(self.technology_fit),
+            "### Implementation Roadmap\n" + "\n".join(
+                f"{n}. **{s.phase}** ({s.timeline})\n" + "\n".join(f"    - {a}" for a in s.actions)
+                for n, s in enumerate(self.roadmap, start=1)
+            ),
+            "### Future Scalability\n" + self.scalability,
+        ])
+
+
+class IntegrationPhase(BaseModel):
+    phase: str = Field(..., description="Name of the phase, from pilot to full deployment.")
+    steps: List[str] = Field(..., description="What happens in this phase.")
+
+
+class IntegrationPlan(BaseModel):
+    phases: List[IntegrationPhase] = Field(..., description="Step-by-step AI integration.")
+    infrastructure: List[str] = Field(..., description="AI tools, cloud platforms and software needed.")
+    workforce: List[str] = Field(..., description="Upskilling and training measures.")
+    risks: List[str] = Field(..., description="Data security, compliance and ethical considerations.")
+    kpis: List[str] = Field(..., description="Measurable AI performance indicators.")
+
+    def to_prompt(self) -> str:
+        lines = [f"- {p.phase}: " + "; ".join(p.steps) for p in self.phases]
+        lines += ["Infrastructure: " + "; ".join(self.infrastructure), "Workforce: " + "; ".join(self.workforce)]
+        lines += ["Risks: " + "; ".join(self.risks), "KPIs: " + "; ".join(self.kpis)]
+        return "\n".join(lines)
+
+    def to_markdown(self) -> str:
+        return "\n\n".join([
+            "### Integration Phases\n" + "\n".join(
+                f"{n}. **{p.phase}**\n" + "\n".join(f"    - {s}" for s in p.steps)
+                for n, p in enumerate(self.phases, start=1)
+            ),
+            "### Technology & Infrastructure\n" + bullets(self.infrastructure),
+            "### Workforce & Training\n" + bullets(self.workforce),
+            "### Risk & Compliance\n" + bullets(self.risks),
+            "### KPIs\n" + bullets(self.kpis),
+        ])
+
+
+class RevenueOpportunities(BaseModel):
+    monetization: List[str] = Field(..., description="New AI-driven revenue streams, with real-world examples.")
+    cost_reduction: List[str] = Field(..., description="Automation that lowers operating costs.")
+    market_expansion: List[str] = Field(..., description="New markets or ways to scale offerings.")
+    competitive_positioning: List[str] = Field(..., description="Differentiation against industry leaders.")
+
+    def to_prompt(self) -> str:
+        return "\n".join([
+            "Monetization: " + "; ".join(self.monetization),
+            "Cost reduction: " + "; ".join(self.cost_reduction),
+            "Market expansion: " + "; ".join(self.market_expansion),
+            "Positioning: " + "; ".join(self.competitive_positioning),
+        ])
+
+    def to_markdown(self) -> str:
+        return "\n\n".join([
+            "### AI Monetization\n" + bullets(self.monetization),
+            "### Cost Reduction & Efficiency\n" + bullets(self.cost_reduction),
+            "### Market Expansion\n" + bullets(self.market_expansion),
+            "### Competitive Positioning\n" + bullets(self.competitive_positioning),
+        ])
+
+
+##############################
+# Rendering Helpers          #
+##############################
+# Agents fall back to plain text when a response does not parse, so every consumer
+# accepts either form
+
+def as_prompt(value: Any) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "to_prompt"):
+        return value.to_prompt()
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return str(value)
+
+
+def as_markdown(value: Any) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "to_markdown"):
+        return value.to_markdown()
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(indent=2)
+    return str(value)
+
+
+def inline(value: Any) -> str:
+    if isinstance(value, dict):
+        parts = [inline(item) for item in value.values() if item not in (None, "", [])]
+        return f"**{parts[0]}**: " + " ".join(parts[1:]) if len(parts) > 1 else "".join(parts)
+    if isinstance(value, list):
+        return "; ".join(inline(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def render_partial(value: Any) -> str:
+    # Provisional markdown for a structured answer still streaming in as JSON; fields are
+    # shown in arrival order and the model's own to_markdown() replaces this once it completes
+    if not isinstance(value, dict):
+        return inline(value)
+    sections = []
+    for field, item in value.items():
+        body = "\n".join(f"- {inline(entry)}" for entry in item) if isinstance(item, list) else inline(item)
+        sections.append(f"**{field.replace('_', ' ').capitalize()}**\n\n{body}")
+    return "\n\n".join(sections)
+
+
+def as_jsonable(value: Any) -> Any:
+    # Structured results are stored as their fields, so saved runs can be compared field by field
+    if isinstance(value, BaseModel):
+        return json.loads(value.model_dump_json())
+    return value
@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Optional
+from phi.tools import Toolkit
+from model_router import percentile
+from orchestration import DeadlineExceeded, hedged
+from response_cache import describe_tools
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# The alternate backend is tried once the primary has taken longer than this quantile of its recent calls
+HEDGE_QUANTILE = float(os.getenv("VISIONARY_HEDGE_QUANTILE", 0.9))
+HEDGE_WINDOW = 100  # recent calls per backend the quantile is taken over
+HEDGE_MIN_SAMPLES = 10
+HEDGE_DEFAULT_DELAY = float(os.getenv("VISIONARY_HEDGE_DELAY", 3.0))  # seconds, until enough samples exist
+SEARCH_TIMEOUT = float(os.getenv("VISIONARY_SEARCH_TIMEOUT", 30))  # seconds per search, both backends included
+
+
+def usable(result: Any) -> bool:
+    # phi's search tools report failures as text ("Error: ...", "Please set the EXA_API_KEY") and no hits as "[]"
+    if not isinstance(result, str):
+        return False
+    text = result.strip()
+    return bool(text) and text not in ("[]", "{}") and not text.startswith(("Error", "Please set"))
+
+
+##############################
+# Backend Latencies          #
+##############################
+class SearchLatency:
+    def __init__(self):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=HEDGE_WINDOW))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, backend: str, seconds: float):
+        with self._lock:
+            self._samples[backend].append(seconds)
+
+    def count(self, event: str):
+        with self._lock:
+            self._counts[event] += 1
+
+    def quantile(self, backend: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples[backend])
+        return percentile(samples, q) if len(samples) >= HEDGE_MIN_SAMPLES else None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = {name: list(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            **counts,
+            **{name: {"p50_s": round(percentile(s, 0.5), 2), "p90_s": round(percentile(s, 0.9), 2)} for name, s in backends.items()},
+        }
+
+
+search_latency = SearchLatency()
+
+
+##############################
+# Hedged Search Tool         #
+##############################
+def search_function(toolkit: Any) -> Callable[[str, int], str]:
+    # DuckDuckGo registers duckduckgo_search first and ExaTools search_exa; both take (query, result count)
+    return next(iter(toolkit.functions.values())).entrypoint
+
+
+def backend_name(toolkit: Any) -> str:
+    # Toolkit names ("duckduckgo", "exa") key the latency samples
+    return getattr(toolkit, "name", None) or type(toolkit).__name__
+
+
+class HedgedSearch(Toolkit):
+    """One web search tool over two backends, e.g. DuckDuckGo hedged with Exa.
+
+    The alternate is only queried when the primary is slower than its usual p90
+    (or fails), so the tail of one backend no longer sets the latency of a report.
+    """
+
+    def __init__(self, primary: Any, alternate: Any, timeout: float = SEARCH_TIMEOUT):
+        super().__init__(name="hedged_search")
+        self.primary = primary
+        self.alternate = alternate
+        # Plain settings, so the response cache key tells differently configured searches apart
+        self.backends = describe_tools([primary, alternate])
+        self.timeout = timeout
+        self.register(self.web_search)
+
+    def _search(self, toolkit: Any, query: str, max_results: int) -> str:
+        started = time.monotonic()
+        try:
+            return search_function(toolkit)(query, max_results)
+        finally:
+            search_latency.record(backend_name(toolkit), time.monotonic() - started)
+
+    def web_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search the web for a query.
+
+        Args:
+            query (str): The query to search for.
+            max_results (int): Maximum number of results to return. Defaults to 5.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        delay = search_latency.quantile(backend_name(self.primary), HEDGE_QUANTILE)
+        try:
+            backend, result = hedged(
+                lambda: self._search(self.primary, query, max_results),
+                lambda: self._search(self.alternate, query, max_results),
+                delay=HEDGE_DEFAULT_DELAY if delay is None else delay,
+                usable=usable,
+                timeout=self.timeout,
+            )
+        except DeadlineExceeded as e:
+            search_latency.count("timeouts")
+            return f"Error: search timed out ({e})"
+        except Exception as e:
+            logger.warning(f"Search failed on both backends: {e}")
+            return f"Error: {e}"
+        search_latency.count("searches")
+        if backend == "alternate":
+            search_latency.count("alternate_answers")
+        return result
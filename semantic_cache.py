@@ -0,0 +1,203 @@
+import os
+import re
+import time
+import zlib
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+from response_cache import CACHE_TTL
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# Minimum cosine similarity for two queries to share an answer
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("VISIONARY_SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_TTL = float(os.getenv("VISIONARY_SEMANTIC_CACHE_TTL", CACHE_TTL))  # seconds, the response cache's by default
+# Entries kept per namespace; the least recently used go first
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("VISIONARY_SEMANTIC_CACHE_MAX_ENTRIES", 5000))
+# "openai" uses OpenAIEmbedder, "local" uses the offline HashingEmbedder
+SEMANTIC_CACHE_EMBEDDER = os.getenv("VISIONARY_SEMANTIC_CACHE_EMBEDDER", "openai")
+
+# Filler words users add around an industry or company name
+FILLER_WORDS = {
+    "the", "and", "of", "sector", "sectors", "industry", "industries", "market", "markets", "space",
+    "inc", "corp", "corporation", "co", "company", "ltd", "llc", "plc", "group",
+}
+
+
+def normalize_query(text: str) -> str:
+    words = re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+    kept = [word for word in words if word not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+##############################
+# Local Embedder             #
+##############################
+class HashingEmbedder:
+    # Character trigram hashing: no API calls, and spacing variants ("health care") embed alike
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def get_embedding(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype="float32")
+        compact = f"#{text.replace(' ', '')}#"
+        for i in range(len(compact) - 2):
+            vector[zlib.crc32(compact[i:i + 3].encode("utf-8")) % self.dimensions] += 1.0
+        return vector.tolist()
+
+
+def default_embedder():
+    if SEMANTIC_CACHE_EMBEDDER == "local":
+        return HashingEmbedder()
+    from http_clients import openai_embedder
+    return openai_embedder("text-embedding-3-small")
+
+
+##############################
+# Semantic Cache             #
+##############################
+class SemanticCache:
+    def __init__(
+        self,
+        embedder: Optional[Any] = None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        # Any object with get_embedding(text) -> List[float] can be plugged in
+        self._embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embedder(self) -> Any:
+        if self._embedder is None:
+            self._embedder = default_embedder()
+        return self._embedder
+
+    def _namespace(self, name: str, dimension: int) -> Dict[str, Any]:
+        import faiss
+        if name not in self._namespaces:
+            self._namespaces[name] = {"index": faiss.IndexFlatIP(dimension), "entries": [], "exact": {}}
+        return self._namespaces[name]
+
+    def _embed(self, text: str) -> np.ndarray:
+        import faiss
+        vector = np.array([self.embedder.get_embedding(text)], dtype="float32")
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["created"] <= self.ttl
+
+    def _hit(self, entry: Dict[str, Any]) -> Any:
+        entry["used"] = time.time()
+        self.hits += 1
+        return entry["answer"]
+
+    def _prune(self, space: Dict[str, Any]):
+        # IndexFlatIP cannot drop rows in place, so the index is rebuilt from the entries kept:
+        # the newest copy of each query, unexpired, and at most 90% of max_entries, most recently used first,
+        # leaving room for the next stores before another rebuild
+        import faiss
+        latest = set(space["exact"].values())
+        kept = [entry for i, entry in enumerate(space["entries"]) if i in latest and self._fresh(entry)]
+        kept.sort(key=lambda entry: entry["used"], reverse=True)
+        kept = sorted(kept[:int(self.max_entries * 0.9)], key=lambda entry: entry["created"])
+        self.evictions += len(space["entries"]) - len(kept)
+        index = faiss.IndexFlatIP(space["index"].d)
+        if kept:
+            index.add(np.vstack([entry["vector"] for entry in kept]))
+        space.update(index=index, entries=kept, exact={entry["query"]: i for i, entry in enumerate(kept)})
+
+    def lookup(self, namespace: str, query: str) -> Optional[Any]:
+        normalized = normalize_query(query)
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            # Exact match on the normalized text skips the embedding call entirely
+            if space is not None and normalized in space["exact"]:
+                entry = space["entries"][space["exact"][normalized]]
+                if self._fresh(entry):
+                    return self._hit(entry)
+            if space is None or space["index"].ntotal == 0:
+                self.misses += 1
+                return None
+
+        vector = self._embed(normalized)
+        with self._lock:
+            # Re-read the namespace: a store may have rebuilt it while the query was embedded
+            space = self._namespaces[namespace]
+            scores, ids = space["index"].search(vector, min(5, space["index"].ntotal))
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry = space["entries"][idx]
+                if self._fresh(entry):
+                    return self._hit(entry)
+            self.misses += 1
+            return None
+
+    def store(self, namespace: str, query: str, answer: Any):
+        normalized = normalize_query(query)
+        vector = self._embed(normalized)
+        with self._lock:
+            space = self._namespace(namespace, vector.shape[1])
+            if len(space["entries"]) >= self.max_entries:
+                self._prune(space)
+            now = time.time()
+            space["index"].add(vector)
+            space["entries"].append({"query": normalized, "answer": answer, "vector": vector[0], "created": now, "used": now})
+            space["exact"][normalized] = len(space["entries"]) - 1
+
+    def get_or_compute(self, namespace: str, query: str, compute: Callable[[], Any], stream: bool = False) -> Any:
+        """Cached answer for `query`, or compute() and store it.
+
+        With `stream=True`, compute() returns an AgentStream: a cached answer is wrapped
+        in one, and a fresh one is stored once it has finished streaming.
+        """
+        try:
+            cached = self.lookup(namespace, query)
+        except Exception:
+            # An embedder outage must never block the research call itself
+            cached = None
+        if cached is not None:
+            if stream:
+                from agent_runtime import AgentStream
+                return AgentStream.of(cached)
+            return cached
+        answer = compute()
+        if stream:
+            return answer.on_done(lambda result: self._store_quietly(namespace, query, result))
+        self._store_quietly(namespace, query, answer)
+        return answer
+
+    def _store_quietly(self, namespace: str, query: str, answer: Any):
+        if answer is not None:
+            try:
+                self.store(namespace, query, answer)
+            except Exception:
+                pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": {name: len(space["entries"]) for name, space in self._namespaces.items()},
+            }
+
+
+# Shared by the Phase 2 research wrappers
+research_cache = SemanticCache()
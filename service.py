@@ -0,0 +1,470 @@
+"""HTTP API that queues strategy report jobs and runs them in a background worker pool.
+
+Run from the repository root:
+    uvicorn service:app            # API plus VISIONARY_JOB_WORKERS worker threads
+    python -m service --workers-only  # extra worker process on the same queue
+
+    POST /jobs                    {"company_name": ..., "industry": ..., "competitor": ...} -> {"id": ...}
+    POST /jobs/upload             the same fields as a form, plus a PDF or PPTX `file`
+    GET  /jobs/{id}               status and per-step progress
+    GET  /jobs/{id}/events        progress as server-sent events until the job finishes
+    GET  /jobs/{id}/report        the finished sections (JSON and markdown)
+    GET  /jobs/{id}/report.pdf    the generated PDF
+
+Jobs are stored in SQLite, so they survive restarts and any number of worker
+processes can share the queue. Request handlers only touch the queue (off the
+event loop); the pipeline runs in worker threads, so a minute-long model call
+never holds up the API.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import logging
+import sqlite3
+import argparse
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel, Field
+from batch import pipeline_params
+from pipeline import Pipeline, PipelineRun
+from rate_limits import LANES, lane
+from schemas import as_jsonable, as_markdown
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOB_DB_PATH = os.getenv("VISIONARY_JOB_DB_PATH", "tmp/jobs.sqlite")
+JOB_WORKERS = int(os.getenv("VISIONARY_JOB_WORKERS", 32))  # jobs running at once in this process
+JOB_STALE = float(os.getenv("VISIONARY_JOB_STALE", 60))  # seconds without a heartbeat before a running job is requeued
+JOB_MAX_ATTEMPTS = int(os.getenv("VISIONARY_JOB_MAX_ATTEMPTS", 3))
+JOB_POLL = 0.25  # seconds an idle worker waits before looking for work again
+JOB_HEARTBEAT = 10  # seconds between heartbeats of running jobs
+EVENT_POLL = 0.5  # seconds between progress checks of an event stream
+UPLOAD_DIR = os.getenv("VISIONARY_UPLOAD_DIR", "tmp/uploads")
+
+FINISHED = ("done", "failed")
+
+
+##############################
+# SQLite Job Queue           #
+##############################
+class JobQueue:
+    def __init__(self, path: str = JOB_DB_PATH, stale: float = JOB_STALE, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.stale = stale
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Wakes this process's idle workers on submit; workers in other processes find new jobs by polling
+        self._submitted = threading.Condition()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Commits survive a crashed process; only a power loss can drop the last few
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT, lane TEXT, params TEXT, attempts INTEGER DEFAULT 0, worker TEXT, "
+                "created REAL, started REAL, finished REAL, heartbeat REAL, result TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT, node TEXT, status TEXT, at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq)")
+            self._conn = conn
+        return self._conn
+
+    def submit(self, params: Dict[str, Any], lane_name: str = "interactive") -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, status, lane, params, created) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, lane_name, json.dumps(params), time.time()),
+            )
+        with self._submitted:
+            self._submitted.notify()
+        return job_id
+
+    def wait(self, timeout: float):
+        with self._submitted:
+            self._submitted.wait(timeout)
+
+    def wake_all(self):
+        with self._submitted:
+            self._submitted.notify_all()
+
+    def requeue_stale(self):
+        """Requeue running jobs whose worker stopped heartbeating, or fail them after max_attempts."""
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = CASE WHEN attempts >= ? THEN 'Worker stopped responding' ELSE error END, "
+                "finished = CASE WHEN attempts >= ? THEN ? ELSE finished END "
+                "WHERE status = 'running' AND heartbeat < ?",
+                (self.max_attempts, self.max_attempts, self.max_attempts, now, now - self.stale),
+            )
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job, or None when the queue is empty."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # Idle workers check with a plain read, so polling an empty queue never takes the write lock
+            if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+                return None
+            # IMMEDIATE takes the write lock up front, so two worker processes never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, lane, params FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started = ?, heartbeat = ? WHERE id = ?",
+                        (worker, now, now, row[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return None if row is None else {"id": row[0], "lane": row[1], "params": json.loads(row[2])}
+
+    def event(self, job_id: str, node: str, status: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT INTO job_events (job_id, node, status, at) VALUES (?, ?, ?, ?)", (job_id, node, status, now))
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (now, job_id))
+
+    def heartbeat(self, job_ids: List[str]):
+        if not job_ids:
+            return
+        with self._lock:
+            self._connect().execute(
+                f"UPDATE jobs SET heartbeat = ? WHERE id IN ({','.join('?' * len(job_ids))})", (time.time(), *job_ids)
+            )
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, status, lane, params, attempts, created, started, finished, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "status", "lane", "params", "attempts", "created", "started", "finished", "result", "error")
+        job = dict(zip(keys, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT seq, node, status, at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return [{"seq": seq, "node": node, "status": status, "at": at} for seq, node, status, at in rows]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+##############################
+# Worker Pool                #
+##############################
+def job_result(run: PipelineRun, report_path: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        # The only file GET /jobs/{id}/report.pdf serves for this job
+        "report_path": report_path if "report" in run.results else None,
+        "results": {name: as_jsonable(value) for name, value in run.results.items()},
+        # Rendered while the structured results still know how to render themselves
+        "markdown": {name: as_markdown(value) for name, value in run.results.items()},
+        "errors": run.errors,
+        "timings": run.timings,
+        "cached": run.cached,
+        "elapsed": run.elapsed,
+    }
+
+def job_report_path(job_id: str, company_name: str) -> str:
+    # One folder per job under the reports directory, so concurrent jobs for a company keep their own PDF
+    from VisionaryAgent import new_report_path
+    return new_report_path(company_name, folder=job_id)
+
+def prepare_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    # Uploaded documents are indexed by the worker; the passages describing the company become the pipeline's company data
+    document = params.pop("document", None)
+    if document is None:
+        return params
+    from VisionaryAgent import document_company_data, process_uploaded_document
+    # Ingested in place: the upload already has a folder of its own under UPLOAD_DIR
+    process_uploaded_document(document, partition=params["company_name"])
+    return {**params, "input_method": "Upload Document", "company_source": document_company_data(params["company_name"])}
+
+
+class JobWorkers:
+    """`workers` threads claiming jobs from the queue and running the pipeline for each."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        pipeline: Optional[Pipeline] = None,
+        workers: int = JOB_WORKERS,
+        prepare: Callable[[Dict[str, Any]], Dict[str, Any]] = prepare_params,
+        report_path: Callable[[str, str], str] = job_report_path,
+    ):
+        self.queue = queue
+        self.pipeline = pipeline
+        self.workers = workers
+        self.prepare = prepare
+        self.report_path = report_path
+        self.name = f"{os.uname().nodename}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.pipeline is None:
+            from VisionaryAgent import strategy_pipeline
+            self.pipeline = strategy_pipeline
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._work, name=f"job-{n}", daemon=True) for n in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._beat, name="job-heartbeat", daemon=True))
+        self.queue.requeue_stale()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        # Running jobs are left to the heartbeat check: another worker requeues them once they go stale
+        self._stop.set()
+        self.queue.wake_all()
+        end = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if end is None else max(0.0, end - time.monotonic()))
+
+    def _beat(self):
+        while not self._stop.wait(JOB_HEARTBEAT):
+            with self._lock:
+                running = list(self._running)
+            self.queue.heartbeat(running)
+            self.queue.requeue_stale()
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.claim(self.name)
+            if job is None:
+                self.queue.wait(JOB_POLL)
+                continue
+            with self._lock:
+                self._running[job["id"]] = threading.current_thread().name
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running.pop(job["id"], None)
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        try:
+            with lane(job["lane"]):
+                params = {**self.prepare(job["params"]), "report_path": self.report_path(job_id, job["params"]["company_name"])}
+                run = self.pipeline.run(params, on_progress=lambda node, status: self.queue.event(job_id, node, status))
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self.queue.finish(job_id, "failed", error=f"{type(e).__name__}: {e}")
+            return
+        error = None if "report" in run.results else "; ".join(f"{name}: {message}" for name, message in run.errors.items())
+        self.queue.finish(job_id, "failed" if error else "done", job_result(run, params["report_path"]), error)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"workers": self.workers, "running": len(self._running)}
+
+
+##############################
+# HTTP API                   #
+##############################
+class JobRequest(BaseModel):
+    company_name: str = Field(..., description="Company the report is for.")
+    industry: str = Field(..., description="Industry to research, e.g. Healthcare.")
+    competitor: str = Field("", description="Competitor whose AI strategy is analyzed.")
+    website: str = Field("", description="Scraped for company details instead of a search by name.")
+    description: str = Field("", description="Company description used instead of a search.")
+    lane: str = Field("interactive", description="Rate-limit lane: interactive, or batch for bulk submissions.")
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    attempts: int = 0
+    progress: Dict[str, str] = Field(default_factory=dict, description="Latest status per pipeline step.")
+    error: Optional[str] = None
+    created: Optional[float] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+
+def create_app(queue: Optional[JobQueue] = None, pipeline: Optional[Pipeline] = None, workers: int = JOB_WORKERS):
+    from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+    from fastapi.responses import FileResponse, StreamingResponse
+
+    queue = queue or JobQueue()
+    pool = JobWorkers(queue, pipeline, workers) if workers > 0 else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if pool is not None:
+            pool.start()
+        yield
+        if pool is not None:
+            pool.stop(timeout=1)
+
+    app = FastAPI(title="Visionary AI", lifespan=lifespan)
+    app.state.queue, app.state.workers = queue, pool
+
+    async def submit(params: Dict[str, Any], lane_name: str) -> Dict[str, str]:
+        if lane_name not in LANES:
+            raise HTTPException(422, f"lane must be one of {LANES}")
+        job_id = await asyncio.to_thread(queue.submit, params, lane_name)
+        return {"id": job_id, "status": "queued"}
+
+    async def load(job_id: str) -> Dict[str, Any]:
+        job = await asyncio.to_thread(queue.get, job_id)
+        if job is None:
+            raise HTTPException(404, f"No job {job_id}")
+        return job
+
+    @app.post("/jobs", status_code=202)
+    async def create_job(request: JobRequest):
+        try:
+            params = pipeline_params(request.model_dump())
+        except ValueError as e:
+            raise HTTPException(422, str(e))
+        return await submit(params, request.lane)
+
+    @app.post("/jobs/upload", status_code=202)
+    async def create_upload_job(
+        file: UploadFile = File(...),
+        company_name: str = Form(...),
+        industry: str = Form(...),
+        competitor: str = Form(""),
+        lane: str = Form("interactive"),
+    ):
+        if not (file.filename or "").lower().endswith((".pdf", ".pptx")):
+            raise HTTPException(422, "Upload a PDF or PPTX document")
+        folder = os.path.join(UPLOAD_DIR, uuid.uuid4().hex)
+        path = os.path.join(folder, os.path.basename(file.filename))
+
+        def save():
+            os.makedirs(folder, exist_ok=True)
+            with open(path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+
+        await asyncio.to_thread(save)
+        params = {**pipeline_params({"company_name": company_name, "industry": industry, "competitor": competitor}), "document": path}
+        return await submit(params, lane)
+
+    @app.get("/jobs/{job_id}", response_model=JobStatus)
+    async def job_status(job_id: str):
+        job = await load(job_id)
+        progress = {e["node"]: e["status"] for e in await asyncio.to_thread(queue.events, job_id)}
+        return JobStatus(progress=progress, **{k: job[k] for k in ("id", "status", "attempts", "error", "created", "started", "finished")})
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str):
+        await load(job_id)
+
+        async def stream():
+            seq = 0
+            while True:
+                # Status first: once it reads finished, every event is already written
+                job = await asyncio.to_thread(queue.get, job_id)
+                events = await asyncio.to_thread(queue.events, job_id, seq)
+                for event in events:
+                    seq = event["seq"]
+                    yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+                if job["status"] in FINISHED and not events:
+                    yield f"event: {job['status']}\ndata: {json.dumps({'id': job_id, 'error': job['error']})}\n\n"
+                    return
+                await asyncio.sleep(EVENT_POLL)
+
+        return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.get("/jobs/{job_id}/report")
+    async def job_report(job_id: str):
+        job = await load(job_id)
+        if job["status"] not in FINISHED:
+            raise HTTPException(409, f"Job is {job['status']}")
+        return {"id": job_id, "status": job["status"], "error": job["error"], **(job["result"] or {})}
+
+    @app.get("/jobs/{job_id}/report.pdf")
+    async def job_report_pdf(job_id: str):
+        job = await load(job_id)
+        if job["status"] != "done":
+            raise HTTPException(409, f"Job is {job['status']}")
+        # Only the path the worker chose for this job, never one derived from request input
+        path = (job["result"] or {}).get("report_path")
+        if not path or not os.path.exists(path):
+            raise HTTPException(404, "Report file not found")
+        return FileResponse(path, media_type="application/pdf", filename=os.path.basename(path))
+
+    @app.get("/health")
+    async def health():
+        return {"queue": await asyncio.to_thread(lambda: queue.stats), "workers": pool.stats if pool else None}
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="job worker threads in this process")
+    parser.add_argument("--workers-only", action="store_true", help="run workers on the shared queue without the API")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.workers_only:
+        pool = JobWorkers(JobQueue(), workers=args.workers)
+        pool.start()
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            pool.stop(timeout=1)
+        return
+
+    import uvicorn
+    uvicorn.run(create_app(workers=args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import os
+import glob
+import time
+import uuid
+import pickle
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from orchestration import DeadlineExceeded, remaining
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+# "thread" coalesces within one process, "process" also across worker processes, "off" disables it
+SINGLE_FLIGHT_MODE = os.getenv("VISIONARY_SINGLE_FLIGHT", "thread")
+SINGLE_FLIGHT_DIR = os.getenv("VISIONARY_SINGLE_FLIGHT_DIR", "tmp/single_flight")
+
+
+def normalize_input(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+##############################
+# In-process Single Flight   #
+##############################
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            # Someone is already running this exact request; share its outcome, but not past our own deadline
+            if not call.done.wait(remaining()):
+                raise DeadlineExceeded("Deadline passed waiting for an identical request in flight")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+##############################
+# Cross-process Single Flight#
+##############################
+class FileSingleFlight:
+    """One lock file per key: the first process computes while the rest block on the lock.
+
+    Only callers that found the call in flight get its result. They register as waiters
+    before blocking, the result is written for them alone, and the last one to read it
+    deletes it, so a later caller (or one that opted out of caching) never reuses it.
+    """
+
+    def __init__(self, directory: str = SINGLE_FLIGHT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _base(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _read_result(self, path: str):
+        try:
+            with open(path, "rb") as f:
+                return True, pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def _write(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _discard(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _waiters(self, base: str, flight: str) -> List[str]:
+        return glob.glob(f"{base}.{flight}.waiter.*")
+
+    def _join(self, base: str) -> Optional[Tuple[str, str]]:
+        # Register as a waiter of the flight in progress; None if there is none or it already finished
+        try:
+            with open(f"{base}.flight") as f:
+                flight = f.read()
+        except FileNotFoundError:
+            return None
+        ticket = f"{base}.{flight}.waiter.{os.getpid()}-{threading.get_ident()}"
+        open(ticket, "w").close()
+        # The leader writes its result before looking for waiters, so one of us always sees the other
+        if os.path.exists(f"{base}.{flight}.result"):
+            self._leave(base, flight, ticket)
+            return None
+        return flight, ticket
+
+    def _leave(self, base: str, flight: str, ticket: str):
+        # The last waiter out deletes the result
+        self._discard(ticket)
+        if not self._waiters(base, flight):
+            self._discard(f"{base}.{flight}.result")
+
+    def _lead(self, base: str, func: Callable[[], Any]) -> Any:
+        flight = uuid.uuid4().hex
+        self._write(f"{base}.flight", flight.encode("utf-8"))
+        value = func()
+        result_path = f"{base}.{flight}.result"
+        self._write(result_path, pickle.dumps(value))
+        if not self._waiters(base, flight):
+            self._discard(result_path)
+        return value
+
+    def _lock(self, handle):
+        import fcntl  # POSIX only; the "thread" mode works everywhere
+
+        left = remaining()
+        if left is None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            return
+        # flock has no timeout, so poll it until the deadline
+        due = time.monotonic() + left
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= due:
+                    raise DeadlineExceeded("Deadline passed waiting for another process's identical request")
+                time.sleep(min(0.05, max(0.0, due - time.monotonic())))
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        import fcntl
+
+        base = self._base(key)
+        with open(f"{base}.lock", "a+") as handle:
+            joined = None
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                joined = self._join(base)
+                try:
+                    self._lock(handle)
+                except BaseException:
+                    if joined is not None:
+                        self._leave(base, *joined)
+                    raise
+            try:
+                if joined is not None:
+                    found, value = self._read_result(f"{base}.{joined[0]}.result")
+                    self._leave(base, *joined)
+                    if found:
+                        return value
+                # Nothing in flight, or the flight we waited for failed: compute it ourselves
+                return self._lead(base, func)
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+##############################
+# Shared Coalescer           #
+##############################
+_threads = SingleFlight()
+_processes: Optional[FileSingleFlight] = None
+
+
+def coalesce(key: str, func: Callable[[], Any]) -> Any:
+    global _processes
+    if SINGLE_FLIGHT_MODE == "off":
+        return func()
+    if SINGLE_FLIGHT_MODE == "process":
+        if _processes is None:
+            _processes = FileSingleFlight()
+        # Threads coalesce first so only one per process waits on the file lock
+        return _threads.do(key, lambda: _processes.do(key, func))
+    return _threads.do(key, func)
@@ -0,0 +1,130 @@
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, Field
+
+import agent_runtime
+from agent_runtime import AgentStream, json_schema_format, run_agent, stream_agent, strict_json_schema
+from model_router import ModelRouter
+from orchestration import DeadlineExceeded, check_deadline, remaining
+from response_cache import ResponseCache
+import schemas
+from schemas import IndustryTrend, IndustryTrends
+from semantic_cache import HashingEmbedder, SemanticCache
+
+
+class FakeAgent(SimpleNamespace):
+    def __init__(self, chunks, response_model=None):
+        super().__init__(
+            name="Trend Agent", model=SimpleNamespace(id="big"), tools=None, response_model=response_model,
+            description=None, instructions=None, knowledge=None, run_response=None, chunks=chunks, calls=0,
+        )
+
+    def run(self, query, stream=False):
+        self.calls += 1
+        if stream:
+            return (SimpleNamespace(content=chunk) for chunk in self.chunks)
+        return SimpleNamespace(content="".join(self.chunks), metrics={})
+
+
+@pytest.fixture(autouse=True)
+def offline_runtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_runtime, "response_cache", ResponseCache(str(tmp_path / "cache.sqlite"), ttl=60))
+    monkeypatch.setattr(agent_runtime, "model_router", ModelRouter(str(tmp_path / "stats.sqlite"), tiers={"flagship": "big"}, agent_tiers={}))
+
+
+def test_stream_yields_the_text_so_far_and_caches_the_answer():
+    agent = FakeAgent(["Hello", " world"])
+    stream = stream_agent(agent, "greet")
+    assert list(stream) == ["Hello", "Hello world", "Hello world"]
+    assert stream.result == "Hello world"
+    # The blocking call finds the streamed answer under the same key
+    assert run_agent(agent, "greet") == "Hello world"
+    assert agent.calls == 1
+
+
+def test_cached_answer_streams_as_one_piece():
+    agent = FakeAgent(["Hello"])
+    assert run_agent(agent, "greet") == "Hello"
+    stream = run_agent(agent, "greet", stream=True)
+    assert list(stream) == ["Hello"]
+    assert stream.done and agent.calls == 1
+
+
+def test_structured_stream_renders_partial_json_and_validates_at_the_end(monkeypatch):
+    agent = FakeAgent(['{"industry": "Health', 'care", "trends": []}'], response_model=IndustryTrends)
+    monkeypatch.setattr(agent_runtime, "streaming_variant", lambda runner: runner)
+    stream = stream_agent(agent, "trends")
+    frames = list(stream)
+    assert frames[0] == "**Industry**\n\nHealth"
+    assert stream.result == IndustryTrends(industry="Healthcare", trends=[])
+
+
+def test_streaming_runs_under_the_agent_timeout(monkeypatch):
+    monkeypatch.setattr(agent_runtime, "AGENT_TIMEOUT", 0.1)
+    seen = []
+
+    def run(query, stream=False):
+        for word in ["Hello", " slow", " world"]:
+            seen.append(remaining())
+            check_deadline("the next model turn")
+            yield SimpleNamespace(content=word)
+            time.sleep(0.06)
+
+    agent = FakeAgent([])
+    agent.run = run
+    stream = stream_agent(agent, "greet")
+    frames = iter(stream)
+    assert next(frames) == "Hello"
+    assert remaining() is None  # not left set in the consumer between chunks
+    with pytest.raises(DeadlineExceeded):
+        list(frames)
+    assert all(left is not None and left <= 0.1 for left in seen)
+    assert agent_runtime.response_cache.get(agent_runtime.agent_cache_key(agent, "greet")) is None
+
+
+def test_on_done_callbacks_get_the_result():
+    seen = []
+    stream = AgentStream.of("answer").on_done(seen.append)
+    assert stream.collect() == "answer"
+    assert seen == ["answer"]
+    # A finished stream replays its result
+    assert list(stream) == ["answer"]
+
+
+def test_research_cache_stores_a_stream_once_it_finishes():
+    cache = SemanticCache(HashingEmbedder(), threshold=0.9)
+    trends = IndustryTrends(industry="Healthcare", trends=[IndustryTrend(name="AI triage", summary="Ranks patients.", adopters=[], source=None)])
+    fresh = cache.get_or_compute("industry", "Healthcare", lambda: AgentStream.of(trends), stream=True)
+    assert cache.lookup("industry", "Healthcare") is None
+    fresh.collect()
+    cached = cache.get_or_compute("industry", "Healthcare", lambda: pytest.fail("computed again"), stream=True)
+    assert isinstance(cached, AgentStream) and cached.collect() == trends
+
+
+class Step(BaseModel):
+    name: str
+    owner: Optional[str] = None
+
+
+class Plan(BaseModel):
+    first: Step = Field(..., description="Where to start.")
+    steps: list[Step] = Field(default_factory=list)
+
+
+def test_strict_schema_closes_objects_and_inlines_described_refs():
+    schema = json_schema_format(Plan)["json_schema"]["schema"]
+    assert schema["required"] == ["first", "steps"] and schema["additionalProperties"] is False
+    assert schema["properties"]["first"]["description"] == "Where to start."
+    assert schema["properties"]["first"]["required"] == ["name", "owner"]
+    assert schema["properties"]["steps"]["items"] == {"$ref": "#/$defs/Step"}
+    assert "default" not in str(schema)
+
+
+@pytest.mark.parametrize("model", [value for value in vars(schemas).values() if isinstance(value, type) and issubclass(value, BaseModel) and value is not BaseModel])
+def test_strict_schema_matches_what_openai_parse_sends(model):
+    # Catches drift from the SDK's own conversion for the models agents actually use
+    openai_pydantic = pytest.importorskip("openai.lib._pydantic")
+    assert strict_json_schema(model.model_json_schema()) == openai_pydantic.to_strict_json_schema(model)
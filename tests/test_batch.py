@@ -0,0 +1,46 @@
+import pytest
+
+from batch import Checkpoint, pipeline_params, read_rows, run_batch
+from pipeline import Node, NodeStore, Pipeline
+
+
+def test_read_rows_normalizes_csv_headers(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("Company_Name, Industry \nAcme,Retail\n", encoding="utf-8")
+    assert read_rows(str(path)) == [{"company_name": "Acme", "industry": "Retail"}]
+
+
+def test_pipeline_params_picks_company_source():
+    assert pipeline_params({"company_name": "Acme", "industry": "Retail", "website": "https://acme.test"})["input_method"] == "Website URL"
+    assert pipeline_params({"company": "Acme", "industry": "Retail"})["company_source"] == "Acme"
+    with pytest.raises(ValueError):
+        pipeline_params({"company_name": "Acme"})
+
+
+def test_checkpoint_keeps_completed_rows_and_skips_torn_lines(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "sub" / "checkpoint.jsonl"))
+    assert checkpoint.completed() == {}
+    checkpoint.record({"key": "a", "ok": True})
+    checkpoint.record({"key": "b", "ok": False})
+    with open(checkpoint.path, "a", encoding="utf-8") as file:
+        file.write('{"key": "c", "ok": tr')  # cut short by a crash
+    assert list(checkpoint.completed()) == ["a"]
+
+
+def test_run_batch_resumes_from_checkpoint(tmp_path):
+    calls = []
+    pipeline = Pipeline(
+        [Node("report", lambda company_name, industry: calls.append(company_name) or f"{company_name} report", ["company_name", "industry"], memo=False)],
+        store=NodeStore(str(tmp_path / "pipeline.sqlite")),
+    )
+    rows = [{"company_name": "Acme", "industry": "Retail"}, {"company_name": "Globex", "industry": "Energy"}, {"company_name": "Broken"}]
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+
+    summary = run_batch(rows[:1], pipeline, concurrency=2, checkpoint=checkpoint)
+    assert summary["completed"] == 1
+    calls.clear()
+    summary = run_batch(rows, pipeline, concurrency=2, checkpoint=checkpoint)
+    assert calls == ["Globex"]
+    assert summary["resumed_from_checkpoint"] == 1
+    assert (summary["completed"], summary["failed"]) == (1, 1)
+    assert summary["failures"][0]["company"] == "Broken"
@@ -0,0 +1,53 @@
+import compaction
+from compaction import compact, deduplicate, extract, token_ledger
+from tokens import count_tokens
+
+NOTES = "\n".join([
+    "# Industry Trends",
+    "Hospitals expanded AI radiology budgets by 40% in 2024.",
+    "Many people are talking about AI in general terms.",
+    "Hospitals expanded AI radiology budgets by 40% in 2024.",
+    "Hospitals expanded AI radiology budgets by 40% in 2024 too.",
+    "- https://example.com/source",
+    "Vendors such as Nuance Communications lead ambient documentation.",
+])
+
+
+def test_deduplicate_drops_exact_and_near_repeats():
+    kept = deduplicate(NOTES)
+    assert kept.count("radiology") == 1
+    assert "Nuance Communications" in kept
+
+
+def test_extract_keeps_the_best_units_in_order_within_budget():
+    kept = extract(NOTES, budget=30)
+    assert count_tokens(kept) <= 30
+    assert kept.startswith("# Industry Trends")
+    assert "40%" in kept
+    assert "https://example.com" not in kept
+
+
+def test_extract_cuts_a_single_oversized_sentence():
+    sentence = " ".join(["word"] * 100)
+    assert 0 < count_tokens(extract(sentence, budget=10)) <= 10
+
+
+def test_compact_leaves_payloads_within_budget_alone():
+    assert compact("test_stage", NOTES, budget=10_000) == NOTES
+    assert compact("test_stage", NOTES, budget=5, mode="off") == NOTES
+
+
+def test_compact_fits_the_budget_and_records_the_steps():
+    text = compact("test_stage", NOTES * 5, budget=40)
+    assert count_tokens(text) <= 40
+    counts = token_ledger.stats["test_stage"]
+    assert counts["before"] > counts["deduplicated"] >= counts["after"]
+    assert counts["after"] <= counts["budget"] == 40
+
+
+def test_failed_summary_falls_back_to_extraction(monkeypatch):
+    def broken(stage, text, budget):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(compaction, "summarize", broken)
+    assert count_tokens(compact("test_stage", NOTES * 5, budget=40, mode="summarize")) <= 40
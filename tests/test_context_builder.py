@@ -0,0 +1,32 @@
+from context_builder import ContextBuilder, build_context, split_passages
+from tokens import count_tokens
+
+FILLER = "Quarterly operations continued as planned across all regions and teams."
+SOURCES = {
+    "company_data": "\n\n".join([FILLER] * 20 + ["Acme runs a large cloud hosting business for hospitals."]),
+    "industry_trends": "\n\n".join(["Hospitals are adopting AI triage and radiology tools."] + [FILLER] * 20),
+}
+
+
+def test_split_passages_stays_under_the_passage_size():
+    passages = split_passages(SOURCES["company_data"], max_tokens=40)
+    assert all(count_tokens(passage) <= 40 for passage in passages)
+    assert "cloud hosting" in passages[-1]
+
+
+def test_inputs_within_budget_are_returned_unchanged():
+    assert build_context(SOURCES, ["cloud"], budget=10_000) == SOURCES
+
+
+def test_select_stays_within_budget_and_keeps_what_sections_ask_about():
+    builder = ContextBuilder(SOURCES, passage_tokens=40)
+    assert builder.tokens > 200
+    selected = builder.select(["cloud hosting business", "AI triage radiology"], budget=120, k=2)
+    assert sum(count_tokens(text) for text in selected.values()) <= 120
+    assert "cloud hosting" in selected["company_data"]
+    assert "AI triage" in selected["industry_trends"]
+
+
+def test_every_input_keeps_a_passage_even_without_matches():
+    selected = ContextBuilder(SOURCES, passage_tokens=40).select(["nothing matches xyzzy"], budget=80)
+    assert all(selected[name] for name in SOURCES)
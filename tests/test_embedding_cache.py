@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+import ingestion
+from embedding_cache import EmbeddingCache, chunk_hash, embedder_id
+from semantic_cache import HashingEmbedder
+
+
+def test_get_many_returns_stored_vectors_per_model(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    cache.set_many("model-a", ["alpha", "beta"], [[1.0, 2.0], [3.0, 4.0]])
+    assert cache.get_many("model-a", ["beta", "gamma", "alpha"]) == [[3.0, 4.0], None, [1.0, 2.0]]
+    assert cache.get_many("model-b", ["alpha"]) == [None]
+    assert (cache.stats["hits"], cache.stats["misses"]) == (2, 2)
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    vector = [0.0] * 100  # 400 bytes of float32
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=1000)
+    cache.set_many("m", ["old"], [vector])
+    time.sleep(0.01)
+    cache.set_many("m", ["kept"], [vector])
+    time.sleep(0.01)
+    cache.get_many("m", ["old"])  # now more recent than "kept"
+    time.sleep(0.01)
+    cache.set_many("m", ["new"], [vector])
+    assert cache.get_many("m", ["old", "kept", "new"]) == [vector, None, vector]
+
+
+def test_embedder_id_separates_models_and_sizes():
+    class Embedder:
+        def __init__(self, model, dimensions):
+            self.model, self.dimensions = model, dimensions
+
+    assert embedder_id(Embedder("m", 256)) != embedder_id(Embedder("m", 1536))
+    assert chunk_hash("same  text\n") == chunk_hash("same text")
+
+
+def test_embed_texts_only_requests_unseen_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "embedding_cache", EmbeddingCache(str(tmp_path / "embeddings.sqlite")))
+    requested = []
+    embedder = HashingEmbedder(16)
+    original = embedder.get_embedding
+    monkeypatch.setattr(embedder, "get_embedding", lambda text: requested.append(text) or original(text))
+
+    first = ingestion.embed_texts(embedder, ["page one", "page two"])
+    again = ingestion.embed_texts(embedder, ["page two", "page three"])
+    assert requested == ["page one", "page two", "page three"]
+    assert again[0] == pytest.approx(first[1])
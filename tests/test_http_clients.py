@@ -0,0 +1,81 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from http_clients import DeadlineTimeout, InFlightLimit, RateLimitedTransport
+from orchestration import deadline
+from rate_limits import ProviderLimiter
+
+
+def ok(request):
+    # A streamed body, as the real transport returns, so reading it closes the response
+    return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+
+def test_streamed_response_holds_its_slot_until_closed():
+    limiter = InFlightLimit(httpx.MockTransport(ok), limit=2)
+    client = httpx.Client(transport=limiter)
+    with client.stream("GET", "https://api.example.com/"):
+        assert limiter.stats["in_flight"] == 1
+    assert client.get("https://api.example.com/").text == "ok"
+    assert limiter.stats == {"limit": 2, "in_flight": 0, "peak": 1, "requests": 2, "waited": 0}
+
+
+def test_requests_over_the_limit_wait_for_a_slot():
+    entered, proceed = threading.Event(), threading.Event()
+
+    def slow(request):
+        entered.set()
+        proceed.wait(5)
+        return ok(request)
+
+    limiter = InFlightLimit(httpx.MockTransport(slow), limit=1)
+    client = httpx.Client(transport=limiter)
+    first = threading.Thread(target=client.get, args=("https://api.example.com/",))
+    first.start()
+    entered.wait(5)
+    second = threading.Thread(target=client.get, args=("https://api.example.com/",))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive() and limiter.stats["in_flight"] == 1
+    proceed.set()
+    first.join(5)
+    second.join(5)
+    assert limiter.stats["peak"] == 1 and limiter.stats["waited"] == 1 and limiter.stats["requests"] == 2
+
+
+def test_waiting_for_a_slot_stops_at_the_deadline():
+    limiter = InFlightLimit(httpx.MockTransport(ok), limit=1)
+    client = httpx.Client(transport=limiter)
+    with client.stream("GET", "https://api.example.com/"):
+        started = time.monotonic()
+        with deadline(0.1), pytest.raises(DeadlineTimeout):
+            client.get("https://api.example.com/")
+        assert time.monotonic() - started < 1
+    assert limiter.stats["in_flight"] == 0 and limiter.stats["requests"] == 1
+
+
+def test_throttled_response_halves_the_provider_concurrency():
+    def throttled(request):
+        return httpx.Response(429, headers={"retry-after": "0"}, stream=httpx.ByteStream(b"slow down"))
+
+    provider = ProviderLimiter("test", rate=100, burst=10, max_concurrency=4)
+    client = httpx.Client(transport=RateLimitedTransport(httpx.MockTransport(throttled), provider))
+    assert client.get("https://api.example.com/").status_code == 429
+    assert provider.stats["active"] == 0
+    assert provider.stats["throttled"] == 1 and provider.stats["limit"] == 2
+
+
+def test_failed_request_gives_its_provider_slot_back():
+    def broken(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    provider = ProviderLimiter("test", rate=100, burst=10, max_concurrency=4)
+    client = httpx.Client(transport=RateLimitedTransport(httpx.MockTransport(broken), provider))
+    try:
+        client.get("https://api.example.com/")
+    except httpx.ConnectError:
+        pass
+    assert provider.stats["active"] == 0
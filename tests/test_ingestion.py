@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from ingestion import chunk_text, ingest_document
+from tokens import decode, encode
+
+TEXT = " ".join(f"word{i}" for i in range(300))
+
+
+def test_chunks_map_back_to_their_token_offsets():
+    tokens = encode(TEXT)
+    chunks = list(chunk_text([(1, TEXT)], "doc", max_tokens=50, overlap=10))
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    for chunk in chunks:
+        assert chunk.tokens <= 50
+        assert chunk.text == decode(tokens[chunk.token_offset:chunk.token_offset + chunk.tokens])
+    # Consecutive chunks share exactly `overlap` tokens, and together they cover the whole text
+    assert all(b.token_offset == a.token_offset + 40 for a, b in zip(chunks, chunks[1:]))
+    assert chunks[-1].token_offset + chunks[-1].tokens == len(tokens)
+
+
+def test_no_chunk_is_only_the_previous_overlap():
+    tokens = encode(TEXT)
+    chunks = list(chunk_text([(1, TEXT)], "doc", max_tokens=len(tokens) // 2, overlap=5))
+    assert chunks[-1].tokens > 5
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        list(chunk_text([(1, TEXT)], "doc", max_tokens=10, overlap=10))
+
+
+def test_aligned_chunks_never_span_pages():
+    pages = [(1, TEXT), (2, "short second page")]
+    chunks = list(chunk_text(pages, "doc", max_tokens=50, overlap=10, align_pages=True))
+    assert chunks[-1].page == 2
+    assert chunks[-1].text.strip() == "short second page"
+    assert all(chunk.page == 1 for chunk in chunks[:-1])
+
+
+def test_ingest_document_embeds_in_bounded_concurrent_batches(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def embed(embedder, texts):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return [[float(len(text)), 0.0] for text in texts]
+
+    received = []
+    result = ingest_document(
+        str(path), lambda vectors, chunks: received.extend(zip(vectors.tolist(), chunks)), embedder=None,
+        batch_size=2, max_concurrency=2, max_tokens=20, overlap=4, embed=embed,
+    )
+    assert result.document == "doc.txt"
+    assert result.chunks == len(received) > 4
+    assert [chunk.index for _, chunk in received] == list(range(len(received)))
+    assert all(vector[0] == len(chunk.text) for vector, chunk in received)
+    assert peak[0] == 2
+    assert result.tokens == sum(chunk.tokens for _, chunk in received)
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+import model_router
+from model_router import ModelRouter, call_cost, parse_pairs
+
+TIERS = {"flagship": "big", "fast": "small"}
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_router, "LATENCY_SLO", 1.0)
+    monkeypatch.setattr(model_router, "AGENT_SLOS", {})
+    return ModelRouter(str(tmp_path / "stats.sqlite"), tiers=TIERS, agent_tiers={"Quick Agent": "fast"})
+
+
+def test_agents_get_their_tier_model(router):
+    assert router.model_for("Quick Agent") == "small"
+    assert router.model_for("Other Agent") == "big"
+    assert parse_pairs("Text Processing Agent=fast, x=1") == {"Text Processing Agent": "fast", "x": "1"}
+
+
+def test_route_falls_back_a_tier_while_p95_breaches_the_slo(router):
+    for _ in range(model_router.SLO_MIN_SAMPLES):
+        assert router.route("Agent", "big") == "big"
+        router.record("Agent", "big", 0.2)
+    for _ in range(model_router.SLO_MIN_SAMPLES):
+        router.record("Agent", "big", 5.0)
+    assert router.route("Agent", "big") == "small"
+    assert router.stats["degraded"] == ["Agent"]
+    # The fastest tier has nowhere to fall back to
+    assert router.route("Agent", "small") == "small"
+
+
+def test_slow_failures_count_towards_the_fallback(router):
+    for _ in range(model_router.SLO_MIN_SAMPLES):
+        router.record("Agent", "big", 5.0, ok=False)
+    assert router.route("Agent", "big") == "small"
+    (row,) = router.report()
+    assert (row["calls"], row["errors"]) == (model_router.SLO_MIN_SAMPLES, model_router.SLO_MIN_SAMPLES)
+
+
+def test_primary_gets_a_fresh_window_after_the_cooldown(router, monkeypatch):
+    monkeypatch.setattr(model_router, "SLO_COOLDOWN", 0.05)
+    for _ in range(model_router.SLO_MIN_SAMPLES):
+        router.record("Agent", "big", 5.0)
+    assert router.route("Agent", "big") == "small"
+    time.sleep(0.1)
+    assert router.route("Agent", "big") == "big"
+    assert router.p95("Agent", "big") == 0.0
+
+
+def test_report_totals_tokens_and_cost(router):
+    class Response:
+        metrics = {"input_tokens": [1000, 1000], "output_tokens": [500, 500]}
+
+    router.record("Agent", "gpt-4o", 1.0, Response())
+    (row,) = router.report()
+    assert (row["mean_input_tokens"], row["mean_output_tokens"]) == (2000, 1000)
+    assert row["cost_usd"] == round(call_cost("gpt-4o", 2000, 1000), 4)
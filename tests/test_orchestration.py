@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from orchestration import DeadlineExceeded, check_deadline, deadline, hedged, remaining, run_parallel
+
+
+def test_run_parallel_collects_results():
+    result = run_parallel({"a": lambda: 1, "b": lambda: "two"}, timeout=5)
+    assert result.ok
+    assert result.results == {"a": 1, "b": "two"}
+    assert set(result.timings) == {"a", "b"}
+
+
+def test_run_parallel_runs_tasks_side_by_side():
+    result = run_parallel({name: lambda: time.sleep(0.2) for name in "abc"}, timeout=5)
+    assert result.ok
+    assert result.elapsed < 0.5
+
+
+def test_run_parallel_records_failures_without_dropping_others():
+    def boom():
+        raise ValueError("bad input")
+
+    result = run_parallel({"ok": lambda: 1, "boom": boom})
+    assert result.results == {"ok": 1}
+    assert result.errors["boom"] == "ValueError: bad input"
+
+
+def test_merge_folds_a_later_stage_in():
+    first = run_parallel({"a": lambda: 1})
+    first.merge(run_parallel({"b": lambda: 2}))
+    assert first.results == {"a": 1, "b": 2}
+
+
+def test_run_parallel_times_out_slow_task():
+    result = run_parallel({"fast": lambda: 1, "slow": lambda: time.sleep(1)}, timeout={"fast": 5, "slow": 0.05})
+    assert result.results == {"fast": 1}
+    assert result.errors["slow"].startswith("Timed out")
+
+
+def test_run_parallel_tasks_see_their_deadline():
+    result = run_parallel({"left": remaining}, timeout=5)
+    assert 0 < result.results["left"] <= 5
+
+
+def test_deadline_never_extends_enclosing_one():
+    with deadline(0.5):
+        with deadline(10):
+            assert remaining() <= 0.5
+    assert remaining() is None
+
+
+def test_check_deadline_raises_once_passed():
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            check_deadline("test")
+
+
+def test_hedged_uses_alternate_when_primary_is_slow():
+    name, answer = hedged(lambda: time.sleep(1) or "primary", lambda: "alternate", delay=0.05)
+    assert (name, answer) == ("alternate", "alternate")
+
+
+def test_hedged_prefers_primary_when_fast():
+    assert hedged(lambda: "primary", lambda: "alternate", delay=1) == ("primary", "primary")
+
+
+def test_hedged_stops_at_timeout():
+    with pytest.raises(DeadlineExceeded):
+        hedged(lambda: time.sleep(1), lambda: time.sleep(1), delay=0.01, timeout=0.1)
@@ -0,0 +1,32 @@
+import time
+
+import phase2
+
+
+def test_run_phase2_runs_the_research_agents_side_by_side(monkeypatch):
+    def slow(answer):
+        return lambda subject: time.sleep(0.2) or f"{answer} for {subject}"
+
+    monkeypatch.setattr(phase2, "get_industry_trends", slow("trends"))
+    monkeypatch.setattr(phase2, "get_ai_use_cases", slow("use cases"))
+    monkeypatch.setattr(phase2, "get_competitor_ai_strategies", slow("strategies"))
+    result = phase2.run_phase2("Healthcare", "Pfizer")
+    assert result.results == {
+        "industry_trends": "trends for Healthcare",
+        "ai_use_cases": "use cases for Healthcare",
+        "competitor_analysis": "strategies for Pfizer",
+    }
+    assert result.elapsed < 0.5
+
+
+def test_run_phase2_keeps_the_others_when_one_agent_fails_or_stalls(monkeypatch):
+    def broken(industry):
+        raise RuntimeError("search down")
+
+    monkeypatch.setattr(phase2, "get_industry_trends", broken)
+    monkeypatch.setattr(phase2, "get_ai_use_cases", lambda industry: time.sleep(1))
+    monkeypatch.setattr(phase2, "get_competitor_ai_strategies", lambda competitor: "strategies")
+    result = phase2.run_phase2("Healthcare", "Pfizer", timeout=0.1)
+    assert result.results == {"competitor_analysis": "strategies"}
+    assert result.errors["industry_trends"] == "RuntimeError: search down"
+    assert result.errors["ai_use_cases"].startswith("Timed out")
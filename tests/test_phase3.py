@@ -0,0 +1,52 @@
+import time
+
+import phase3
+
+
+def stub_agents(monkeypatch, follow_up=lambda answer: lambda company_data, ai_strategy: time.sleep(0.2) or f"{answer} from {ai_strategy}"):
+    monkeypatch.setattr(phase3, "generate_ai_strategy", lambda company_data, *research: f"strategy for {company_data}")
+    monkeypatch.setattr(phase3, "suggest_ai_integration", follow_up("integration"))
+    monkeypatch.setattr(phase3, "identify_revenue_opportunities", follow_up("revenue"))
+    monkeypatch.setattr(phase3, "generate_report", lambda company_name, *sections: sections)
+
+
+def test_run_phase3_runs_the_follow_ups_side_by_side(monkeypatch):
+    stub_agents(monkeypatch)
+    result = phase3.run_phase3("Acme", "Acme data", "trends", "use cases", "rivals")
+    assert result.ok
+    assert result.results["report"] == ("strategy for Acme data", "integration from strategy for Acme data", "revenue from strategy for Acme data")
+    assert result.elapsed < 0.35
+
+
+def test_run_phase3_reports_a_failed_follow_up_as_not_available(monkeypatch):
+    def broken(answer):
+        def run(company_data, ai_strategy):
+            if answer == "revenue":
+                raise RuntimeError("model down")
+            return answer
+        return run
+
+    stub_agents(monkeypatch, broken)
+    result = phase3.run_phase3("Acme", "Acme data", "trends", "use cases", "rivals")
+    assert result.errors == {"revenue_opportunities": "RuntimeError: model down"}
+    assert result.results["report"][2] == "_Not available: RuntimeError: model down_"
+
+
+def test_run_phase3_stops_without_a_strategy(monkeypatch):
+    stub_agents(monkeypatch)
+    monkeypatch.setattr(phase3, "generate_ai_strategy", lambda *args: time.sleep(1))
+    result = phase3.run_phase3("Acme", "Acme data", "trends", "use cases", "rivals", timeout=0.1)
+    assert result.results == {}
+    assert result.errors["ai_strategy"].startswith("Timed out")
+
+
+def test_reports_are_written_to_their_own_folder(tmp_path, monkeypatch):
+    written = []
+    monkeypatch.setattr(phase3, "REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(phase3.pdfkit, "from_string", lambda html, path: written.append(path))
+    first = phase3.generate_report("../Acme Inc", "strategy", "integration", "revenue")
+    second = phase3.generate_report("../Acme Inc", "strategy", "integration", "revenue")
+    assert first != second
+    for message, path in zip([first, second], written):
+        assert message == f"Report generated: {path}"
+        assert path.startswith(str(tmp_path)) and path.endswith("Acme_Inc_AI_Report.pdf")
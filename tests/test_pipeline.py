@@ -0,0 +1,67 @@
+import pytest
+
+from pipeline import Node, NodeStore, Pipeline
+
+
+def counting_pipeline(tmp_path, calls, fail=()):
+    def step(name):
+        def run(**inputs):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} broke")
+            return f"{name}({', '.join(str(inputs[k]) for k in sorted(inputs))})"
+        return run
+
+    return Pipeline([
+        Node("trends", step("trends"), ["industry"]),
+        Node("rivals", step("rivals"), ["competitor"]),
+        Node("strategy", step("strategy"), ["trends", "rivals"], optional=["rivals"]),
+        Node("report", step("report"), ["strategy", "report_path"], defaults={"report_path": None}, memo=False),
+    ], store=NodeStore(str(tmp_path / "pipeline.sqlite")), max_workers=2)
+
+
+def test_run_computes_every_node_in_order(tmp_path):
+    calls = []
+    run = counting_pipeline(tmp_path, calls).run({"industry": "Retail", "competitor": "Rival"})
+    assert run.ok
+    assert run.results["report"] == "report(None, strategy(rivals(Rival), trends(Retail)))"
+    assert calls.index("strategy") > max(calls.index("trends"), calls.index("rivals"))
+
+
+def test_rerun_resumes_from_memo(tmp_path):
+    calls = []
+    params = {"industry": "Retail", "competitor": "Rival"}
+    counting_pipeline(tmp_path, calls, fail={"strategy"}).run(params)
+    calls.clear()
+    # A fresh pipeline on the same store, as after a crash: only the failed step and the unmemoized report run again
+    run = counting_pipeline(tmp_path, calls).run(params)
+    assert run.ok
+    assert sorted(run.cached) == ["rivals", "trends"]
+    assert sorted(calls) == ["report", "strategy"]
+
+
+def test_changed_param_recomputes_only_downstream(tmp_path):
+    calls = []
+    pipeline = counting_pipeline(tmp_path, calls)
+    pipeline.run({"industry": "Retail", "competitor": "Rival"})
+    calls.clear()
+    pipeline.run({"industry": "Retail", "competitor": "Other"})
+    assert sorted(calls) == ["report", "rivals", "strategy"]
+
+
+def test_optional_input_failure_is_passed_as_a_note(tmp_path):
+    run = counting_pipeline(tmp_path, [], fail={"rivals"}).run({"industry": "Retail", "competitor": "Rival"})
+    assert "rivals" in run.errors
+    assert "_Not available: RuntimeError: rivals broke_" in run.results["strategy"]
+
+
+def test_missing_params_are_reported(tmp_path):
+    with pytest.raises(ValueError, match="competitor"):
+        counting_pipeline(tmp_path, []).run({"industry": "Retail"})
+
+
+def test_pinned_node_is_not_computed(tmp_path):
+    calls = []
+    run = counting_pipeline(tmp_path, calls).run({"industry": "Retail", "competitor": "Rival", "trends": "given"}, targets=["strategy"])
+    assert "trends" not in calls
+    assert run.results["strategy"] == "strategy(rivals(Rival), given)"
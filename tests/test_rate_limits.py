@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from orchestration import DeadlineExceeded, deadline
+from rate_limits import ProviderLimiter, call_limited
+
+
+def test_limiter_admits_within_burst():
+    limiter = ProviderLimiter("test", rate=1, burst=2, max_concurrency=4)
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.stats["active"] == 2
+
+
+def test_limiter_fails_fast_when_token_comes_after_deadline():
+    limiter = ProviderLimiter("test", rate=0.1, burst=1, max_concurrency=4)
+    limiter.acquire()
+    begun = time.monotonic()
+    with deadline(1), pytest.raises(DeadlineExceeded):
+        limiter.acquire()
+    assert time.monotonic() - begun < 0.5
+    assert limiter.stats["waiting"]["interactive"] == 0
+
+
+def test_limiter_stops_waiting_for_a_slot_at_deadline():
+    limiter = ProviderLimiter("test", rate=100, burst=100, max_concurrency=1)
+    limiter.acquire()
+    begun = time.monotonic()
+    with deadline(0.1), pytest.raises(DeadlineExceeded):
+        limiter.acquire()
+    assert time.monotonic() - begun < 0.5
+
+
+def test_call_limited_passes_results_through():
+    assert call_limited("no-such-provider", lambda: "ok") == "ok"
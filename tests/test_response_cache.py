@@ -0,0 +1,38 @@
+import time
+
+from response_cache import ResponseCache
+
+
+def test_get_returns_what_was_set(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    cache.set("k", {"answer": 42}, "Agent")
+    assert cache.get("k") == {"answer": 42}
+    assert cache.get("missing") is None
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=0.05)
+    cache.set("k", "answer")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(tmp_path):
+    value = "x" * 1000
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=60, max_bytes=2500)
+    cache.set("a", value)
+    time.sleep(0.01)
+    cache.set("b", value)
+    time.sleep(0.01)
+    assert cache.get("a") == value  # "a" is now more recently used than "b"
+    time.sleep(0.01)
+    cache.set("c", value)
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+
+
+def test_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResponseCache(path, ttl=60).set("k", "answer")
+    assert ResponseCache(path, ttl=60).get("k") == "answer"
@@ -0,0 +1,50 @@
+import pytest
+
+import schemas
+from schemas import AIStrategy, AIOpportunity, IndustryTrend, IndustryTrends, RoadmapStep, as_jsonable, as_markdown, as_prompt, render_partial
+
+TRENDS = IndustryTrends(industry="Healthcare", trends=[
+    IndustryTrend(name="AI triage", summary="Ranks patients by urgency.", adopters=["Mayo Clinic"], source="https://example.com/triage"),
+    IndustryTrend(name="Ambient notes", summary="Drafts clinical notes.", adopters=[], source=None),
+])
+STRATEGY = AIStrategy(
+    opportunities=[AIOpportunity(area="Operations", description="Forecast demand.", impact="-15% stockouts")],
+    technology_fit=["Gradient boosting"],
+    roadmap=[RoadmapStep(phase="Pilot", timeline="Q1", actions=["Pick one site", "Measure baseline"])],
+    scalability="Roll out by region.",
+)
+
+
+@pytest.mark.parametrize("model", [TRENDS, STRATEGY])
+def test_models_survive_a_json_round_trip(model):
+    restored = type(model).model_validate(as_jsonable(model))
+    assert restored == model
+    assert as_prompt(restored) == as_prompt(model)
+    assert as_markdown(restored) == as_markdown(model)
+
+
+def test_prompt_form_is_compact_and_markdown_form_is_complete():
+    prompt, markdown = as_prompt(TRENDS), as_markdown(TRENDS)
+    assert "AI triage: Ranks patients by urgency. Adopters: Mayo Clinic." in prompt
+    assert "https://" not in prompt
+    assert "[source](https://example.com/triage)" in markdown
+    assert len(prompt) < len(markdown)
+    assert "1. **Pilot** (Q1)" in as_markdown(STRATEGY)
+    assert "- Pilot (Q1): Pick one site; Measure baseline" in as_prompt(STRATEGY)
+
+
+def test_plain_text_answers_pass_through():
+    assert as_prompt("plain notes") == as_markdown("plain notes") == "plain notes"
+    assert as_prompt(None) == as_markdown(None) == ""
+
+
+def test_every_field_is_required_for_strict_structured_outputs():
+    for model in [value for value in vars(schemas).values() if isinstance(value, type) and issubclass(value, schemas.BaseModel) and value is not schemas.BaseModel]:
+        schema = model.model_json_schema()
+        for definition in [schema, *schema.get("$defs", {}).values()]:
+            assert set(definition.get("required", [])) == set(definition["properties"]), model.__name__
+
+
+def test_render_partial_shows_fields_as_they_arrive():
+    rendered = render_partial({"industry": "Healthcare", "trends": [{"name": "AI triage", "summary": "Ranks pat"}]})
+    assert rendered == "**Industry**\n\nHealthcare\n\n**Trends**\n\n- **AI triage**: Ranks pat"
@@ -0,0 +1,35 @@
+import time
+
+from semantic_cache import HashingEmbedder, SemanticCache
+
+
+def test_near_duplicate_queries_share_an_answer():
+    cache = SemanticCache(HashingEmbedder(), threshold=0.9)
+    cache.store("industry", "Healthcare", "trends")
+    assert cache.lookup("industry", "the healthcare sector") == "trends"
+    assert cache.lookup("industry", "Aerospace") is None
+    assert cache.lookup("competitor", "Healthcare") is None
+
+
+def test_expired_answers_are_not_served_and_are_pruned():
+    cache = SemanticCache(HashingEmbedder(), ttl=0.05, max_entries=2)
+    cache.store("industry", "Healthcare", "old")
+    time.sleep(0.1)
+    assert cache.lookup("industry", "Healthcare") is None
+    cache.store("industry", "Banking", "a")
+    cache.store("industry", "Retail", "b")
+    assert cache.stats["entries"]["industry"] <= 2
+    assert cache.lookup("industry", "Banking") == "a"
+
+
+def test_store_evicts_least_recently_used_past_max_entries():
+    cache = SemanticCache(HashingEmbedder(), threshold=0.99, max_entries=10)
+    for n in range(10):
+        cache.store("industry", f"industry {n}", n)
+    assert cache.lookup("industry", "industry 0") == 0  # recently used, so kept
+    cache.store("industry", "industry 10", 10)
+    assert cache.stats["entries"]["industry"] <= 10
+    assert cache.stats["evictions"] >= 1
+    assert cache.lookup("industry", "industry 0") == 0
+    assert cache.lookup("industry", "industry 10") == 10
+    assert cache.lookup("industry", "industry 1") is None
@@ -0,0 +1,176 @@
+import io
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import service
+from embedding_cache import EmbeddingCache
+from pipeline import Node, NodeStore, Pipeline
+from semantic_cache import HashingEmbedder
+from service import JobQueue, JobWorkers, create_app, prepare_params
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), stale=60, max_attempts=2)
+
+
+def wait_until_finished(queue, job_id, timeout=10):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        job = queue.get(job_id)
+        if job["status"] in service.FINISHED:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_job_moves_from_queued_to_running_to_done(queue):
+    job_id = queue.submit({"company_name": "Acme"}, "batch")
+    assert queue.get(job_id)["status"] == "queued"
+    claimed = queue.claim("worker-1")
+    assert claimed == {"id": job_id, "lane": "batch", "params": {"company_name": "Acme"}}
+    assert queue.claim("worker-2") is None
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"]) == ("running", 1)
+    queue.event(job_id, "report", "done")
+    queue.finish(job_id, "done", {"report_path": None})
+    job = queue.get(job_id)
+    assert (job["status"], job["result"]) == ("done", {"report_path": None})
+    assert [e["node"] for e in queue.events(job_id)] == ["report"]
+    assert queue.stats == {"done": 1}
+
+
+def test_jobs_of_a_dead_worker_are_requeued_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    first = JobQueue(path, stale=0.05, max_attempts=2)
+    job_id = first.submit({"company_name": "Acme"})
+    first.claim("crashed-worker")
+    time.sleep(0.1)
+
+    # A new process on the same database finds the job without a heartbeat
+    restarted = JobQueue(path, stale=0.05, max_attempts=2)
+    restarted.requeue_stale()
+    assert restarted.get(job_id)["status"] == "queued"
+    assert restarted.claim("worker")["id"] == job_id
+    time.sleep(0.1)
+    restarted.requeue_stale()
+    job = restarted.get(job_id)
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 2, "Worker stopped responding")
+
+
+def test_workers_run_jobs_through_the_pipeline(queue, tmp_path):
+    pipeline = Pipeline([
+        Node("report", lambda company_name, report_path: f"{company_name} -> {report_path}", ["company_name", "report_path"], memo=False),
+    ], store=NodeStore(str(tmp_path / "pipeline.sqlite")))
+    paths = lambda job_id, company_name: str(tmp_path / job_id / "report.pdf")
+    workers = JobWorkers(queue, pipeline, workers=2, prepare=lambda params: params, report_path=paths)
+    workers.start()
+    try:
+        ids = [queue.submit({"company_name": name}) for name in ("Acme", "Globex")]
+        jobs = [wait_until_finished(queue, job_id) for job_id in ids]
+    finally:
+        workers.stop(timeout=2)
+    for job_id, job in zip(ids, jobs):
+        assert job["status"] == "done"
+        assert job["result"]["report_path"] == paths(job_id, "")
+        assert job["result"]["results"]["report"].endswith(paths(job_id, ""))
+    assert {e["status"] for e in queue.events(ids[0])} == {"running", "done"}
+
+
+def test_failed_pipeline_marks_the_job_failed(queue, tmp_path):
+    def broken(company_name):
+        raise RuntimeError("model unavailable")
+
+    pipeline = Pipeline([Node("report", broken, ["company_name"], memo=False)], store=NodeStore(str(tmp_path / "pipeline.sqlite")))
+    workers = JobWorkers(queue, pipeline, workers=1, prepare=lambda params: params, report_path=lambda *_: "unused.pdf")
+    workers.start()
+    try:
+        job = wait_until_finished(queue, queue.submit({"company_name": "Acme"}))
+    finally:
+        workers.stop(timeout=2)
+    assert job["status"] == "failed"
+    assert "model unavailable" in job["error"]
+
+
+def test_upload_is_saved_and_queued_with_its_document(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    client = TestClient(create_app(queue=queue, workers=0))
+    form = {"company_name": "Acme", "industry": "Retail"}
+
+    response = client.post("/jobs/upload", data=form, files={"file": ("notes.txt", b"text", "text/plain")})
+    assert response.status_code == 422
+
+    response = client.post("/jobs/upload", data=form, files={"file": ("../deck.pdf", b"%PDF-1.4 deck", "application/pdf")})
+    assert response.status_code == 202
+    params = queue.get(response.json()["id"])["params"]
+    assert os.path.dirname(os.path.dirname(params["document"])) == str(tmp_path / "uploads")
+    assert os.path.basename(params["document"]) == "deck.pdf"
+    with open(params["document"], "rb") as file:
+        assert file.read() == b"%PDF-1.4 deck"
+
+
+def test_report_pdf_serves_only_the_jobs_own_file(queue, tmp_path):
+    client = TestClient(create_app(queue=queue, workers=0))
+    report = tmp_path / "report.pdf"
+    report.write_bytes(b"%PDF-1.4 report")
+    served, missing = queue.submit({"company_name": "Acme"}), queue.submit({"company_name": "Globex"})
+    queue.finish(served, "done", {"report_path": str(report)})
+    queue.finish(missing, "done", {"report_path": None})
+
+    assert client.get(f"/jobs/{served}/report.pdf").content == b"%PDF-1.4 report"
+    assert client.get(f"/jobs/{missing}/report.pdf").status_code == 404
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.get(f"/jobs/{served}").json()["status"] == "done"
+
+
+@pytest.fixture
+def offline_documents(tmp_path, monkeypatch):
+    # VisionaryAgent's embedder and vector store, swapped for the offline hashing embedder and a temporary directory
+    import ingestion
+    import VisionaryAgent
+    from vector_store import PartitionedVectorStore
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ingestion, "embedding_cache", EmbeddingCache(str(tmp_path / "embeddings.sqlite")))
+    monkeypatch.setitem(VisionaryAgent.agents._instances, "embedding_model", HashingEmbedder(VisionaryAgent.dimension))
+    monkeypatch.setitem(
+        VisionaryAgent.agents._instances, "vector_store",
+        PartitionedVectorStore(str(tmp_path / "vectors"), dimension=VisionaryAgent.dimension, background=False),
+    )
+    return VisionaryAgent
+
+
+def test_prepare_params_uses_the_uploaded_documents_passages(tmp_path, offline_documents):
+    document = tmp_path / "acme.txt"
+    document.write_text("Acme sells cloud hosting services to retail customers across Europe.", encoding="utf-8")
+
+    params = prepare_params({"company_name": "Acme", "industry": "Retail", "document": str(document)})
+    assert "document" not in params
+    assert params["input_method"] == "Upload Document"
+    assert "cloud hosting" in params["company_source"]
+    assert offline_documents.document_company_data("Globex") == ""
+
+
+def test_concurrent_uploads_with_the_same_file_name_stay_apart(tmp_path, offline_documents):
+    from concurrent.futures import ThreadPoolExecutor
+
+    texts = {"Acme": "Acme sells cloud hosting services.", "Globex": "Globex builds nuclear power plants."}
+    uploads = []
+    for company, text in texts.items():
+        (tmp_path / company).mkdir()
+        (tmp_path / company / "deck.txt").write_text(text, encoding="utf-8")
+        uploads.append({"company_name": company, "industry": "Any", "document": str(tmp_path / company / "deck.txt")})
+    with ThreadPoolExecutor(2) as pool:
+        prepared = list(pool.map(prepare_params, uploads))
+    assert [params["company_source"] for params in prepared] == list(texts.values())
+
+
+def test_uploaded_file_objects_are_not_left_behind(tmp_path, offline_documents):
+    upload = io.BytesIO(b"Acme sells cloud hosting services.")
+    upload.name = "deck.txt"
+    assert "(1 chunks)" in offline_documents.process_uploaded_document(upload, partition="Acme")
+    assert not (tmp_path / "tmp").exists()
+    assert "cloud hosting" in offline_documents.document_company_data("Acme")
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from orchestration import DeadlineExceeded, deadline
+from single_flight import FileSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_one_call():
+    flight, calls, started = SingleFlight(), [], threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    results.append(flight.do("k", slow))
+    leader.join()
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_errors():
+    flight, started = SingleFlight(), threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("bad")
+
+    leader = threading.Thread(target=lambda: pytest.raises(ValueError, flight.do, "k", boom))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(ValueError):
+        flight.do("k", boom)
+    leader.join()
+
+
+def test_single_flight_follower_stops_at_its_deadline():
+    flight, started = SingleFlight(), threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(1)
+        return "late"
+
+    leader = threading.Thread(target=flight.do, args=("k", slow))
+    leader.start()
+    started.wait(5)
+    begun = time.monotonic()
+    with deadline(0.1), pytest.raises(DeadlineExceeded):
+        flight.do("k", slow)
+    assert time.monotonic() - begun < 0.5
+    leader.join()
+
+
+def test_file_single_flight_does_not_reuse_finished_results(tmp_path):
+    flight, calls = FileSingleFlight(str(tmp_path)), []
+    assert flight.do("k", lambda: calls.append(1) or "answer") == "answer"
+    assert flight.do("k", lambda: calls.append(1) or "other") == "other"
+    assert len(calls) == 2
+    assert not list(tmp_path.glob("*.result"))
+
+
+def test_file_single_flight_shares_with_callers_in_flight(tmp_path):
+    flight, started, calls = FileSingleFlight(str(tmp_path)), threading.Event(), []
+    # A second instance opens its own file handle, as another process would
+    other = FileSingleFlight(str(tmp_path))
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.3)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    results.append(other.do("k", lambda: calls.append(1) or "mine"))
+    leader.join()
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+    # The waiter read the result and deleted it
+    assert not list(tmp_path.glob("*.result")) and not list(tmp_path.glob("*.waiter.*"))
+
+
+def test_file_single_flight_waiter_stops_at_its_deadline(tmp_path):
+    flight, started = FileSingleFlight(str(tmp_path)), threading.Event()
+    other = FileSingleFlight(str(tmp_path))
+    leader = threading.Thread(target=flight.do, args=("k", lambda: started.set() or time.sleep(1) or "late"))
+    leader.start()
+    started.wait(5)
+    with deadline(0.1), pytest.raises(DeadlineExceeded):
+        other.do("k", lambda: "mine")
+    leader.join()
+    # Nobody was left waiting, so the result was not kept
+    assert not list(tmp_path.glob("*.result")) and not list(tmp_path.glob("*.waiter.*"))
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+from ingestion import Chunk
+from vector_store import PartitionedVectorStore, VectorStore
+
+DIMENSION = 8
+TEXTS = [
+    "cloud hosting revenue grew strongly",
+    "the mission is affordable healthcare",
+    "retail stores across europe",
+]
+
+
+def vectors(n: int) -> np.ndarray:
+    return np.eye(DIMENSION, dtype="float32")[:n]
+
+
+def chunks(document: str, texts=TEXTS):
+    return [Chunk(document=document, index=i, page=1, token_offset=0, tokens=len(text.split()), text=text) for i, text in enumerate(texts)]
+
+
+def test_changes_outside_writing_are_rejected(tmp_path):
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    with pytest.raises(RuntimeError):
+        store.add(vectors(1), chunks("a.pdf")[:1])
+
+
+def test_store_persists_and_reloads(tmp_path):
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    with store.writing():
+        store.add(vectors(3), chunks("a.pdf"))
+    reopened = VectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    assert reopened.ntotal == 3
+    assert reopened.documents() == ["a.pdf"]
+    (score, chunk), *_ = reopened.search(vectors(2)[1], k=1)
+    assert chunk.text == TEXTS[1]
+
+
+def test_delete_document_drops_its_chunks(tmp_path):
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    with store.writing():
+        store.add(vectors(3), chunks("a.pdf"))
+    with store.writing():
+        assert store.delete_document("a.pdf") == 3
+    assert store.ntotal == 0
+    assert store.search(vectors(1)[0], k=3) == []
+
+
+def test_hybrid_search_fuses_keyword_and_vector_rankings(tmp_path):
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    with store.writing():
+        store.add(vectors(3), chunks("a.pdf"))
+    # The vector points at the retail chunk, the keywords at the healthcare one; both make the top two
+    found = [chunk.text for _, chunk in store.hybrid_search(vectors(3)[2], "healthcare mission", k=2)]
+    assert set(found) == {TEXTS[1], TEXTS[2]}
+    assert [chunk.text for _, chunk in store.keyword_search("healthcare", k=3)] == [TEXTS[1]]
+
+
+def test_partitions_are_isolated(tmp_path):
+    stores = PartitionedVectorStore(str(tmp_path), dimension=DIMENSION, background=False)
+    with stores.partition("Acme").writing() as store:
+        store.add(vectors(3), chunks("a.pdf"))
+    assert stores.partition("Acme").ntotal == 3
+    assert stores.partition("Globex").keyword_search("healthcare") == []
+
+
+def test_rebuild_streams_vectors_in_batches(tmp_path, monkeypatch):
+    import vector_store
+
+    monkeypatch.setattr(vector_store, "INDEX_REBUILD_BATCH", 100)
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((1000, DIMENSION)).astype("float32")
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, hnsw_threshold=500, background=False)
+    loads = []
+    load_vectors = store._load_vectors
+    monkeypatch.setattr(store, "_load_vectors", lambda ids, *args: loads.append(len(ids)) or load_vectors(ids, *args))
+    with store.writing():
+        store.add(data, chunks("a.pdf", [f"chunk {i}" for i in range(len(data))]))
+    assert store.tier == "hnsw"
+    assert loads and max(loads) <= 100
+    (_, chunk), *_ = store.search(data[123], k=1)
+    assert chunk.text == "chunk 123"
+
+
+def test_target_tier_moves_up_with_the_corpus():
+    from vector_store import target_tier
+
+    assert target_tier(10, ivf_threshold=100, hnsw_threshold=1000) == "flat"
+    assert target_tier(100, ivf_threshold=100, hnsw_threshold=1000) == "ivf"
+    assert target_tier(5000, ivf_threshold=100, hnsw_threshold=1000) == "hnsw"
+    assert target_tier(5000, ivf_threshold=100, hnsw_threshold=0) == "ivf"
+
+
+def random_vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype("float32")
+
+
+def test_store_retiers_in_the_background_and_keeps_serving(tmp_path):
+    data = random_vectors(800)
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, ivf_threshold=500, nprobe=64)
+    with store.writing():
+        store.add(data[:400], chunks("a.pdf", [f"chunk {i}" for i in range(400)]))
+    assert store.tier == "flat"
+    with store.writing():
+        store.add(data[400:], chunks("b.pdf", [f"chunk {i}" for i in range(400, 800)]))
+    store.wait_for_rebuild(30)
+    assert store.tier == "ivf"
+    assert store.ntotal == 800
+    (_, chunk), *_ = store.search(data[650], k=1)
+    assert chunk.text == "chunk 650"
+    # The rebuilt index survives a reopen and still deletes by id
+    reopened = VectorStore(str(tmp_path), dimension=DIMENSION, ivf_threshold=500, background=False)
+    assert reopened.tier == "ivf"
+    with reopened.writing():
+        assert reopened.delete_document("a.pdf") == 400
+    assert reopened.ntotal == 400
+
+
+def test_hnsw_rebuilds_once_deletes_pile_up(tmp_path):
+    data = random_vectors(300)
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, hnsw_threshold=200, background=False)
+    with store.writing():
+        store.add(data[:100], chunks("a.pdf", [f"a {i}" for i in range(100)]))
+        store.add(data[100:], chunks("b.pdf", [f"b {i}" for i in range(200)]))
+    assert store.tier == "hnsw" and store.index.ntotal == 300
+    with store.writing():
+        store.delete_document("a.pdf")
+    # A third of the index was tombstones, past INDEX_MAX_TOMBSTONES, so it was rebuilt without them
+    assert store.index.ntotal == 200
+    assert all(chunk.document == "b.pdf" for _, chunk in store.search(data[0], k=5))
+
+
+def test_exact_rerank_orders_by_true_distance():
+    from vector_store import exact_rerank
+
+    query = np.zeros(DIMENSION, dtype="float32")
+    candidates = np.stack([np.full(DIMENSION, d, dtype="float32") for d in (3, 1, 2)])
+    assert [i for _, i in exact_rerank(query, [30, 10, 20], candidates, 2)] == [10, 20]
+
+
+def test_compression_waits_for_enough_training_vectors():
+    from vector_store import build_index, codec_of
+
+    assert codec_of(build_index("flat", DIMENSION, random_vectors(10), np.arange(10), "sq8")) == "none"
+    assert codec_of(build_index("flat", DIMENSION, random_vectors(1000), np.arange(1000), "sq8")) == "sq8"
+    assert codec_of(build_index("flat", DIMENSION, random_vectors(1000), np.arange(1000), "fp16")) == "fp16"
+
+
+def test_compressed_store_reranks_against_original_vectors(tmp_path):
+    from vector_store import codec_of
+
+    data = random_vectors(1200)
+    store = VectorStore(str(tmp_path), dimension=DIMENSION, compression="sq8", rerank=4, background=False)
+    with store.writing():
+        store.add(data, chunks("a.pdf", [f"chunk {i}" for i in range(len(data))]))
+    assert codec_of(store.index) == "sq8"
+    for i in (0, 321, 1199):
+        (distance, chunk), *_ = store.search(data[i], k=3)
+        assert chunk.text == f"chunk {i}"
+        assert distance == pytest.approx(0.0, abs=1e-6)  # exact float32 distance, not the quantized one
@@ -0,0 +1,46 @@
+import re
+import logging
+from functools import lru_cache
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+# cl100k_base is the tokenizer behind the text-embedding-3 models
+TOKENIZER = "cl100k_base"
+
+
+##############################
+# Local Tokenizer            #
+##############################
+class ApproximateEncoding:
+    # Offline stand-in when tiktoken cannot fetch its BPE file: one token per word or
+    # punctuation run (with its leading whitespace), close to BPE counts for English prose
+    _pattern = re.compile(r"\s*[A-Za-z]+|\s*\d{1,3}|\s*[^\sA-Za-z\d]+|\s+")
+
+    def encode(self, text: str, **kwargs: Any) -> List[str]:
+        return self._pattern.findall(text)
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKENIZER)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable ({e}); using approximate token counts")
+        return ApproximateEncoding()
+
+
+def encode(text: str) -> List[Any]:
+    return get_encoding().encode(text, disallowed_special=())
+
+
+def decode(tokens: List[Any]) -> str:
+    return get_encoding().decode(tokens)
+
+
+def count_tokens(text: str) -> int:
+    return len(encode(text)) if text else 0
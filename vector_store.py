@@ -0,0 +1,573 @@
+import os
+import math
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from agent_registry import DEFAULT_PARTITION, PartitionPool
+from ingestion import Chunk
+from retrieval import KEYWORD_PREFILTER, keyword_query, reciprocal_rank_fusion
+
+# Load environment variables (API keys, etc.)
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_DIR = os.getenv("VISIONARY_VECTOR_STORE_DIR", "tmp/vector_store")
+# Vector counts at which the store retrains into a faster approximate index; 0 disables a tier
+INDEX_IVF_THRESHOLD = int(os.getenv("VISIONARY_INDEX_IVF_THRESHOLD", 50_000))
+INDEX_HNSW_THRESHOLD = int(os.getenv("VISIONARY_INDEX_HNSW_THRESHOLD", 0))
+# Recall knobs: IVF lists probed per query and HNSW candidate list size
+INDEX_NPROBE = int(os.getenv("VISIONARY_INDEX_NPROBE", 16))
+INDEX_EF_SEARCH = int(os.getenv("VISIONARY_INDEX_EF_SEARCH", 64))
+# Compressed vector codes: "none" (float32), "fp16", "sq8" (scalar int8) or "pq" (product quantization)
+INDEX_COMPRESSION = os.getenv("VISIONARY_INDEX_COMPRESSION", "none")
+INDEX_PQ_BYTES = int(os.getenv("VISIONARY_INDEX_PQ_BYTES", 96))  # PQ code size per vector
+# Compressed searches fetch k * this many candidates and re-rank them against the stored float32 vectors
+INDEX_RERANK = int(os.getenv("VISIONARY_INDEX_RERANK", 4))
+# Rebuild once this share of an HNSW index is deleted vectors (HNSW cannot remove in place)
+INDEX_MAX_TOMBSTONES = float(os.getenv("VISIONARY_INDEX_MAX_TOMBSTONES", 0.2))
+# Vectors read from the chunk table and added per step while rebuilding; bounds rebuild memory
+INDEX_REBUILD_BATCH = int(os.getenv("VISIONARY_INDEX_REBUILD_BATCH", 10_000))
+# Most vectors an IVF quantizer trains on, never below the 39 per list FAISS needs
+INDEX_TRAIN_SAMPLE = int(os.getenv("VISIONARY_INDEX_TRAIN_SAMPLE", 100_000))
+
+# Per-company partitions kept loaded at once; the least recently searched are dropped beyond this
+VECTOR_PARTITIONS_OPEN = int(os.getenv("VISIONARY_VECTOR_PARTITIONS_OPEN", 8))
+
+TIERS = ["flat", "ivf", "hnsw"]
+
+
+##############################
+# 1️⃣ Index Tiers             #
+##############################
+def tier_of(index: Any) -> str:
+    import faiss
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def target_tier(count: int, ivf_threshold: int = INDEX_IVF_THRESHOLD, hnsw_threshold: int = INDEX_HNSW_THRESHOLD) -> str:
+    if hnsw_threshold and count >= hnsw_threshold:
+        return "hnsw"
+    if ivf_threshold and count >= ivf_threshold:
+        return "ivf"
+    return "flat"
+
+
+def ivf_lists(count: int) -> int:
+    # ~4 * sqrt(n) lists, the usual starting point for IVF, with enough points left to train each centroid
+    return max(1, min(65536, int(4 * math.sqrt(max(count, 1))), count // 39))
+
+
+def min_training_vectors(compression: str) -> int:
+    # PQ trains 256 centroids per sub-quantizer; SQ8 only needs per-dimension ranges
+    return {"pq": 10_000, "sq8": 1_000}.get(compression, 0)
+
+
+def codec_string(compression: str, dimension: int) -> str:
+    if compression == "fp16":
+        return "SQfp16"
+    if compression == "sq8":
+        return "SQ8"
+    if compression == "pq":
+        # Largest sub-quantizer count that divides the dimension and fits the byte budget
+        m = max(m for m in range(1, min(INDEX_PQ_BYTES, dimension) + 1) if dimension % m == 0)
+        return f"PQ{m}"
+    return "Flat"
+
+
+def codec_of(index: Any) -> str:
+    import faiss
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        inner = faiss.downcast_index(inner.storage)
+    if isinstance(inner, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        return "pq"
+    if isinstance(inner, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return "fp16" if inner.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    return "none"
+
+
+def empty_index(tier: str, dimension: int, count: int, compression: str = "none") -> Tuple[Any, int]:
+    """An untrained `tier` index sized for `count` vectors, and how many vectors to train it on.
+
+    Compression falls back to float32 until there are enough vectors to train it.
+    """
+    import faiss
+
+    if count < min_training_vectors(compression):
+        compression = "none"
+    codec = codec_string(compression, dimension)
+    sample_size = max(min_training_vectors(compression), 1)
+    if tier == "ivf":
+        nlist = ivf_lists(count)
+        index = faiss.index_factory(dimension, f"IVF{nlist},{codec}")
+        sample_size = max(sample_size, min(nlist * 64, max(INDEX_TRAIN_SAMPLE, nlist * 39)))
+        # IVF keeps its own ids; the hashtable direct map makes reconstruct-by-id work for later migrations
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    elif tier == "hnsw":
+        index = faiss.index_factory(dimension, "IDMap2,HNSW32" if codec == "Flat" else f"IDMap2,HNSW32_{codec}")
+    else:
+        index = faiss.index_factory(dimension, f"IDMap2,{codec}")
+    return index, min(sample_size, count)
+
+
+def build_index(tier: str, dimension: int, vectors: Any, ids: Any, compression: str = "none") -> Any:
+    """Build a `tier` index holding in-memory `vectors` under the given int64 ids."""
+    import numpy as np
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    index, sample_size = empty_index(tier, dimension, len(vectors), compression)
+    if not index.is_trained:
+        # Train on a bounded sample; the full corpus adds little to the centroids
+        index.train(vectors[training_sample(len(vectors), sample_size)])
+    if len(vectors):
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def training_sample(count: int, size: int) -> Any:
+    # Sorted positions of a reproducible random sample, so loading them reads the table in order
+    import numpy as np
+    if count <= size:
+        return np.arange(count)
+    return np.sort(np.random.default_rng(0).choice(count, size, replace=False))
+
+
+def exact_rerank(query: Any, ids: List[int], vectors: Any, k: int) -> List[Tuple[float, int]]:
+    # Exact squared L2 against the original float32 vectors, matching IndexFlatL2 distances
+    import numpy as np
+    if not len(ids):
+        return []
+    distances = ((np.asarray(vectors, dtype="float32") - np.asarray(query, dtype="float32").reshape(1, -1)) ** 2).sum(axis=1)
+    order = np.argsort(distances)[:k]
+    return [(float(distances[i]), int(ids[i])) for i in order]
+
+
+def apply_search_params(index: Any, nprobe: int = INDEX_NPROBE, ef_search: int = INDEX_EF_SEARCH):
+    import faiss
+    tier = tier_of(index)
+    if tier == "ivf":
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    elif tier == "hnsw":
+        faiss.downcast_index(index.index).hnsw.efSearch = ef_search
+
+
+##############################
+# 2️⃣ Persistent Vector Store #
+##############################
+class VectorStore:
+    """FAISS index on disk plus a SQLite table mapping vector ids to their chunks.
+
+    Searches use a read-only memory-mapped copy of the index, so worker processes
+    share one set of pages. Writes happen inside `writing()`, which takes a file
+    lock, loads a private copy, and atomically replaces the file on exit. Once the
+    corpus crosses a tier threshold the index is retrained in a background thread
+    and swapped in; searches keep using the old index until then.
+    """
+
+    def __init__(
+        self,
+        directory: str = VECTOR_STORE_DIR,
+        dimension: int = 1536,
+        ivf_threshold: int = INDEX_IVF_THRESHOLD,
+        hnsw_threshold: int = INDEX_HNSW_THRESHOLD,
+        nprobe: int = INDEX_NPROBE,
+        ef_search: int = INDEX_EF_SEARCH,
+        compression: str = INDEX_COMPRESSION,
+        rerank: int = INDEX_RERANK,
+        background: bool = True,
+    ):
+        self.directory = directory
+        self.dimension = dimension
+        self.ivf_threshold = ivf_threshold
+        self.hnsw_threshold = hnsw_threshold
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.compression = compression
+        self.rerank = rerank
+        self.background = background
+        self.index_path = os.path.join(directory, "index.faiss")
+        self.lock_path = os.path.join(directory, "write.lock")
+        os.makedirs(directory, exist_ok=True)
+        self._index: Any = None
+        self._index_stamp: Optional[Tuple[int, int]] = None
+        self._tombstones = 0
+        self._writable = False
+        self._retier_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(directory, "chunks.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, document TEXT, chunk_index INTEGER, page INTEGER, "
+            "token_offset INTEGER, tokens INTEGER, text TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_document ON chunks (document)")
+        # Original float32 vectors live on disk for re-ranking and lossless retraining
+        if "vector" not in [row[1] for row in self._db.execute("PRAGMA table_info(chunks)")]:
+            self._db.execute("ALTER TABLE chunks ADD COLUMN vector BLOB")
+        # BM25 keyword index over the chunk text, kept in step with the table by triggers
+        has_fts = self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'chunks_fts'").fetchone()
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5("
+            "text, content='chunks', content_rowid='id', tokenize='porter unicode61')"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN "
+            "INSERT INTO chunks_fts (rowid, text) VALUES (new.id, new.text); END"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN "
+            "INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.id, old.text); END"
+        )
+        if not has_fts:
+            self._db.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+        self._db.commit()
+
+    # -- index lifecycle ---------------------------------------------------
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        # Saves replace the file, so a new inode or mtime means another process wrote it
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _open(self, writable: bool):
+        import faiss
+        stamp = self._stamp()
+        if stamp is None:
+            return build_index("flat", self.dimension, [], []), None
+        if writable:
+            return faiss.read_index(self.index_path), stamp
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(self.index_path, flags)
+        apply_search_params(index, self.nprobe, self.ef_search)
+        return index, stamp
+
+    def _live_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def refresh(self):
+        # Pick up writes made by other processes since the index was opened
+        with self._lock:
+            if self._writable:
+                return
+            if self._index is None or self._stamp() != self._index_stamp:
+                self._index, self._index_stamp = self._open(writable=False)
+                self._tombstones = max(0, self._index.ntotal - self._live_count())
+
+    @property
+    def index(self):
+        self.refresh()
+        return self._index
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal - self._tombstones
+
+    @property
+    def tier(self) -> str:
+        return tier_of(self.index)
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        with self._lock:
+            self.nprobe = nprobe or self.nprobe
+            self.ef_search = ef_search or self.ef_search
+            if self._index is not None and not self._writable:
+                apply_search_params(self._index, self.nprobe, self.ef_search)
+
+    def _save(self):
+        import faiss
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        faiss.write_index(self._index, tmp_path)
+        os.replace(tmp_path, self.index_path)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        import fcntl
+        with open(self.lock_path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @contextmanager
+    def writing(self) -> Iterator["VectorStore"]:
+        with self._lock, self._file_lock():
+            try:
+                # Never mutate the memory-mapped index; work on a private copy and swap the file
+                self._index, self._index_stamp = self._open(writable=True)
+                self._writable = True
+                yield self
+                self._db.commit()
+                self._save()
+            except BaseException:
+                self._db.rollback()
+                raise
+            finally:
+                self._writable = False
+                self._index = None
+        self._maybe_retier()
+
+    # -- mutations (inside writing()) --------------------------------------
+    def _require_writing(self):
+        if not self._writable:
+            raise RuntimeError("VectorStore changes must happen inside `with store.writing():`")
+
+    def add(self, vectors: Any, chunks: List[Chunk]) -> List[int]:
+        import numpy as np
+
+        self._require_writing()
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        ids = []
+        for chunk, vector in zip(chunks, vectors):
+            cursor = self._db.execute(
+                "INSERT INTO chunks (document, chunk_index, page, token_offset, tokens, text, vector) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chunk.document, chunk.index, chunk.page, chunk.token_offset, chunk.tokens, chunk.text, vector.tobytes()),
+            )
+            ids.append(cursor.lastrowid)
+        self._index.add_with_ids(vectors, np.array(ids, dtype="int64"))
+        return ids
+
+    def _remove_ids(self, index: Any, ids: List[int]):
+        import numpy as np
+        try:
+            index.remove_ids(np.array(ids, dtype="int64"))
+        except RuntimeError:
+            # HNSW cannot delete; the vectors stay as tombstones that searches filter out
+            pass
+
+    def delete_document(self, document: str) -> int:
+        self._require_writing()
+        ids = [row[0] for row in self._db.execute("SELECT id FROM chunks WHERE document = ?", (document,))]
+        if ids:
+            self._remove_ids(self._index, ids)
+            self._db.execute("DELETE FROM chunks WHERE document = ?", (document,))
+        return len(ids)
+
+    # -- background retiering -----------------------------------------------
+    def _needs_rebuild(self) -> Optional[str]:
+        index = self.index
+        live = index.ntotal - self._tombstones
+        current = tier_of(index)
+        target = target_tier(live, self.ivf_threshold, self.hnsw_threshold)
+        # Only move up; a shrinking corpus keeps its faster index
+        if TIERS.index(target) > TIERS.index(current):
+            return target
+        wanted = self.compression if live >= min_training_vectors(self.compression) else "none"
+        if codec_of(index) != wanted:
+            return current
+        if index.ntotal and self._tombstones / index.ntotal > INDEX_MAX_TOMBSTONES:
+            return current
+        return None
+
+    def _maybe_retier(self):
+        with self._lock:
+            if self._retier_thread is not None and self._retier_thread.is_alive():
+                return
+            tier = self._needs_rebuild()
+            if tier is None:
+                return
+            if not self.background:
+                self.rebuild(tier)
+                return
+            self._retier_thread = threading.Thread(target=self.rebuild, args=(tier,), name="vector-store-retier", daemon=True)
+            self._retier_thread.start()
+
+    def _live_ids(self) -> List[int]:
+        return [row[0] for row in self._db.execute("SELECT id FROM chunks ORDER BY id")]
+
+    def rebuild(self, tier: str):
+        """Retrain the index as `tier` without blocking writers, then swap it in.
+
+        Memory stays bounded by the training sample plus one batch of vectors,
+        however large the corpus: the sample trains the quantizer, then the
+        rest streams from the chunk table in batches of INDEX_REBUILD_BATCH.
+        """
+        import numpy as np
+
+        # Snapshot a consistent (file, ids) pair, then train outside every lock. The memory-mapped
+        # copy is only read for rows saved before vectors were kept in the table
+        with self._lock, self._file_lock():
+            source, _ = self._open(writable=False)
+            snapshot_ids = self._live_ids()
+        logger.info(f"Rebuilding vector index as {tier} over {len(snapshot_ids)} vectors")
+        rebuilt, sample_size = empty_index(tier, self.dimension, len(snapshot_ids), self.compression)
+        if not rebuilt.is_trained:
+            sample = [snapshot_ids[i] for i in training_sample(len(snapshot_ids), sample_size)]
+            rebuilt.train(self._load_vectors(sample, source))
+        for start in range(0, len(snapshot_ids), INDEX_REBUILD_BATCH):
+            part = snapshot_ids[start:start + INDEX_REBUILD_BATCH]
+            rebuilt.add_with_ids(self._load_vectors(part, source), np.array(part, dtype="int64"))
+        del source
+
+        # Catch up with writes that landed while training, then replace the file
+        with self.writing():
+            current = self._index
+            live_ids = set(self._live_ids())
+            snapshot = set(snapshot_ids)
+            added = sorted(live_ids - snapshot)
+            removed = sorted(snapshot - live_ids)
+            for start in range(0, len(added), INDEX_REBUILD_BATCH):
+                part = added[start:start + INDEX_REBUILD_BATCH]
+                rebuilt.add_with_ids(self._load_vectors(part, current), np.array(part, dtype="int64"))
+            if removed:
+                self._remove_ids(rebuilt, removed)
+            self._index = rebuilt
+        logger.info(f"Vector index now {tier_of(rebuilt)}/{codec_of(rebuilt)} ({rebuilt.ntotal} vectors)")
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None):
+        thread = self._retier_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # -- reads --------------------------------------------------------------
+    def _load_chunks(self, ids: List[int]) -> Dict[int, Chunk]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        rows = self._db.execute(
+            f"SELECT id, document, chunk_index, page, token_offset, tokens, text FROM chunks WHERE id IN ({placeholders})",
+            [int(i) for i in ids],
+        ).fetchall()
+        return {
+            row[0]: Chunk(document=row[1], index=row[2], page=row[3], token_offset=row[4], tokens=row[5], text=row[6])
+            for row in rows
+        }
+
+    def _load_vectors(self, ids: List[int], fallback_index: Any = None) -> Any:
+        # Stored originals first; rows written before vectors were kept fall back to the index
+        import numpy as np
+
+        vectors = np.zeros((len(ids), self.dimension), dtype="float32")
+        position = {int(i): n for n, i in enumerate(ids)}
+        missing = set(position)
+        for start in range(0, len(ids), 500):
+            part = [int(i) for i in ids[start:start + 500]]
+            placeholders = ",".join("?" * len(part))
+            for row_id, blob in self._db.execute(f"SELECT id, vector FROM chunks WHERE id IN ({placeholders})", part):
+                if blob is not None:
+                    vectors[position[row_id]] = np.frombuffer(blob, dtype="float32")
+                    missing.discard(row_id)
+        if missing and fallback_index is not None:
+            lost = sorted(missing)
+            for row_id, vector in zip(lost, fallback_index.reconstruct_batch(np.array(lost, dtype="int64"))):
+                vectors[position[row_id]] = vector
+        return vectors
+
+    def get_chunks(self, ids: List[int]) -> List[Chunk]:
+        found = self._load_chunks(ids)
+        return [found[i] for i in ids if i in found]
+
+    def search_ids(self, vectors: Any, k: int = 5) -> Tuple[Any, Any]:
+        import numpy as np
+
+        with self._lock:
+            index = self.index
+            queries = np.asarray(vectors, dtype="float32").reshape(-1, self.dimension)
+            if index.ntotal == 0:
+                return np.zeros((len(queries), 0), dtype="float32"), np.zeros((len(queries), 0), dtype="int64")
+            # Over-fetch past tombstones so deleted vectors do not eat into k
+            fetch = min(index.ntotal, k + min(self._tombstones, 3 * k))
+            return index.search(queries, fetch)
+
+    def _vector_hits(self, vector: Any, k: int) -> List[Tuple[float, int]]:
+        compressed = self.rerank > 1 and codec_of(self.index) != "none"
+        distances, ids = self.search_ids(vector, k * self.rerank if compressed else k)
+        if not len(ids):
+            return []
+        hits = [(float(d), int(i)) for d, i in zip(distances[0], ids[0]) if i >= 0]
+        if compressed:
+            # Approximate codes pick the candidates; the original vectors decide the order
+            candidates = [i for _, i in hits]
+            hits = exact_rerank(vector, candidates, self._load_vectors(candidates), len(candidates))
+        return hits
+
+    def _keyword_hits(self, query: str, k: int) -> List[Tuple[float, int]]:
+        expression = keyword_query(query)
+        if not expression:
+            return []
+        # bm25() is lower-is-better, like the L2 distances of the vector search
+        rows = self._db.execute(
+            "SELECT bm25(chunks_fts), rowid FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+            (expression, k),
+        ).fetchall()
+        return [(float(score), int(row_id)) for score, row_id in rows]
+
+    def _with_chunks(self, hits: List[Tuple[float, int]], k: int) -> List[Tuple[float, Chunk]]:
+        found = self._load_chunks([i for _, i in hits])
+        return [(score, found[i]) for score, i in hits if i in found][:k]
+
+    def search(self, vector: Any, k: int = 5) -> List[Tuple[float, Chunk]]:
+        return self._with_chunks(self._vector_hits(vector, k), k)
+
+    def keyword_search(self, query: str, k: int = 5) -> List[Tuple[float, Chunk]]:
+        return self._with_chunks(self._keyword_hits(query, k), k)
+
+    def hybrid_search(self, vector: Any, query: str, k: int = 5, prefilter: int = KEYWORD_PREFILTER) -> List[Tuple[float, Chunk]]:
+        """Vector and BM25 rankings merged by reciprocal-rank fusion; scores are higher-is-better.
+
+        With `prefilter`, the top keyword matches are vector-ranked exactly from the stored
+        vectors and the index is not searched at all, unless fewer than `k` chunks matched.
+        """
+        fetch = max(4 * k, 20)  # each ranking contributes more than k so fusion has overlap to work with
+        keyword_ids = [i for _, i in self._keyword_hits(query, max(prefilter, fetch))]
+        if prefilter and len(keyword_ids) >= k:
+            vector_hits = exact_rerank(vector, keyword_ids, self._load_vectors(keyword_ids, self.index), fetch)
+        else:
+            vector_hits = self._vector_hits(vector, fetch)
+        fused = reciprocal_rank_fusion([keyword_ids[:fetch], [i for _, i in vector_hits]])
+        return self._with_chunks(fused, k)
+
+    def documents(self) -> List[str]:
+        return [row[0] for row in self._db.execute("SELECT DISTINCT document FROM chunks ORDER BY document")]
+
+
+##############################
+# 3️⃣ Partitions              #
+##############################
+class PartitionedVectorStore:
+    """One VectorStore per company or session, so a search only touches that tenant's chunks.
+
+    The default partition is the store root, which keeps indexes written before
+    partitioning readable. Others live under `partitions/<key>/` and are opened on
+    first use through a bounded LRU pool.
+    """
+
+    def __init__(self, directory: str = VECTOR_STORE_DIR, max_open: int = VECTOR_PARTITIONS_OPEN, **options: Any):
+        self.directory = directory
+        self.options = options
+        self._pool = PartitionPool(self._build, max_open)
+
+    def directory_for(self, key: str) -> str:
+        if key == DEFAULT_PARTITION:
+            return self.directory
+        return os.path.join(self.directory, "partitions", key)
+
+    def _build(self, key: str) -> VectorStore:
+        return VectorStore(self.directory_for(key), **self.options)
+
+    def partition(self, name: Optional[str] = None) -> VectorStore:
+        return self._pool.get(name)
+
+    def partitions(self) -> List[str]:
+        keys = [DEFAULT_PARTITION] if os.path.exists(os.path.join(self.directory, "chunks.sqlite")) else []
+        root = os.path.join(self.directory, "partitions")
+        if os.path.isdir(root):
+            keys += sorted(os.listdir(root))
+        return keys
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._pool.stats